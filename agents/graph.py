@@ -7,21 +7,42 @@ LangGraph 워크플로우 구성
 from dotenv import load_dotenv
 load_dotenv()  # .env 파일 로드
 
+from typing import Callable, Awaitable, Dict, Any, Optional
+
 from langgraph.graph import StateGraph, END, START
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 
 from agents.state import AgentState, create_initial_state
-from agents.orchestrator import orchestrator_node, route_from_orchestrator
-from agents.interrupt_handler import interrupt_handler_node
+from agents.utils.streaming import emit_progress
+from agents.utils.metrics import track_usage
+from agents.utils.tracing import trace_span
+from agents.orchestrator import orchestrator_node, aorchestrator_node, route_from_orchestrator
+from agents.interrupt_handler import interrupt_handler_node, ainterrupt_handler_node
 from agents.nodes.agents import (
     planner_node,
+    aplanner_node,
+    planner_approval_node,
+    aplanner_approval_node,
     coder_node,
+    acoder_node,
+    coder_approval_node,
+    acoder_approval_node,
     reviewer_node,
+    areviewer_node,
+    reviewer_approval_node,
+    areviewer_approval_node,
     tester_node,
+    atester_node,
     ux_designer_node,
+    aux_designer_node,
     security_node,
-    db_agent_node
+    asecurity_node,
+    db_agent_node,
+    adb_agent_node
 )
+from agents.nodes.quality_gate import quality_gate_node, aquality_gate_node
 
 
 def route_entry(state: AgentState) -> str:
@@ -47,21 +68,93 @@ def route_entry(state: AgentState) -> str:
     return "orchestrator"
 
 
-def create_agent_graph():
-    """멀티 에이전트 그래프 생성"""
+def _with_usage(result: Dict[str, Any], usage: Dict[str, float]) -> Dict[str, Any]:
+    """LLM 호출이 있었으면 사용량을 노드 결과에 추가"""
+    if not usage:
+        return result
+    return {**result, "usage": dict(usage)}
+
+
+def _node_span(name: str, state: AgentState, config: RunnableConfig):
+    """노드 span (superstep 번호, 입력 크기 포함)"""
+    return trace_span(
+        name,
+        "node",
+        session_id=state.get("session_id") or config.get("configurable", {}).get("thread_id"),
+        step=config.get("metadata", {}).get("langgraph_step"),
+        messages=len(state.get("messages", [])),
+        artifacts=len(state.get("artifacts", {}))
+    )
+
+
+def _finish_node_span(span, result: Dict[str, Any]) -> None:
+    if span is not None:
+        span.set(
+            next_agent=result.get("next_agent"),
+            updates=sorted(result.keys()),
+            new_messages=len(result.get("messages", []) or [])
+        )
+
+
+def dual_node(
+    name: str,
+    func: Callable[[AgentState], Dict[str, Any]],
+    afunc: Callable[[AgentState], Awaitable[Dict[str, Any]]]
+) -> RunnableLambda:
+    """
+    sync/async 구현을 하나의 노드로 묶음
+    
+    - invoke/stream (run_agent): sync 구현 실행
+    - ainvoke/astream (server): async 구현 실행 → 이벤트 루프 블로킹 없음
+    
+    노드 시작/완료 시 progress 이벤트를 custom 스트림으로 발행하고,
+    노드 안에서 발생한 LLM 호출 사용량을 usage 채널에 기록.
+    노드 실행은 트레이스 span으로 감싸 내부 LLM/도구 호출 span의 부모가 됨
+    """
+    def run(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+        emit_progress(name, "started")
+        with _node_span(name, state, config) as span, track_usage() as usage:
+            result = func(state)
+            _finish_node_span(span, result)
+        emit_progress(name, "completed", next_agent=result.get("next_agent"))
+        return _with_usage(result, usage)
+    
+    async def arun(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+        emit_progress(name, "started")
+        with _node_span(name, state, config) as span, track_usage() as usage:
+            result = await afunc(state)
+            _finish_node_span(span, result)
+        emit_progress(name, "completed", next_agent=result.get("next_agent"))
+        return _with_usage(result, usage)
+    
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
+def create_agent_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
+    """
+    멀티 에이전트 그래프 생성
+    
+    Args:
+        checkpointer: interrupt()/재개에 사용할 체크포인터 (langgraph dev는 자체 제공)
+    """
     
     workflow = StateGraph(AgentState)
     
     # === 노드 등록 ===
-    workflow.add_node("orchestrator", orchestrator_node)
-    workflow.add_node("interrupt_handler", interrupt_handler_node)  # 새 노드
-    workflow.add_node("planner", planner_node)
-    workflow.add_node("coder", coder_node)
-    workflow.add_node("reviewer", reviewer_node)
-    workflow.add_node("tester", tester_node)
-    workflow.add_node("ux_designer", ux_designer_node)
-    workflow.add_node("security", security_node)
-    workflow.add_node("db_agent", db_agent_node)
+    workflow.add_node("orchestrator", dual_node("orchestrator", orchestrator_node, aorchestrator_node))
+    workflow.add_node("interrupt_handler", dual_node("interrupt_handler", interrupt_handler_node, ainterrupt_handler_node))  # 새 노드
+    workflow.add_node("planner", dual_node("planner", planner_node, aplanner_node))
+    workflow.add_node("coder", dual_node("coder", coder_node, acoder_node))
+    workflow.add_node("reviewer", dual_node("reviewer", reviewer_node, areviewer_node))
+    # 확인 노드: 생성 노드와 분리해 interrupt 재개 시 생성(모델 호출)을 반복하지 않음
+    workflow.add_node("planner_approval", dual_node("planner_approval", planner_approval_node, aplanner_approval_node))
+    workflow.add_node("coder_approval", dual_node("coder_approval", coder_approval_node, acoder_approval_node))
+    workflow.add_node("reviewer_approval", dual_node("reviewer_approval", reviewer_approval_node, areviewer_approval_node))
+    workflow.add_node("tester", dual_node("tester", tester_node, atester_node))
+    workflow.add_node("ux_designer", dual_node("ux_designer", ux_designer_node, aux_designer_node))
+    workflow.add_node("security", dual_node("security", security_node, asecurity_node))
+    workflow.add_node("db_agent", dual_node("db_agent", db_agent_node, adb_agent_node))
+    workflow.add_node("quality_gate", dual_node("quality_gate", quality_gate_node, aquality_gate_node))
     
     # === 진입점: route_entry로 라우팅 ===
     workflow.add_conditional_edges(
@@ -86,6 +179,7 @@ def create_agent_graph():
             "ux_designer": "ux_designer",
             "security": "security",
             "db_agent": "db_agent",
+            "quality_gate": "quality_gate",
             "finish": END
         }
     )
@@ -102,13 +196,18 @@ def create_agent_graph():
             "ux_designer": "ux_designer",
             "security": "security",
             "db_agent": "db_agent",
+            "quality_gate": "quality_gate",
             "finish": END
         }
     )
     
-    # === Planner는 조건부 엣지 (phase가 complete가 아니면 자기 자신으로) ===
+    # === 생성 → 확인 ===
+    for agent in ["planner", "coder", "reviewer"]:
+        workflow.add_edge(agent, f"{agent}_approval")
+    
+    # === Planner 확인 후 조건부 엣지 (phase가 complete가 아니면 planner로) ===
     workflow.add_conditional_edges(
-        "planner",
+        "planner_approval",
         lambda x: x.get("next_agent", "orchestrator"),
         {
             "planner": "planner",      # phase가 complete가 아닐 때
@@ -117,10 +216,10 @@ def create_agent_graph():
     )
     
     # === 나머지 에이전트 → Orchestrator로 복귀 ===
-    for agent in ["coder", "reviewer", "tester", "ux_designer", "security", "db_agent"]:
+    for agent in ["coder_approval", "reviewer_approval", "tester", "ux_designer", "security", "db_agent", "quality_gate"]:
         workflow.add_edge(agent, "orchestrator")
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 # langgraph.json에서 참조할 그래프
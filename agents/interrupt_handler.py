@@ -6,12 +6,15 @@ Interrupt Handler - 유저 중간 수정 요청 처리
 
 from enum import Enum
 from dataclasses import dataclass
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
-from agents.state import AgentState, ModificationContext
+from agents.state import AgentState, AgentError, ModificationContext
+from agents.schemas import InterruptOutput
 from agents.utils.llm_factory import get_orchestrator_llm
+from agents.utils.structured import invoke_structured, ainvoke_structured, StructuredOutputError
 
 
 # === 타입 정의 ===
@@ -62,14 +65,8 @@ INTERRUPT_ANALYSIS_PROMPT = """유저가 진행 중인 작업에 수정 요청
 
 # === 분석 함수 ===
 
-def analyze_user_interrupt(
-    user_message: str,
-    state: AgentState
-) -> InterruptDecision:
-    """유저 수정 요청 분석"""
-    
-    llm = get_orchestrator_llm()
-    
+def _build_interrupt_messages(user_message: str, state: AgentState) -> list:
+    """수정 요청 분석 프롬프트 구성"""
     # 현재 상태 추출
     execution_plan = state.get("execution_plan")
     goal = execution_plan["goal"] if execution_plan else "알 수 없음"
@@ -86,41 +83,41 @@ def analyze_user_interrupt(
         user_message=user_message
     )
     
-    messages = [
+    return [
         SystemMessage(content="당신은 유저 요청 분석기입니다. JSON으로만 응답하세요."),
         HumanMessage(content=prompt)
     ]
-    
-    response = llm.invoke(messages)
-    
-    # JSON 파싱
-    import json
-    import re
-    
-    try:
-        # JSON 추출
-        json_match = re.search(r'\{[^{}]*\}', response.content, re.DOTALL)
-        if json_match:
-            decision_data = json.loads(json_match.group())
-        else:
-            raise ValueError("No JSON found")
-        
-        return InterruptDecision(
-            scope=ModificationScope(decision_data.get("scope", "append")),
-            confidence=float(decision_data.get("confidence", 0.5)),
-            affected_agents=decision_data.get("affected_agents", ["coder"]),
-            reason=decision_data.get("reason", "알 수 없음"),
-            new_instruction=decision_data.get("new_instruction", user_message)
-        )
-    except Exception as e:
-        print(f"[INTERRUPT] 파싱 실패: {e}. 기본값 APPEND 사용")
-        return InterruptDecision(
-            scope=ModificationScope.APPEND,
-            confidence=0.5,
-            affected_agents=["coder"],
-            reason="파싱 실패로 기본값 사용",
-            new_instruction=user_message
-        )
+
+
+def _to_interrupt_decision(output: InterruptOutput, user_message: str) -> InterruptDecision:
+    """검증된 분석 결과를 InterruptDecision으로 변환"""
+    return InterruptDecision(
+        scope=ModificationScope(output.scope),
+        confidence=output.confidence,
+        affected_agents=output.affected_agents or ["coder"],
+        reason=output.reason or "알 수 없음",
+        new_instruction=output.new_instruction or user_message
+    )
+
+
+def analyze_user_interrupt(
+    user_message: str,
+    state: AgentState
+) -> InterruptDecision:
+    """유저 수정 요청 분석"""
+    llm = get_orchestrator_llm(cache=True)
+    output, _ = invoke_structured(llm, _build_interrupt_messages(user_message, state), InterruptOutput, "interrupt_handler")
+    return _to_interrupt_decision(output, user_message)
+
+
+async def aanalyze_user_interrupt(
+    user_message: str,
+    state: AgentState
+) -> InterruptDecision:
+    """유저 수정 요청 분석 (async)"""
+    llm = get_orchestrator_llm(cache=True)
+    output, _ = await ainvoke_structured(llm, _build_interrupt_messages(user_message, state), InterruptOutput, "interrupt_handler")
+    return _to_interrupt_decision(output, user_message)
 
 
 # === 타겟 파일 식별 ===
@@ -175,28 +172,20 @@ def identify_target_files(
 
 # === 노드 ===
 
-def interrupt_handler_node(state: AgentState) -> Dict[str, Any]:
-    """
-    Interrupt Handler 노드
-    
-    유저의 중간 수정 요청을 처리하고 적절한 액션을 결정합니다.
-    """
-    print("\n[INTERRUPT] 유저 수정 요청 감지...")
-    
-    # 마지막 유저 메시지 추출
-    messages = state.get("messages", [])
-    user_message = ""
-    for msg in reversed(messages):
+def _get_last_user_message(state: AgentState) -> str:
+    """마지막 유저 메시지 추출"""
+    for msg in reversed(state.get("messages", [])):
         if isinstance(msg, HumanMessage):
-            user_message = msg.content
-            break
-    
-    if not user_message:
-        print("[INTERRUPT] 유저 메시지 없음. orchestrator로 이동")
-        return {"next_agent": "orchestrator"}
-    
-    # 분석
-    decision = analyze_user_interrupt(user_message, state)
+            return msg.content
+    return ""
+
+
+def _apply_interrupt_decision(
+    state: AgentState,
+    user_message: str,
+    decision: InterruptDecision
+) -> Dict[str, Any]:
+    """인터럽트 결정을 상태 업데이트로 변환"""
     print(f"[INTERRUPT] 결정: {decision.scope.value} (confidence: {decision.confidence})")
     
     # TODO: confidence < 0.8이면 유저에게 확인 요청 (프론트엔드 연동 필요)
@@ -220,7 +209,7 @@ def interrupt_handler_node(state: AgentState) -> Dict[str, Any]:
         return {
             "next_agent": "orchestrator",
             "execution_plan": None,  # 계획 초기화
-            "artifacts": {},         # 산출물 초기화
+            "artifacts": None,       # 산출물 초기화 (merge_artifacts 리듀서가 전체 삭제)
             "current_step": 0,
             "iteration_count": 0,
             "modification_context": mod_context,
@@ -270,3 +259,55 @@ def interrupt_handler_node(state: AgentState) -> Dict[str, Any]:
                 AIMessage(content=f"[Interrupt] 추가 작업 요청: {decision.new_instruction}")
             ]
         }
+
+
+def _interrupt_parse_error(e: StructuredOutputError) -> Dict[str, Any]:
+    """분석 실패 시 임의로 APPEND하지 않고 유저에게 다시 요청"""
+    print(f"[INTERRUPT] 요청 분석 실패: {e}")
+    return {
+        "next_agent": "finish",
+        "errors": [AgentError(
+            agent="interrupt_handler",
+            error_type=type(e).__name__,
+            message=str(e),
+            recoverable=True,
+            occurred_at=datetime.now().isoformat()
+        )],
+        "messages": [AIMessage(content="[Interrupt] 수정 요청을 해석하지 못했습니다. 요청을 조금 더 구체적으로 다시 입력해주세요.")]
+    }
+
+
+def interrupt_handler_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Interrupt Handler 노드
+    
+    유저의 중간 수정 요청을 처리하고 적절한 액션을 결정합니다.
+    """
+    print("\n[INTERRUPT] 유저 수정 요청 감지...")
+    
+    user_message = _get_last_user_message(state)
+    if not user_message:
+        print("[INTERRUPT] 유저 메시지 없음. orchestrator로 이동")
+        return {"next_agent": "orchestrator"}
+    
+    try:
+        decision = analyze_user_interrupt(user_message, state)
+    except StructuredOutputError as e:
+        return _interrupt_parse_error(e)
+    return _apply_interrupt_decision(state, user_message, decision)
+
+
+async def ainterrupt_handler_node(state: AgentState) -> Dict[str, Any]:
+    """Interrupt Handler 노드 (async)"""
+    print("\n[INTERRUPT] 유저 수정 요청 감지...")
+    
+    user_message = _get_last_user_message(state)
+    if not user_message:
+        print("[INTERRUPT] 유저 메시지 없음. orchestrator로 이동")
+        return {"next_agent": "orchestrator"}
+    
+    try:
+        decision = await aanalyze_user_interrupt(user_message, state)
+    except StructuredOutputError as e:
+        return _interrupt_parse_error(e)
+    return _apply_interrupt_decision(state, user_message, decision)
@@ -4,15 +4,28 @@
 각 에이전트의 실행 로직
 """
 
-from typing import Dict, Any
+import asyncio
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.types import interrupt
 
-from agents.state import AgentState, Artifact, QualityCheck
-from agents.registry import get_agent
+from agents.state import AgentState, Artifact, PendingApproval, QualityCheck, make_artifact, get_artifact_content
 from agents.utils.llm_factory import create_llm_for_agent
+from agents.utils.prompt_cache import agent_system_message
+from agents.utils.streaming import emit_event, emit_progress, stream_json, astream_json
+from agents.utils.tracing import trace_span
+from agents.utils.structured import invoke_structured, ainvoke_structured, validate_or_repair, avalidate_or_repair
+from agents.schemas import (
+    PlannerOutput,
+    CoderOutput,
+    ReviewOutput,
+    TesterOutput,
+    SecurityOutput,
+    UXDesignerOutput
+)
 
 
 # === Planner 노드 ===
@@ -66,18 +79,45 @@ PLANNER_SYSTEM_PROMPT = """# Brainstorming & Planning
 """
 
 
-def planner_node(state: AgentState) -> Dict[str, Any]:
-    """Planner 에이전트 노드"""
-    print("\n[PLANNER] 기획 작업 시작...")
+def _preview(content: str) -> str:
+    """interrupt 미리보기용 내용 (최대 500자)"""
+    return content[:500] if len(content) > 500 else content
+
+
+# 스트리밍 중 완성 즉시 이벤트로 보낼 JSON 경로
+PLANNER_STREAM_PATHS = [("question",), ("options",)]
+CODER_STREAM_PATHS = [("files", "*")]
+
+
+def _planner_stream_handler():
+    """question/options가 완성되는 즉시 question 이벤트 발행 (options는 question과 함께 전송)"""
+    question = {}
     
-    agent = get_agent("planner")
-    llm = create_llm_for_agent("planner")
+    def on_value(path: tuple, value: Any) -> None:
+        if path == ("question",) and value:
+            question["question"] = value
+            emit_event({"type": "question", "agent": "planner", "question": value, "options": []})
+        elif path == ("options",) and value and question:
+            emit_event({"type": "question", "agent": "planner", "question": question["question"], "options": value})
     
+    return on_value
+
+
+def _coder_stream_value(path: tuple, value: Any) -> None:
+    """files[i]가 완성되는 즉시 artifact 이벤트 발행 (WebContainer가 바로 파일 기록)"""
+    if isinstance(value, dict) and value.get("path"):
+        emit_event({
+            "type": "artifact",
+            "agent": "coder",
+            "artifact": {"path": value["path"], "content": value.get("content", "")}
+        })
+
+
+def _build_planner_messages(state: AgentState) -> list:
+    """Planner 프롬프트 구성"""
     # 이전 기획안 확인
     artifacts = state.get("artifacts", {})
-    previous_plan = ""
-    if "plan.md" in artifacts:
-        previous_plan = artifacts["plan.md"]["content"]
+    previous_plan = get_artifact_content(artifacts.get("plan.md"))
     
     # 유저 응답 확인 (메시지에서 가장 최근 [수정 요청] 찾기)
     user_answer = ""
@@ -113,91 +153,186 @@ def planner_node(state: AgentState) -> Dict[str, Any]:
     else:
         prompt = f"다음 요청에 대한 기획안을 작성하세요:\n\n{instruction}"
     
-    messages = [
-        SystemMessage(content=PLANNER_SYSTEM_PROMPT),
+    return [
+        agent_system_message("planner", PLANNER_SYSTEM_PROMPT),
         HumanMessage(content=prompt)
     ]
-    
-    response = llm.invoke(messages)
-    
-    # 산출물 저장
-    artifact: Artifact = {
-        "type": "plan",
-        "file_path": "plan.md",
-        "content": response.content,
-        "created_by": "planner",
-        "version": len([a for a in state.get("artifacts", {}).values() if a["type"] == "plan"]) + 1,
-        "created_at": datetime.now().isoformat()
-    }
-    
-    print(f"[PLANNER] 기획 완료. 길이: {len(response.content)} 문자")
-    
-    # === Human-in-the-Loop: 기획안 확인 ===
-    user_feedback = interrupt({
-        "stage": "planner_complete",
-        "message": "기획안이 완성되었습니다. 계속 진행할까요? (수정 요청이 있으면 입력하세요)",
-        "preview": response.content[:500] if len(response.content) > 500 else response.content
-    })
-    
-    # 유저 피드백이 있으면 즉시 반영하여 기획안 업데이트
-    if user_feedback and isinstance(user_feedback, str) and user_feedback.strip():
-        print(f"[PLANNER] 유저 피드백 반영: {user_feedback}")
-        
-        # 피드백을 반영하여 기획안 재생성
-        updated_prompt = f"""## 유저 피드백
+
+
+def _build_planner_feedback_messages(user_feedback: str, previous_content: str) -> list:
+    """유저 피드백 반영용 Planner 프롬프트 구성"""
+    updated_prompt = f"""## 유저 피드백
 {user_feedback}
 
 ## 이전 기획안
-{response.content}
+{previous_content}
 
 유저의 피드백을 반영하여 기획안을 업데이트하세요.
 - 유저가 선택한 옵션에 맞게 phase를 "designing" 또는 "complete"로 진행하세요
 - 구체적인 설계를 제시하세요"""
-        
-        updated_messages = [
-            SystemMessage(content=PLANNER_SYSTEM_PROMPT),
-            HumanMessage(content=updated_prompt)
-        ]
-        
-        updated_response = llm.invoke(updated_messages)
-        
-        # 업데이트된 기획안 저장
-        updated_artifact: Artifact = {
-            "type": "plan",
-            "file_path": "plan.md",
-            "content": updated_response.content,
-            "created_by": "planner",
-            "version": artifact["version"] + 1,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        print(f"[PLANNER] 기획안 업데이트 완료. 길이: {len(updated_response.content)} 문자")
-        
-        # phase 확인하여 완료 여부 판단
-        is_complete = '"phase": "complete"' in updated_response.content or '"phase":"complete"' in updated_response.content
-        next_dest = "orchestrator" if is_complete else "planner"
-        
-        print(f"[PLANNER] 기획 phase 완료 여부: {is_complete}, 다음: {next_dest}")
-        
-        return {
-            "messages": [updated_response],
-            "artifacts": {**state.get("artifacts", {}), "plan.md": updated_artifact},
-            "next_agent": next_dest
-        }
-    
-    # 첫 기획안도 phase 확인
-    is_complete = '"phase": "complete"' in response.content or '"phase":"complete"' in response.content
+    
+    return [
+        agent_system_message("planner", PLANNER_SYSTEM_PROMPT),
+        HumanMessage(content=updated_prompt)
+    ]
+
+
+def _plan_artifact(state: AgentState, content: str, version: int = None) -> Artifact:
+    """기획안 산출물 생성"""
+    if version is None:
+        version = len([a for a in state.get("artifacts", {}).values() if a["type"] == "plan"]) + 1
+    return make_artifact("plan", "plan.md", content, "planner", version, state.get("session_id"))
+
+
+def _planner_interrupt_payload(content: str) -> Dict[str, Any]:
+    """기획안 확인 interrupt 페이로드"""
+    return {
+        "agent": "planner",
+        "stage": "planner_complete",
+        "message": "기획안이 완성되었습니다. 계속 진행할까요? (수정 요청이 있으면 입력하세요)",
+        "preview": _preview(content)
+    }
+
+
+def _planner_result(
+    state: AgentState,
+    output: PlannerOutput,
+    response: AIMessage,
+    artifact: Artifact
+) -> Dict[str, Any]:
+    """Planner 결과를 상태 업데이트로 변환 (phase 확인 포함)"""
+    is_complete = output.phase == "complete"
     next_dest = "orchestrator" if is_complete else "planner"
     
     print(f"[PLANNER] 기획 phase 완료 여부: {is_complete}, 다음: {next_dest}")
     
     return {
         "messages": [response],
-        "artifacts": {**state.get("artifacts", {}), "plan.md": artifact},
+        "artifacts": {"plan.md": artifact},
         "next_agent": next_dest
     }
 
 
+def _has_feedback(user_feedback: Any) -> bool:
+    """interrupt 응답에 유저 피드백이 있는지 확인"""
+    return bool(user_feedback and isinstance(user_feedback, str) and user_feedback.strip())
+
+
+def _pending_approval(
+    agent: str,
+    response: AIMessage,
+    artifact: Artifact,
+    passed: Optional[bool] = None
+) -> PendingApproval:
+    """확인 노드에 넘길 생성 결과 (피드백 반영 시 같은 ID로 메시지를 교체하도록 ID 고정)"""
+    if not response.id:
+        response.id = f"{agent}-{uuid.uuid4().hex}"
+    return {
+        "agent": agent,
+        "file_path": artifact["file_path"],
+        "message_id": response.id,
+        "artifact_version": artifact["version"],
+        "passed": passed
+    }
+
+
+def _approval_content(state: AgentState, approval: PendingApproval) -> str:
+    """확인 대기 결과의 본문 (산출물 참조로 조회, 이전 형식의 content 필드도 지원)"""
+    if "content" in approval:
+        return approval["content"]
+    return get_artifact_content(state.get("artifacts", {}).get(approval["file_path"]))
+
+
+def _planner_generated(state: AgentState, output: PlannerOutput, response: AIMessage) -> Dict[str, Any]:
+    """생성된 기획안을 산출물로 저장하고 확인 대기 상태로 전환"""
+    artifact = _plan_artifact(state, response.content)
+    print(f"[PLANNER] 기획 완료. 길이: {len(response.content)} 문자")
+    
+    approval = _pending_approval("planner", response, artifact)
+    return {**_planner_result(state, output, response, artifact), "pending_approval": approval}
+
+
+def _planner_revised(
+    state: AgentState,
+    approval: PendingApproval,
+    output: PlannerOutput,
+    response: AIMessage
+) -> Dict[str, Any]:
+    """피드백 반영 결과로 원본 메시지/산출물 교체"""
+    response.id = approval["message_id"]
+    artifact = _plan_artifact(state, response.content, approval["artifact_version"] + 1)
+    
+    print(f"[PLANNER] 기획안 업데이트 완료. 길이: {len(response.content)} 문자")
+    return {**_planner_result(state, output, response, artifact), "pending_approval": None}
+
+
+def planner_node(state: AgentState) -> Dict[str, Any]:
+    """Planner 에이전트 노드 - 기획안 생성 (확인은 planner_approval)"""
+    print("\n[PLANNER] 기획 작업 시작...")
+    
+    llm = create_llm_for_agent("planner")
+    response = stream_json(llm, _build_planner_messages(state), PLANNER_STREAM_PATHS, _planner_stream_handler())
+    output, response = validate_or_repair(PlannerOutput, response, "planner")
+    return _planner_generated(state, output, response)
+
+
+async def aplanner_node(state: AgentState) -> Dict[str, Any]:
+    """Planner 에이전트 노드 (async)"""
+    print("\n[PLANNER] 기획 작업 시작...")
+    
+    llm = create_llm_for_agent("planner")
+    response = await astream_json(llm, _build_planner_messages(state), PLANNER_STREAM_PATHS, _planner_stream_handler())
+    output, response = await avalidate_or_repair(PlannerOutput, response, "planner")
+    return _planner_generated(state, output, response)
+
+
+def planner_approval_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Planner 확인 노드 - Human-in-the-Loop
+    
+    생성 결과는 이미 상태에 저장되어 있으므로 재개 시 모델 호출 없음.
+    유저 피드백이 있을 때만 기획안을 다시 생성해 원본 메시지/산출물을 교체
+    """
+    approval = state.get("pending_approval")
+    if not approval:
+        return {}
+    
+    content = _approval_content(state, approval)
+    user_feedback = interrupt(_planner_interrupt_payload(content))
+    if not _has_feedback(user_feedback):
+        return {"pending_approval": None}
+    
+    print(f"[PLANNER] 유저 피드백 반영: {user_feedback}")
+    llm = create_llm_for_agent("planner")
+    updated_response = stream_json(
+        llm, _build_planner_feedback_messages(user_feedback, content),
+        PLANNER_STREAM_PATHS, _planner_stream_handler()
+    )
+    updated_output, updated_response = validate_or_repair(PlannerOutput, updated_response, "planner")
+    return _planner_revised(state, approval, updated_output, updated_response)
+
+
+async def aplanner_approval_node(state: AgentState) -> Dict[str, Any]:
+    """Planner 확인 노드 (async)"""
+    approval = state.get("pending_approval")
+    if not approval:
+        return {}
+    
+    content = await asyncio.to_thread(_approval_content, state, approval)
+    user_feedback = interrupt(_planner_interrupt_payload(content))
+    if not _has_feedback(user_feedback):
+        return {"pending_approval": None}
+    
+    print(f"[PLANNER] 유저 피드백 반영: {user_feedback}")
+    llm = create_llm_for_agent("planner")
+    updated_response = await astream_json(
+        llm, _build_planner_feedback_messages(user_feedback, content),
+        PLANNER_STREAM_PATHS, _planner_stream_handler()
+    )
+    updated_output, updated_response = await avalidate_or_repair(PlannerOutput, updated_response, "planner")
+    return _planner_revised(state, approval, updated_output, updated_response)
+
+
 # === Coder 노드 ===
 
 CODER_SYSTEM_PROMPT = """# Executing Code Implementation
@@ -242,16 +377,11 @@ CODER_SYSTEM_PROMPT = """# Executing Code Implementation
 """
 
 
-def coder_node(state: AgentState) -> Dict[str, Any]:
-    """Coder 에이전트 노드"""
-    print("\n[CODER] 코드 작성 시작...")
-    
-    llm = create_llm_for_agent("coder")
-    
+def _build_coder_messages(state: AgentState) -> list:
+    """Coder 프롬프트 구성 (수정/추가 모드 또는 신규 생성 모드)"""
     # === 기본 데이터 추출 ===
     artifacts = state.get("artifacts", {})
-    plan_content = artifacts.get("plan.md", {}).get("content", "")
-    previous_code = artifacts.get("code.tsx", {}).get("content", "")
+    plan_content = get_artifact_content(artifacts.get("plan.md"))
     
     # === modification_context 확인 (핵심 개선) ===
     mod_ctx = state.get("modification_context")
@@ -266,7 +396,7 @@ def coder_node(state: AgentState) -> Dict[str, Any]:
         target_contents = []
         for file_path in mod_ctx.get("target_files", []):
             if file_path in artifacts:
-                content = artifacts[file_path].get("content", "")
+                content = get_artifact_content(artifacts[file_path])
                 target_contents.append(f"### {file_path}\n```tsx\n{content}\n```")
         
         target_files_str = "\n\n".join(target_contents) if target_contents else "대상 파일 없음"
@@ -318,85 +448,162 @@ def coder_node(state: AgentState) -> Dict[str, Any]:
 
 위 내용을 바탕으로 코드를 작성하세요."""
     
-    messages = [
-        SystemMessage(content=CODER_SYSTEM_PROMPT),
+    return [
+        agent_system_message("coder", CODER_SYSTEM_PROMPT),
         HumanMessage(content=prompt)
     ]
-    
-    response = llm.invoke(messages)
-    
-    # 산출물 저장
-    artifact: Artifact = {
-        "type": "code",
-        "file_path": "code.tsx",
-        "content": response.content,
-        "created_by": "coder",
-        "version": len([a for a in state.get("artifacts", {}).values() if a["type"] == "code"]) + 1,
-        "created_at": datetime.now().isoformat()
-    }
-    
-    print(f"[CODER] 코드 작성 완료. 길이: {len(response.content)} 문자")
-    
-    # === Human-in-the-Loop: 유저 피드백 요청 ===
-    user_feedback = interrupt({
-        "stage": "coder_complete",
-        "message": "코드 작성이 완료되었습니다. 계속 진행할까요? (수정 요청이 있으면 입력하세요)",
-        "preview": response.content[:500] if len(response.content) > 500 else response.content
-    })
-    
-    # 유저가 수정 요청을 입력한 경우 - 즉시 반영
-    if user_feedback and isinstance(user_feedback, str) and user_feedback.strip():
-        print(f"[CODER] 유저 피드백 반영: {user_feedback}")
-        
-        # 피드백을 반영하여 코드 재생성
-        updated_prompt = f"""## 중요: 기존 코드에 추가/수정하세요
+
+
+def _build_coder_feedback_messages(user_feedback: str, previous_content: str) -> list:
+    """유저 피드백 반영용 Coder 프롬프트 구성"""
+    updated_prompt = f"""## 중요: 기존 코드에 추가/수정하세요
 
 ### 수정 요청
 {user_feedback}
 
 ### 기존 코드 (반드시 유지)
 ```tsx
-{response.content}
+{previous_content}
 ```
 
 ## 규칙
 1. 기존 코드를 **삭제하지 마세요**
 2. 수정 요청에 맞게 **추가**하거나 **부분 수정**하세요
 3. 전체 코드를 JSON 형식으로 출력하세요"""
-        
-        updated_messages = [
-            SystemMessage(content=CODER_SYSTEM_PROMPT),
-            HumanMessage(content=updated_prompt)
-        ]
-        
-        updated_response = llm.invoke(updated_messages)
-        
-        # 업데이트된 코드 저장
-        updated_artifact: Artifact = {
-            "type": "code",
-            "file_path": "code.tsx",
-            "content": updated_response.content,
-            "created_by": "coder",
-            "version": artifact["version"] + 1,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        print(f"[CODER] 코드 업데이트 완료. 길이: {len(updated_response.content)} 문자")
-        
-        return {
-            "messages": [updated_response],
-            "artifacts": {**state.get("artifacts", {}), "code.tsx": updated_artifact},
-            "next_agent": "orchestrator",
-            "iteration_count": state.get("iteration_count", 0) + 1,
-            "modification_context": None  # 수정 완료 후 초기화
-        }
     
+    return [
+        agent_system_message("coder", CODER_SYSTEM_PROMPT),
+        HumanMessage(content=updated_prompt)
+    ]
+
+
+def _code_artifact(state: AgentState, content: str, version: int = None) -> Artifact:
+    """코드 산출물 생성"""
+    if version is None:
+        version = len([a for a in state.get("artifacts", {}).values() if a["type"] == "code"]) + 1
+    return make_artifact("code", "code.tsx", content, "coder", version, state.get("session_id"))
+
+
+def _artifact_message(response: AIMessage, label: str, artifact: Artifact) -> AIMessage:
+    """본문 대신 산출물 참조만 담은 메시지 (본문은 artifacts에서 조회)"""
+    return AIMessage(
+        content=f"[{label}] {artifact['file_path']} v{artifact['version']} 작성 완료 "
+                f"({artifact['size']:,} bytes): {artifact['summary']}",
+        id=response.id,
+        name=response.name
+    )
+
+
+def _coder_interrupt_payload(content: str) -> Dict[str, Any]:
+    """코드 확인 interrupt 페이로드"""
     return {
-        "messages": [response],
-        "artifacts": {**state.get("artifacts", {}), "code.tsx": artifact},
+        "agent": "coder",
+        "stage": "coder_complete",
+        "message": "코드 작성이 완료되었습니다. 계속 진행할까요? (수정 요청이 있으면 입력하세요)",
+        "preview": _preview(content)
+    }
+
+
+def _coder_result(
+    state: AgentState,
+    response: AIMessage,
+    artifact: Artifact,
+    from_feedback: bool = False
+) -> Dict[str, Any]:
+    """Coder 결과를 상태 업데이트로 변환"""
+    result = {
+        "messages": [_artifact_message(response, "Coder", artifact)],
+        "artifacts": {"code.tsx": artifact},
         "next_agent": "orchestrator",
         "modification_context": None  # 수정 완료 후 초기화
     }
+    if from_feedback:
+        result["iteration_count"] = state.get("iteration_count", 0) + 1
+    return result
+
+
+def _coder_generated(state: AgentState, response: AIMessage) -> Dict[str, Any]:
+    """생성된 코드를 산출물로 저장하고 확인 대기 상태로 전환"""
+    artifact = _code_artifact(state, response.content)
+    print(f"[CODER] 코드 작성 완료. 길이: {len(response.content)} 문자")
+    
+    approval = _pending_approval("coder", response, artifact)
+    return {**_coder_result(state, response, artifact), "pending_approval": approval}
+
+
+def _coder_revised(state: AgentState, approval: PendingApproval, response: AIMessage) -> Dict[str, Any]:
+    """피드백 반영 결과로 원본 메시지/산출물 교체"""
+    response.id = approval["message_id"]
+    artifact = _code_artifact(state, response.content, approval["artifact_version"] + 1)
+    
+    print(f"[CODER] 코드 업데이트 완료. 길이: {len(response.content)} 문자")
+    return {**_coder_result(state, response, artifact, from_feedback=True), "pending_approval": None}
+
+
+def coder_node(state: AgentState) -> Dict[str, Any]:
+    """Coder 에이전트 노드 - 코드 생성 (확인은 coder_approval)"""
+    print("\n[CODER] 코드 작성 시작...")
+    
+    llm = create_llm_for_agent("coder")
+    response = stream_json(llm, _build_coder_messages(state), CODER_STREAM_PATHS, _coder_stream_value)
+    _, response = validate_or_repair(CoderOutput, response, "coder")
+    return _coder_generated(state, response)
+
+
+async def acoder_node(state: AgentState) -> Dict[str, Any]:
+    """Coder 에이전트 노드 (async)"""
+    print("\n[CODER] 코드 작성 시작...")
+    
+    llm = create_llm_for_agent("coder")
+    response = await astream_json(llm, _build_coder_messages(state), CODER_STREAM_PATHS, _coder_stream_value)
+    _, response = await avalidate_or_repair(CoderOutput, response, "coder")
+    return _coder_generated(state, response)
+
+
+def coder_approval_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Coder 확인 노드 - Human-in-the-Loop
+    
+    재개 시 모델 호출 없음. 유저 피드백이 있을 때만 코드를 다시 생성
+    """
+    approval = state.get("pending_approval")
+    if not approval:
+        return {}
+    
+    content = _approval_content(state, approval)
+    user_feedback = interrupt(_coder_interrupt_payload(content))
+    if not _has_feedback(user_feedback):
+        return {"pending_approval": None}
+    
+    print(f"[CODER] 유저 피드백 반영: {user_feedback}")
+    llm = create_llm_for_agent("coder")
+    updated_response = stream_json(
+        llm, _build_coder_feedback_messages(user_feedback, content),
+        CODER_STREAM_PATHS, _coder_stream_value
+    )
+    _, updated_response = validate_or_repair(CoderOutput, updated_response, "coder")
+    return _coder_revised(state, approval, updated_response)
+
+
+async def acoder_approval_node(state: AgentState) -> Dict[str, Any]:
+    """Coder 확인 노드 (async)"""
+    approval = state.get("pending_approval")
+    if not approval:
+        return {}
+    
+    content = await asyncio.to_thread(_approval_content, state, approval)
+    user_feedback = interrupt(_coder_interrupt_payload(content))
+    if not _has_feedback(user_feedback):
+        return {"pending_approval": None}
+    
+    print(f"[CODER] 유저 피드백 반영: {user_feedback}")
+    llm = create_llm_for_agent("coder")
+    updated_response = await astream_json(
+        llm, _build_coder_feedback_messages(user_feedback, content),
+        CODER_STREAM_PATHS, _coder_stream_value
+    )
+    _, updated_response = await avalidate_or_repair(CoderOutput, updated_response, "coder")
+    return _coder_revised(state, approval, updated_response)
 
 
 # === Reviewer 노드 ===
@@ -441,80 +648,130 @@ REVIEWER_SYSTEM_PROMPT = """# Code Review Workflow
 """
 
 
-def reviewer_node(state: AgentState) -> Dict[str, Any]:
-    """Reviewer 에이전트 노드"""
-    print("\n[REVIEWER] 코드 리뷰 시작...")
-    
-    llm = create_llm_for_agent("reviewer")
-    
+def _build_reviewer_messages(state: AgentState) -> list:
+    """Reviewer 프롬프트 구성"""
     # 리뷰할 코드 추출
     artifacts = state.get("artifacts", {})
-    code_content = ""
-    if "code.tsx" in artifacts:
-        code_content = artifacts["code.tsx"]["content"]
+    code_content = get_artifact_content(artifacts.get("code.tsx"))
     
     prompt = f"""다음 코드를 리뷰하세요:
 
 {code_content if code_content else "리뷰할 코드가 없습니다."}"""
     
-    messages = [
-        SystemMessage(content=REVIEWER_SYSTEM_PROMPT),
+    return [
+        agent_system_message("reviewer", REVIEWER_SYSTEM_PROMPT),
         HumanMessage(content=prompt)
     ]
-    
-    response = llm.invoke(messages)
-    
-    # 품질 검증 결과 파싱
-    passed = "통과" in response.content and "수정필요" not in response.content
-    issues = []
-    if "발견된 이슈" in response.content:
-        # 간단한 이슈 추출
-        issues = ["리뷰 결과에서 이슈 발견됨"]
+
+
+def _review_outcome(
+    state: AgentState,
+    review: ReviewOutput,
+    response: AIMessage
+) -> Tuple[QualityCheck, Artifact]:
+    """검증된 리뷰 결과에서 품질 검증 결과와 산출물 생성"""
+    passed = review.verdict == "pass"
     
     quality_check: QualityCheck = {
         "checker": "reviewer",
         "passed": passed,
-        "issues": issues,
+        "issues": review.issues,
         "suggestions": [],
         "checked_at": datetime.now().isoformat()
     }
     
     # 산출물 저장
-    artifact: Artifact = {
-        "type": "review",
-        "file_path": "review.md",
-        "content": response.content,
-        "created_by": "reviewer",
-        "version": 1,
-        "created_at": datetime.now().isoformat()
-    }
+    artifact = make_artifact("review", "review.md", response.content, "reviewer", session_id=state.get("session_id"))
     
     print(f"[REVIEWER] 리뷰 완료. 결과: {'통과' if passed else '수정필요'}")
-    
-    # === Human-in-the-Loop: 리뷰 결과 확인 ===
-    user_feedback = interrupt({
+    return quality_check, artifact
+
+
+def _reviewer_interrupt_payload(content: str, passed: bool) -> Dict[str, Any]:
+    """리뷰 결과 확인 interrupt 페이로드"""
+    return {
+        "agent": "reviewer",
         "stage": "reviewer_complete",
         "message": f"코드 리뷰가 완료되었습니다. 결과: {'✅ 통과' if passed else '❌ 수정필요'}. 계속 진행할까요?",
-        "preview": response.content[:500] if len(response.content) > 500 else response.content
-    })
-    
-    if user_feedback and isinstance(user_feedback, str) and user_feedback.strip():
-        print(f"[REVIEWER] 유저 피드백: {user_feedback}")
-        return {
-            "messages": [HumanMessage(content=f"[유저 피드백] {user_feedback}")],
-            "artifacts": {**state.get("artifacts", {}), "review.md": artifact},
-            "quality_checks": state.get("quality_checks", []) + [quality_check],
-            "next_agent": "orchestrator"  # orchestrator가 판단
-        }
-    
+        "preview": _preview(content)
+    }
+
+
+def _reviewer_result(
+    state: AgentState,
+    response: AIMessage,
+    quality_check: QualityCheck,
+    artifact: Artifact
+) -> Dict[str, Any]:
+    """Reviewer 결과를 상태 업데이트로 변환 (확인 대기 정보 포함)"""
     return {
         "messages": [response],
-        "artifacts": {**state.get("artifacts", {}), "review.md": artifact},
-        "quality_checks": state.get("quality_checks", []) + [quality_check],
-        "next_agent": "orchestrator"
+        "artifacts": {"review.md": artifact},
+        "quality_checks": [quality_check],
+        "next_agent": "orchestrator",  # orchestrator가 판단
+        "pending_approval": _pending_approval("reviewer", response, artifact, quality_check["passed"])
     }
 
 
+def reviewer_node(state: AgentState) -> Dict[str, Any]:
+    """Reviewer 에이전트 노드 - 리뷰 생성 (확인은 reviewer_approval)"""
+    print("\n[REVIEWER] 코드 리뷰 시작...")
+    
+    llm = create_llm_for_agent("reviewer")
+    review, response = invoke_structured(llm, _build_reviewer_messages(state), ReviewOutput, "reviewer")
+    quality_check, artifact = _review_outcome(state, review, response)
+    
+    return _reviewer_result(state, response, quality_check, artifact)
+
+
+async def areviewer_node(state: AgentState) -> Dict[str, Any]:
+    """Reviewer 에이전트 노드 (async)"""
+    print("\n[REVIEWER] 코드 리뷰 시작...")
+    
+    llm = create_llm_for_agent("reviewer")
+    review, response = await ainvoke_structured(llm, _build_reviewer_messages(state), ReviewOutput, "reviewer")
+    quality_check, artifact = _review_outcome(state, review, response)
+    
+    return _reviewer_result(state, response, quality_check, artifact)
+
+
+def _reviewer_feedback_result(approval: PendingApproval, user_feedback: Any) -> Dict[str, Any]:
+    """리뷰 확인 응답 처리 (피드백이 있으면 리뷰 메시지를 피드백 메시지로 교체)"""
+    if not _has_feedback(user_feedback):
+        return {"pending_approval": None}
+    
+    print(f"[REVIEWER] 유저 피드백: {user_feedback}")
+    return {
+        "messages": [HumanMessage(content=f"[유저 피드백] {user_feedback}", id=approval["message_id"])],
+        "pending_approval": None
+    }
+
+
+def reviewer_approval_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Reviewer 확인 노드 - Human-in-the-Loop (모델 호출 없음)
+    
+    유저 피드백이 있으면 리뷰 메시지를 피드백 메시지로 교체해 orchestrator가 판단하게 함
+    """
+    approval = state.get("pending_approval")
+    if not approval:
+        return {}
+    
+    user_feedback = interrupt(_reviewer_interrupt_payload(_approval_content(state, approval), approval["passed"]))
+    return _reviewer_feedback_result(approval, user_feedback)
+
+
+async def areviewer_approval_node(state: AgentState) -> Dict[str, Any]:
+    """Reviewer 확인 노드 (async, 본문 조회는 스레드에서)"""
+    approval = state.get("pending_approval")
+    if not approval:
+        return {}
+    
+    content = await asyncio.to_thread(_approval_content, state, approval)
+    user_feedback = interrupt(_reviewer_interrupt_payload(content, approval["passed"]))
+    return _reviewer_feedback_result(approval, user_feedback)
+
+
 # === Tester 노드 ===
 
 TESTER_SYSTEM_PROMPT = """당신은 QA 엔지니어입니다.
@@ -532,42 +789,53 @@ TESTER_SYSTEM_PROMPT = """당신은 QA 엔지니어입니다.
 """
 
 
-def tester_node(state: AgentState) -> Dict[str, Any]:
-    """Tester 에이전트 노드"""
-    print("\n[TESTER] 테스트 작성 시작...")
-    
-    llm = create_llm_for_agent("tester")
-    
+def _build_tester_messages(state: AgentState) -> list:
+    """Tester 프롬프트 구성"""
     artifacts = state.get("artifacts", {})
-    code_content = ""
-    if "code.tsx" in artifacts:
-        code_content = artifacts["code.tsx"]["content"]
+    code_content = get_artifact_content(artifacts.get("code.tsx"))
     
-    messages = [
-        SystemMessage(content=TESTER_SYSTEM_PROMPT),
+    return [
+        agent_system_message("tester", TESTER_SYSTEM_PROMPT),
         HumanMessage(content=f"다음 코드에 대한 테스트를 작성하세요:\n\n{code_content}")
     ]
-    
-    response = llm.invoke(messages)
-    
-    artifact: Artifact = {
-        "type": "test",
-        "file_path": "test.ts",
-        "content": response.content,
-        "created_by": "tester",
-        "version": 1,
-        "created_at": datetime.now().isoformat()
-    }
+
+
+def _test_artifact(state: AgentState, response: AIMessage) -> Artifact:
+    """테스트 산출물 생성"""
+    return make_artifact("test", "test.ts", response.content, "tester", session_id=state.get("session_id"))
+
+
+def _tester_result(state: AgentState, response: AIMessage) -> Dict[str, Any]:
+    """Tester 결과를 상태 업데이트로 변환"""
+    artifact = _test_artifact(state, response)
     
     print(f"[TESTER] 테스트 작성 완료")
     
     return {
-        "messages": [response],
-        "artifacts": {**state.get("artifacts", {}), "test.ts": artifact},
+        "messages": [_artifact_message(response, "Tester", artifact)],
+        "artifacts": {"test.ts": artifact},
         "next_agent": "orchestrator"
     }
 
 
+def tester_node(state: AgentState) -> Dict[str, Any]:
+    """Tester 에이전트 노드"""
+    print("\n[TESTER] 테스트 작성 시작...")
+    
+    llm = create_llm_for_agent("tester")
+    _, response = invoke_structured(llm, _build_tester_messages(state), TesterOutput, "tester")
+    return _tester_result(state, response)
+
+
+async def atester_node(state: AgentState) -> Dict[str, Any]:
+    """Tester 에이전트 노드 (async)"""
+    print("\n[TESTER] 테스트 작성 시작...")
+    
+    llm = create_llm_for_agent("tester")
+    _, response = await ainvoke_structured(llm, _build_tester_messages(state), TesterOutput, "tester")
+    return _tester_result(state, response)
+
+
 UX_DESIGNER_SYSTEM_PROMPT = """당신은 UX/UI 디자이너입니다.
 
 ## 출력 형식 (JSON)
@@ -580,18 +848,33 @@ UX_DESIGNER_SYSTEM_PROMPT = """당신은 UX/UI 디자이너입니다.
 """
 
 
+def _build_ux_designer_messages(state: AgentState) -> list:
+    """UX Designer 프롬프트 구성"""
+    return [
+        agent_system_message("ux_designer", UX_DESIGNER_SYSTEM_PROMPT),
+        HumanMessage(content=f"현재 산출물을 검토하세요:\n{list(state.get('artifacts', {}).keys())}")
+    ]
+
+
 def ux_designer_node(state: AgentState) -> Dict[str, Any]:
     """UX Designer 에이전트 노드"""
     print("\n[UX_DESIGNER] UX 검토 시작...")
     
     llm = create_llm_for_agent("ux_designer")
+    _, response = invoke_structured(llm, _build_ux_designer_messages(state), UXDesignerOutput, "ux_designer")
     
-    messages = [
-        SystemMessage(content=UX_DESIGNER_SYSTEM_PROMPT),
-        HumanMessage(content=f"현재 산출물을 검토하세요:\n{list(state.get('artifacts', {}).keys())}")
-    ]
+    return {
+        "messages": [response],
+        "next_agent": "orchestrator"
+    }
+
+
+async def aux_designer_node(state: AgentState) -> Dict[str, Any]:
+    """UX Designer 에이전트 노드 (async)"""
+    print("\n[UX_DESIGNER] UX 검토 시작...")
     
-    response = llm.invoke(messages)
+    llm = create_llm_for_agent("ux_designer")
+    _, response = await ainvoke_structured(llm, _build_ux_designer_messages(state), UXDesignerOutput, "ux_designer")
     
     return {
         "messages": [response],
@@ -611,20 +894,35 @@ SECURITY_SYSTEM_PROMPT = """당신은 보안 전문가입니다. OWASP Top 10 
 """
 
 
+def _build_security_messages(state: AgentState) -> list:
+    """Security 프롬프트 구성"""
+    code_content = get_artifact_content(state.get("artifacts", {}).get("code.tsx"))
+    
+    return [
+        agent_system_message("security", SECURITY_SYSTEM_PROMPT),
+        HumanMessage(content=f"다음 코드의 보안을 검토하세요:\n\n{code_content[:500] if code_content else '보안 검토할 코드 없음'}")
+    ]
+
+
 def security_node(state: AgentState) -> Dict[str, Any]:
     """Security 에이전트 노드"""
     print("\n[SECURITY] 보안 검토 시작...")
     
     llm = create_llm_for_agent("security")
+    _, response = invoke_structured(llm, _build_security_messages(state), SecurityOutput, "security")
     
-    code_content = state.get("artifacts", {}).get("code.tsx", {}).get("content", "")
-    
-    messages = [
-        SystemMessage(content=SECURITY_SYSTEM_PROMPT),
-        HumanMessage(content=f"다음 코드의 보안을 검토하세요:\n\n{code_content[:500] if code_content else '보안 검토할 코드 없음'}")
-    ]
+    return {
+        "messages": [response],
+        "next_agent": "orchestrator"
+    }
+
+
+async def asecurity_node(state: AgentState) -> Dict[str, Any]:
+    """Security 에이전트 노드 (async)"""
+    print("\n[SECURITY] 보안 검토 시작...")
     
-    response = llm.invoke(messages)
+    llm = create_llm_for_agent("security")
+    _, response = await ainvoke_structured(llm, _build_security_messages(state), SecurityOutput, "security")
     
     return {
         "messages": [response],
@@ -658,6 +956,61 @@ DB_AGENT_SYSTEM_PROMPT = """당신은 데이터베이스 엔지니어입니다.
 """
 
 
+def _build_db_agent_messages(state: AgentState) -> list:
+    """DB Agent 프롬프트 구성"""
+    # 지시사항 추출
+    instruction = ""
+    for msg in reversed(state.get("messages", [])):
+        if isinstance(msg, AIMessage) and "[Orchestrator]" in msg.content:
+            instruction = msg.content
+            break
+        elif isinstance(msg, HumanMessage):
+            instruction = msg.content
+            break
+    
+    return [
+        agent_system_message("db_agent", DB_AGENT_SYSTEM_PROMPT),
+        HumanMessage(content=f"다음 데이터베이스 작업을 수행하세요:\n\n{instruction}")
+    ]
+
+
+def _db_agent_no_tools_result() -> Dict[str, Any]:
+    """MCP Tools 로드 실패 시 결과"""
+    print("[DB_AGENT] ⚠️ MCP Tools 로드 실패. SUPABASE_ACCESS_TOKEN을 확인하세요.")
+    return {
+        "messages": [AIMessage(content="⚠️ Supabase 연결이 설정되지 않았습니다. SUPABASE_ACCESS_TOKEN을 설정해주세요.")],
+        "next_agent": "orchestrator"
+    }
+
+
+def _db_agent_tool_result(tool_results: List[str]) -> Dict[str, Any]:
+    """Tool 호출 결과를 상태 업데이트로 변환"""
+    result_content = f"데이터베이스 작업 결과:\n" + "\n".join(tool_results)
+    return {
+        "messages": [AIMessage(content=result_content)],
+        "next_agent": "orchestrator"
+    }
+
+
+def _db_agent_response_result(response: AIMessage) -> Dict[str, Any]:
+    """Tool 호출 없는 응답을 상태 업데이트로 변환"""
+    print(f"[DB_AGENT] 완료: {len(response.content)} 문자")
+    return {
+        "messages": [response],
+        "next_agent": "orchestrator"
+    }
+
+
+def _set_tool_span_result(span, result: Any) -> None:
+    if span is not None:
+        span.set(result_chars=len(str(result)))
+
+
+def _set_tool_span_error(span, e: Exception) -> None:
+    if span is not None:
+        span.set(error=type(e).__name__)
+
+
 def db_agent_node(state: AgentState) -> Dict[str, Any]:
     """DB Agent 노드 - Supabase MCP Tools 사용"""
     print("\n[DB_AGENT] 데이터베이스 작업 시작...")
@@ -666,37 +1019,20 @@ def db_agent_node(state: AgentState) -> Dict[str, Any]:
     
     llm = create_llm_for_agent("db_agent")
     
-    # MCP Tools 로드
-    tools = get_tools()
+    # MCP Tools 로드 (첫 호출 시 npx로 MCP 서버 실행)
+    with trace_span("mcp_load_tools", "tool") as span:
+        tools = get_tools()
+        if span is not None:
+            span.set(tools=len(tools))
     
     if not tools:
-        print("[DB_AGENT] ⚠️ MCP Tools 로드 실패. SUPABASE_ACCESS_TOKEN을 확인하세요.")
-        return {
-            "messages": [AIMessage(content="⚠️ Supabase 연결이 설정되지 않았습니다. SUPABASE_ACCESS_TOKEN을 설정해주세요.")],
-            "next_agent": "orchestrator"
-        }
+        return _db_agent_no_tools_result()
     
     print(f"[DB_AGENT] ✅ {len(tools)}개 도구 로드됨")
     
-    # 지시사항 추출
-    instruction = ""
-    for msg in reversed(state.get("messages", [])):
-        if isinstance(msg, AIMessage) and "[Orchestrator]" in msg.content:
-            instruction = msg.content
-            break
-        elif isinstance(msg, HumanMessage):
-            instruction = msg.content
-            break
-    
     # LLM에 Tools 바인딩
     llm_with_tools = llm.bind_tools(tools)
-    
-    messages = [
-        SystemMessage(content=DB_AGENT_SYSTEM_PROMPT),
-        HumanMessage(content=f"다음 데이터베이스 작업을 수행하세요:\n\n{instruction}")
-    ]
-    
-    response = llm_with_tools.invoke(messages)
+    response = llm_with_tools.invoke(_build_db_agent_messages(state))
     
     # Tool 호출 처리
     if hasattr(response, 'tool_calls') and response.tool_calls:
@@ -708,27 +1044,72 @@ def db_agent_node(state: AgentState) -> Dict[str, Any]:
             tool_args = tool_call.get('args', {})
             
             print(f"[DB_AGENT] 호출: {tool_name}({tool_args})")
+            emit_progress("db_agent", "tool_call", tool=tool_name)
             
             # 도구 찾기 및 실행
             for tool in tools:
                 if tool.name == tool_name:
-                    try:
-                        result = tool.invoke(tool_args)
-                        tool_results.append(f"✅ {tool_name}: {str(result)[:200]}")
-                    except Exception as e:
-                        tool_results.append(f"❌ {tool_name}: {str(e)}")
+                    with trace_span(f"mcp:{tool_name}", "tool", args_chars=len(str(tool_args))) as span:
+                        try:
+                            result = tool.invoke(tool_args)
+                            tool_results.append(f"✅ {tool_name}: {str(result)[:200]}")
+                            _set_tool_span_result(span, result)
+                        except Exception as e:
+                            tool_results.append(f"❌ {tool_name}: {str(e)}")
+                            _set_tool_span_error(span, e)
                     break
         
-        result_content = f"데이터베이스 작업 결과:\n" + "\n".join(tool_results)
-        return {
-            "messages": [AIMessage(content=result_content)],
-            "next_agent": "orchestrator"
-        }
-    
-    print(f"[DB_AGENT] 완료: {len(response.content)} 문자")
+        return _db_agent_tool_result(tool_results)
     
-    return {
-        "messages": [response],
-        "next_agent": "orchestrator"
-    }
+    return _db_agent_response_result(response)
+
 
+async def adb_agent_node(state: AgentState) -> Dict[str, Any]:
+    """DB Agent 노드 - Supabase MCP Tools 사용 (async)"""
+    print("\n[DB_AGENT] 데이터베이스 작업 시작...")
+    
+    from agents.utils.mcp_tools import aget_tools
+    
+    llm = create_llm_for_agent("db_agent")
+    
+    # MCP Tools 로드 (이벤트 루프 안에서 직접 await)
+    with trace_span("mcp_load_tools", "tool") as span:
+        tools = await aget_tools()
+        if span is not None:
+            span.set(tools=len(tools))
+    
+    if not tools:
+        return _db_agent_no_tools_result()
+    
+    print(f"[DB_AGENT] ✅ {len(tools)}개 도구 로드됨")
+    
+    llm_with_tools = llm.bind_tools(tools)
+    response = await llm_with_tools.ainvoke(_build_db_agent_messages(state))
+    
+    if hasattr(response, 'tool_calls') and response.tool_calls:
+        print(f"[DB_AGENT] 🔧 {len(response.tool_calls)}개 도구 호출")
+        
+        tools_by_name = {tool.name: tool for tool in tools}
+        tool_results = []
+        for tool_call in response.tool_calls:
+            tool_name = tool_call.get('name', '')
+            tool_args = tool_call.get('args', {})
+            
+            print(f"[DB_AGENT] 호출: {tool_name}({tool_args})")
+            emit_progress("db_agent", "tool_call", tool=tool_name)
+            
+            tool = tools_by_name.get(tool_name)
+            if tool is None:
+                continue
+            with trace_span(f"mcp:{tool_name}", "tool", args_chars=len(str(tool_args))) as span:
+                try:
+                    result = await tool.ainvoke(tool_args)
+                    tool_results.append(f"✅ {tool_name}: {str(result)[:200]}")
+                    _set_tool_span_result(span, result)
+                except Exception as e:
+                    tool_results.append(f"❌ {tool_name}: {str(e)}")
+                    _set_tool_span_error(span, e)
+        
+        return _db_agent_tool_result(tool_results)
+    
+    return _db_agent_response_result(response)
@@ -0,0 +1,206 @@
+"""
+Quality Gate 노드 - 검증 에이전트 병렬 실행
+
+reviewer / tester / security / ux_designer를 현재 code.tsx에 대해 동시에 실행하고,
+하나라도 블로킹 실패를 반환하면 나머지 검증을 즉시 취소
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Tuple, Type
+
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel
+
+from agents.state import AgentState, Artifact, QualityCheck, AgentError
+from agents.schemas import ReviewOutput, TesterOutput, SecurityOutput, UXDesignerOutput
+from agents.utils.structured import invoke_structured, ainvoke_structured
+from agents.registry import VERIFIER_AGENTS
+from agents.utils.llm_factory import create_llm_for_agent
+from agents.utils.streaming import emit_progress
+from agents.nodes.agents import (
+    _build_reviewer_messages,
+    _review_outcome,
+    _build_tester_messages,
+    _test_artifact,
+    _build_security_messages,
+    _build_ux_designer_messages,
+)
+
+
+# === 검증 결과 변환 ===
+
+def _verdict_check(checker: str, verdict: str, issues: List[str], suggestions: List[str]) -> QualityCheck:
+    """검증된 verdict 출력을 QualityCheck로 변환"""
+    return {
+        "checker": checker,
+        "passed": verdict != "fail",
+        "issues": issues,
+        "suggestions": suggestions,
+        "checked_at": datetime.now().isoformat()
+    }
+
+
+def _reviewer_outcome(
+    state: AgentState, output: ReviewOutput, response: AIMessage
+) -> Tuple[QualityCheck, Dict[str, Artifact]]:
+    quality_check, artifact = _review_outcome(state, output, response)
+    return quality_check, {"review.md": artifact}
+
+
+def _tester_outcome(
+    state: AgentState, output: TesterOutput, response: AIMessage
+) -> Tuple[QualityCheck, Dict[str, Artifact]]:
+    quality_check = _verdict_check("tester", output.verdict, output.failures, [])
+    return quality_check, {"test.ts": _test_artifact(state, response)}
+
+
+def _security_outcome(
+    state: AgentState, output: SecurityOutput, response: AIMessage
+) -> Tuple[QualityCheck, Dict[str, Artifact]]:
+    return _verdict_check("security", output.verdict, output.vulnerabilities, output.recommendations), {}
+
+
+def _ux_designer_outcome(
+    state: AgentState, output: UXDesignerOutput, response: AIMessage
+) -> Tuple[QualityCheck, Dict[str, Artifact]]:
+    return _verdict_check("ux_designer", output.verdict, output.ux_issues, output.suggestions), {}
+
+
+# 검증 에이전트별 (프롬프트 구성, 출력 스키마, 결과 변환)
+VERIFIER_SPECS: Dict[str, Tuple[Callable[[AgentState], list], Type[BaseModel], Callable]] = {
+    "reviewer": (_build_reviewer_messages, ReviewOutput, _reviewer_outcome),
+    "tester": (_build_tester_messages, TesterOutput, _tester_outcome),
+    "security": (_build_security_messages, SecurityOutput, _security_outcome),
+    "ux_designer": (_build_ux_designer_messages, UXDesignerOutput, _ux_designer_outcome),
+}
+
+
+def get_gate_agents(state: AgentState) -> List[str]:
+    """실행할 검증 에이전트 목록 (지정 없으면 reviewer)"""
+    agents = [a for a in state.get("quality_gate_agents") or [] if a in VERIFIER_SPECS]
+    return agents or ["reviewer"]
+
+
+def is_blocking(quality_check: QualityCheck) -> bool:
+    """나머지 검증을 취소해야 하는 실패인지 여부"""
+    return not quality_check["passed"]
+
+
+def _verifier_error(name: str, e: Exception) -> AgentError:
+    print(f"[QUALITY_GATE] {name} 실행 실패: {e}")
+    return AgentError(
+        agent=name,
+        error_type=type(e).__name__,
+        message=str(e),
+        recoverable=True,
+        occurred_at=datetime.now().isoformat()
+    )
+
+
+def _gate_result(
+    state: AgentState,
+    outcomes: List[Tuple[str, QualityCheck, Dict[str, Artifact]]],
+    errors: List[AgentError],
+    cancelled: List[str]
+) -> Dict[str, Any]:
+    """검증 결과를 상태 업데이트로 변환"""
+    artifacts: Dict[str, Artifact] = {}
+    lines = []
+    for name, quality_check, new_artifacts in outcomes:
+        artifacts.update(new_artifacts)
+        status = "✅ 통과" if quality_check["passed"] else "❌ 실패"
+        issues = ", ".join(quality_check["issues"][:3]) if quality_check["issues"] else "없음"
+        lines.append(f"- {name}: {status} (이슈: {issues})")
+    for error in errors:
+        lines.append(f"- {error['agent']}: ⚠️ 실행 실패 ({error['error_type']})")
+    if cancelled:
+        lines.append(f"- 취소됨: {', '.join(cancelled)}")
+    
+    summary = "[QualityGate] 품질 검증 결과\n" + "\n".join(lines)
+    print(summary)
+    
+    result = {
+        "messages": [AIMessage(content=summary)],
+        "artifacts": artifacts,
+        "quality_checks": [quality_check for _, quality_check, _ in outcomes],
+        "quality_gate_agents": [],
+        "next_agent": "orchestrator"
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+# === 노드 ===
+
+def quality_gate_node(state: AgentState) -> Dict[str, Any]:
+    """Quality Gate 노드 (sync: 순차 실행, 블로킹 실패 시 중단)"""
+    agents = get_gate_agents(state)
+    print(f"\n[QUALITY_GATE] 검증 시작: {agents}")
+    
+    outcomes, errors = [], []
+    for i, name in enumerate(agents):
+        build_messages, schema, to_outcome = VERIFIER_SPECS[name]
+        try:
+            output, response = invoke_structured(create_llm_for_agent(name), build_messages(state), schema, name)
+        except Exception as e:
+            errors.append(_verifier_error(name, e))
+            continue
+        quality_check, new_artifacts = to_outcome(state, output, response)
+        outcomes.append((name, quality_check, new_artifacts))
+        emit_progress("quality_gate", "verified", checker=name, passed=quality_check["passed"])
+        if is_blocking(quality_check):
+            return _gate_result(state, outcomes, errors, agents[i + 1:])
+    
+    return _gate_result(state, outcomes, errors, [])
+
+
+async def aquality_gate_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Quality Gate 노드 (async: 병렬 실행)
+    
+    검증 시간 = 가장 느린 검증 에이전트 하나의 시간.
+    블로킹 실패가 나오면 아직 진행 중인 검증을 취소
+    """
+    agents = get_gate_agents(state)
+    print(f"\n[QUALITY_GATE] 병렬 검증 시작: {agents}")
+    
+    async def run_verifier(name: str) -> Tuple[BaseModel, AIMessage]:
+        build_messages, schema, _ = VERIFIER_SPECS[name]
+        return await ainvoke_structured(create_llm_for_agent(name), build_messages(state), schema, name)
+    
+    tasks = {asyncio.create_task(run_verifier(name)): name for name in agents}
+    pending = set(tasks)
+    outcomes, errors = [], []
+    blocked_by: Optional[str] = None
+    
+    try:
+        while pending and blocked_by is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                try:
+                    output, response = task.result()
+                except Exception as e:
+                    errors.append(_verifier_error(name, e))
+                    continue
+                _, _, to_outcome = VERIFIER_SPECS[name]
+                quality_check, new_artifacts = to_outcome(state, output, response)
+                outcomes.append((name, quality_check, new_artifacts))
+                emit_progress("quality_gate", "verified", checker=name, passed=quality_check["passed"])
+                if is_blocking(quality_check) and blocked_by is None:
+                    blocked_by = name
+    finally:
+        # 블로킹 실패 또는 상위 취소 시 남은 검증 취소
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    pending_names = {tasks[task] for task in pending}
+    cancelled = [name for name in agents if name in pending_names]
+    if blocked_by:
+        print(f"[QUALITY_GATE] {blocked_by} 블로킹 실패 → 취소: {cancelled}")
+    
+    return _gate_result(state, outcomes, errors, cancelled)
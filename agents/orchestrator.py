@@ -4,9 +4,9 @@ Orchestrator Node - 멀티 에이전트 지휘자
 LLM 기반 동적 라우팅 및 품질 루프 관리
 """
 
+import asyncio
 import json
-import re
-from typing import Dict, Any, Optional, Literal
+from typing import Dict, Any, Optional, Literal, Tuple
 from datetime import datetime
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
@@ -20,36 +20,34 @@ from agents.state import (
     should_continue_iteration,
     get_failed_quality_checks
 )
-from agents.registry import AGENT_REGISTRY, get_agent_names
-from agents.utils.llm_factory import get_orchestrator_llm
+from agents.registry import AGENT_REGISTRY, VERIFIER_AGENTS, get_agent_names
+from agents.utils.llm_factory import get_orchestrator_llm, ORCHESTRATOR_MODEL
+from agents.utils.prompt_cache import cached_system_message
+from agents.schemas import PlanOutput, DecisionOutput
+from agents.utils.structured import invoke_structured, ainvoke_structured, parse_json_text
+from agents.routing_rules import ROUTING_STATS, decide_by_rules, latest_check_round
+from agents.plan_index import (
+    PlanMatch,
+    get_plan_index,
+    plan_template,
+    REUSE_THRESHOLD,
+    DRAFT_THRESHOLD
+)
 from agents.prompts.orchestrator import (
     ORCHESTRATOR_SYSTEM_PROMPT,
     CREATE_PLAN_PROMPT,
+    PLAN_DRAFT_PROMPT,
     DECIDE_NEXT_STEP_PROMPT
 )
 
 
+# 총 단계 수 제한 (API 비용 보호)
+MAX_TOTAL_STEPS = 15
+
+
 def extract_json_from_response(response: str) -> Optional[Dict]:
-    """LLM 응답에서 JSON 추출"""
-    # 코드 블록 내 JSON 추출 시도
-    json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response)
-    if json_match:
-        try:
-            return json.loads(json_match.group(1))
-        except json.JSONDecodeError:
-            pass
-    
-    # 전체 응답에서 JSON 객체 추출 시도
-    try:
-        # { }로 시작하는 JSON 찾기
-        start = response.find('{')
-        end = response.rfind('}') + 1
-        if start != -1 and end > start:
-            return json.loads(response[start:end])
-    except json.JSONDecodeError:
-        pass
-    
-    return None
+    """LLM 응답에서 JSON 추출 (코드 펜스/설명 문장/중첩 객체 대응)"""
+    return parse_json_text(response)
 
 
 def get_user_request(state: AgentState) -> str:
@@ -95,15 +93,26 @@ def get_completed_steps_summary(state: AgentState) -> str:
     return f"{len(completed)}/{len(steps)} 단계 완료"
 
 
-def create_execution_plan(state: AgentState) -> Dict[str, Any]:
-    """실행 계획 생성"""
-    llm = get_orchestrator_llm()
-    
-    # 프롬프트 구성
-    system_prompt = ORCHESTRATOR_SYSTEM_PROMPT.format(
-        agent_registry=AGENT_REGISTRY.get_registry_description()
-    )
+# (레지스트리 버전, 시스템 메시지)
+_orchestrator_system_message: Optional[Tuple[int, SystemMessage]] = None
+
+
+def get_orchestrator_system_message() -> SystemMessage:
+    """
+    Orchestrator 시스템 메시지 (에이전트 레지스트리 버전별로 한 번만 생성)
     
+    바이트 단위로 동일한 prefix를 재사용해야 프로바이더 prefix 캐시가 적중함
+    """
+    global _orchestrator_system_message
+    version = AGENT_REGISTRY.version
+    if _orchestrator_system_message is None or _orchestrator_system_message[0] != version:
+        text = ORCHESTRATOR_SYSTEM_PROMPT.format(agent_registry=AGENT_REGISTRY.get_registry_description())
+        _orchestrator_system_message = (version, cached_system_message(ORCHESTRATOR_MODEL, text))
+    return _orchestrator_system_message[1]
+
+
+def _build_plan_messages(state: AgentState, draft: Optional[PlanMatch] = None) -> list:
+    """실행 계획 생성 프롬프트 구성 (유사 계획이 있으면 초안으로 포함)"""
     user_request = get_user_request(state)
     project_context = state.get("project_context") or {}
     
@@ -112,26 +121,22 @@ def create_execution_plan(state: AgentState) -> Dict[str, Any]:
         project_context=json.dumps(project_context, ensure_ascii=False) if project_context else "없음"
     )
     
-    # LLM 호출
-    messages = [
-        SystemMessage(content=system_prompt),
+    if draft:
+        plan_prompt = PLAN_DRAFT_PROMPT.format(
+            score=draft.score,
+            draft_request=draft.request,
+            draft_plan=json.dumps(draft.plan, ensure_ascii=False, indent=2)
+        ) + plan_prompt
+    
+    return [
+        get_orchestrator_system_message(),
         HumanMessage(content=plan_prompt)
     ]
-    
-    response = llm.invoke(messages)
-    plan_json = extract_json_from_response(response.content)
-    
-    if not plan_json:
-        # 파싱 실패 시 기본 계획
-        plan_json = {
-            "goal": user_request,
-            "required_agents": ["planner", "coder", "reviewer"],
-            "steps": [
-                {"step_number": 1, "agent": "planner", "instruction": user_request, "expected_output": "기획안"},
-                {"step_number": 2, "agent": "coder", "instruction": "기획안에 따라 코드 작성", "expected_output": "코드"},
-                {"step_number": 3, "agent": "reviewer", "instruction": "코드 검토", "expected_output": "리뷰"}
-            ]
-        }
+
+
+def _plan_from_json(state: AgentState, plan_json: Dict[str, Any], announcement: str) -> Dict[str, Any]:
+    """계획 JSON으로 실행 계획 상태 업데이트 생성"""
+    user_request = get_user_request(state)
     
     # ExecutionPlan 생성
     execution_plan: ExecutionPlan = {
@@ -157,13 +162,90 @@ def create_execution_plan(state: AgentState) -> Dict[str, Any]:
         "execution_plan": execution_plan,
         "current_step": 1,  # 첫 번째 단계 시작 (0은 아직 시작 안 함)
         "next_agent": first_agent,
-        "messages": [AIMessage(content=f"실행 계획 생성 완료: {execution_plan['goal']}")]
+        "messages": [AIMessage(content=f"{announcement}: {execution_plan['goal']}")]
     }
 
 
-def decide_next_step(state: AgentState) -> Dict[str, Any]:
-    """다음 단계 결정"""
+def _plan_result(state: AgentState, plan: PlanOutput) -> Dict[str, Any]:
+    """검증된 계획으로 실행 계획 상태 업데이트 생성"""
+    return _plan_from_json(state, plan.model_dump(), "실행 계획 생성 완료")
+
+
+def _find_similar_plan(state: AgentState) -> Tuple[Optional[Dict[str, Any]], Optional[PlanMatch]]:
+    """
+    유사 계획 조회
+    
+    Returns:
+        (재사용 결과, LLM 초안) - 재사용 가능하면 첫 번째, 초안으로 쓸 만하면 두 번째
+    """
+    match = get_plan_index().find(get_user_request(state))
+    if match is None or match.score < DRAFT_THRESHOLD:
+        return None, None
+    
+    if match.score >= REUSE_THRESHOLD:
+        print(f"[ORCHESTRATOR] 유사 계획 재사용 (유사도 {match.score:.0%}): {match.request[:50]}")
+        return _plan_from_json(state, match.plan, f"실행 계획 재사용 (유사도 {match.score:.0%})"), None
+    
+    print(f"[ORCHESTRATOR] 유사 계획을 초안으로 사용 (유사도 {match.score:.0%})")
+    return None, match
+
+
+def _remember_successful_plan(state: AgentState) -> None:
+    """최신 코드의 품질 검증을 모두 통과한 계획을 색인에 추가"""
+    plan = state.get("execution_plan")
+    latest_round = latest_check_round(state)
+    if not plan or not latest_round or not all(qc["passed"] for qc in latest_round):
+        return
+    
+    try:
+        get_plan_index().add(get_user_request(state), plan_template(plan))
+    except OSError as e:
+        print(f"[ORCHESTRATOR] ⚠️ 계획 색인 저장 실패: {e}")
+
+
+def create_execution_plan(state: AgentState) -> Dict[str, Any]:
+    """실행 계획 생성 (유사 계획 재사용 우선)"""
+    reused, draft = _find_similar_plan(state)
+    if reused is not None:
+        return reused
+    
+    llm = get_orchestrator_llm(cache=True)
+    plan, _ = invoke_structured(llm, _build_plan_messages(state, draft), PlanOutput, "orchestrator")
+    return _plan_result(state, plan)
+
+
+async def acreate_execution_plan(state: AgentState) -> Dict[str, Any]:
+    """실행 계획 생성 (async)"""
+    # 색인 조회는 첫 호출 시 JSON 파일 로드 → 이벤트 루프를 막지 않도록 스레드에서 실행
+    reused, draft = await asyncio.to_thread(_find_similar_plan, state)
+    if reused is not None:
+        return reused
+    
+    llm = get_orchestrator_llm(cache=True)
+    plan, _ = await ainvoke_structured(llm, _build_plan_messages(state, draft), PlanOutput, "orchestrator")
+    return _plan_result(state, plan)
+
+
+def collect_verifier_steps(steps: list, start: int) -> list:
+    """start부터 연속된 검증 단계의 에이전트 목록 (중복 제외)"""
+    agents = []
+    for step in steps[start:]:
+        if step["agent"] not in VERIFIER_AGENTS:
+            break
+        if step["agent"] not in agents:
+            agents.append(step["agent"])
+    return agents
+
+
+def _decide_without_llm(state: AgentState) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    LLM 없이 결정 가능한 경우 처리
     
+    반복/단계 제한 및 첫 사이클의 실행 계획 따르기.
+    
+    Returns:
+        (경로 이름, 상태 업데이트) 또는 결정할 수 없으면 None
+    """
     iteration_count = state.get("iteration_count", 0)
     max_iterations = state.get("max_iterations", 5)  # 유저 피드백 최대 5회
     current_step = state.get("current_step", 0)
@@ -173,16 +255,15 @@ def decide_next_step(state: AgentState) -> Dict[str, Any]:
     # 1. 최대 반복 횟수 초과
     if iteration_count >= max_iterations:
         print(f"[ORCHESTRATOR] ⚠️ 최대 반복 횟수({max_iterations}회) 도달. 강제 종료.")
-        return {
+        return "limit", {
             "next_agent": "finish",
             "messages": [AIMessage(content=f"⚠️ 최대 반복 횟수({max_iterations}회)에 도달했습니다. 현재까지의 결과로 작업을 완료합니다.")]
         }
     
     # 2. 총 단계 수 제한 (API 비용 보호)
-    MAX_TOTAL_STEPS = 15
     if current_step >= MAX_TOTAL_STEPS:
         print(f"[ORCHESTRATOR] ⚠️ 총 단계 수({MAX_TOTAL_STEPS}) 초과. 강제 종료.")
-        return {
+        return "limit", {
             "next_agent": "finish",
             "messages": [AIMessage(content=f"⚠️ 총 단계 수({MAX_TOTAL_STEPS})를 초과했습니다. 현재까지의 결과로 작업을 완료합니다.")]
         }
@@ -195,10 +276,24 @@ def decide_next_step(state: AgentState) -> Dict[str, Any]:
     if iteration_count == 0 and plan:
         steps = plan.get("steps", [])
         if current_step < len(steps):
+            # 연속된 검증 단계가 2개 이상이면 quality_gate에서 병렬 실행
+            verifiers = collect_verifier_steps(steps, current_step)
+            if len(verifiers) > 1:
+                step_count = 0
+                while current_step + step_count < len(steps) and steps[current_step + step_count]["agent"] in verifiers:
+                    step_count += 1
+                print(f"[ORCHESTRATOR] 실행 계획 따르기: step {current_step + 1}-{current_step + step_count}/{len(steps)} → quality_gate {verifiers}")
+                return "plan", {
+                    "next_agent": "quality_gate",
+                    "quality_gate_agents": verifiers,
+                    "current_step": current_step + step_count,
+                    "messages": [AIMessage(content=f"[계획] 품질 검증 병렬 실행: {', '.join(verifiers)}")]
+                }
+            
             next_step = steps[current_step]
             next_agent = next_step["agent"]
             print(f"[ORCHESTRATOR] 실행 계획 따르기: step {current_step + 1}/{len(steps)} → {next_agent}")
-            return {
+            return "plan", {
                 "next_agent": next_agent,
                 "current_step": current_step + 1,
                 "messages": [AIMessage(content=f"[계획] {next_step.get('instruction', next_agent + ' 작업 수행')}")]
@@ -206,19 +301,38 @@ def decide_next_step(state: AgentState) -> Dict[str, Any]:
         else:
             # 모든 단계 완료
             print(f"[ORCHESTRATOR] 모든 실행 계획 단계 완료. finish로 이동")
-            return {
+            return "plan", {
                 "next_agent": "finish",
                 "messages": [AIMessage(content="✅ 모든 계획된 작업이 완료되었습니다.")]
             }
     
-    # iteration_count > 0이면 리뷰/수정 사이클 중 - LLM 판단 사용
-    llm = get_orchestrator_llm()
-    
-    # 프롬프트 구성
-    system_prompt = ORCHESTRATOR_SYSTEM_PROMPT.format(
-        agent_registry=AGENT_REGISTRY.get_registry_description()
-    )
+    return None
+
+
+def _decide_locally(state: AgentState) -> Optional[Dict[str, Any]]:
+    """
+    제한/계획/규칙으로 결정 시도 (LLM 호출 없음)
     
+    결정 경로를 ROUTING_STATS에 기록. 모호한 상태면 None (LLM 경로로 기록)
+    """
+    decided = _decide_without_llm(state)
+    if decided is None and state.get("iteration_count", 0) > 0:
+        decided = decide_by_rules(state)
+    
+    if decided is None:
+        ROUTING_STATS.record("llm")
+        return None
+    
+    path, result = decided
+    ROUTING_STATS.record(path)
+    if path.startswith("rule:"):
+        stats = ROUTING_STATS.snapshot()
+        print(f"[ORCHESTRATOR] 규칙 결정 ({path}) → {result.get('next_agent')} | LLM 경로 비율: {stats['llm_rate']:.0%}")
+    return result
+
+
+def _build_decide_messages(state: AgentState) -> list:
+    """다음 단계 결정 프롬프트 구성"""
     execution_plan = state.get("execution_plan")
     goal = execution_plan["goal"] if execution_plan else get_user_request(state)
     
@@ -235,58 +349,48 @@ def decide_next_step(state: AgentState) -> Dict[str, Any]:
         completed_steps=get_completed_steps_summary(state),
         artifacts_summary=get_artifacts_summary(state),
         quality_check_summary=get_quality_check_summary(state),
-        iteration_count=iteration_count,
-        max_iterations=max_iterations,
+        iteration_count=state.get("iteration_count", 0),
+        max_iterations=state.get("max_iterations", 5),
         agent_results=agent_results or "아직 없음"
     )
     
-    # LLM 호출
-    messages = [
-        SystemMessage(content=system_prompt),
+    return [
+        get_orchestrator_system_message(),
         HumanMessage(content=decide_prompt)
     ]
-    
-    response = llm.invoke(messages)
-    decision = extract_json_from_response(response.content)
-    
-    if not decision:
-        # 파싱 실패 시 현재 단계 기반으로 결정
-        current_step = state.get("current_step", 0)
-        plan = state.get("execution_plan")
-        
-        print(f"[ORCHESTRATOR] JSON 파싱 실패. current_step={current_step}, plan에 {len(plan.get('steps', [])) if plan else 0}개 단계")
-        
-        if plan and current_step < len(plan.get("steps", [])):
-            next_step = plan["steps"][current_step]
-            print(f"[ORCHESTRATOR] 다음 단계: {next_step['agent']} (step {current_step + 1})")
-            return {
-                "next_agent": next_step["agent"],
-                "current_step": current_step + 1,
-                "messages": [AIMessage(content=f"[자동] {next_step['agent']} 에이전트 호출")]
-            }
-        else:
-            print(f"[ORCHESTRATOR] 모든 단계 완료. finish로 이동")
-            return {"next_agent": "finish"}
+
+
+def _apply_decision(state: AgentState, decision: DecisionOutput) -> Dict[str, Any]:
+    """검증된 LLM 결정을 상태 업데이트로 변환"""
+    iteration_count = state.get("iteration_count", 0)
+    max_iterations = state.get("max_iterations", 5)
+    current_step = state.get("current_step", 0)
     
     # 결정에 따른 처리
-    action = decision.get("action", "finish")
+    action = decision.action
     
     if action == "call_agent":
-        agent_name = decision.get("agent", "coder")
+        agent_name = decision.agent or "coder"
         if agent_name not in get_agent_names():
             agent_name = "coder"  # 폴백
         
         return {
             "next_agent": agent_name,
-            "current_step": state.get("current_step", 0) + 1,
-            "messages": [AIMessage(content=f"[Orchestrator] {agent_name} 에이전트 호출: {decision.get('instruction', '')}")]
+            "current_step": current_step + 1,
+            "messages": [AIMessage(content=f"[Orchestrator] {agent_name} 에이전트 호출: {decision.instruction}")]
         }
     
     elif action == "verify":
-        checker = decision.get("checker", "reviewer")
+        checkers = [c for c in decision.checkers if c in VERIFIER_AGENTS] or ["reviewer"]
+        if len(checkers) > 1:
+            return {
+                "next_agent": "quality_gate",
+                "quality_gate_agents": checkers,
+                "messages": [AIMessage(content=f"[Orchestrator] 품질 검증 병렬 요청 ({', '.join(checkers)}): {decision.target}")]
+            }
         return {
-            "next_agent": checker,
-            "messages": [AIMessage(content=f"[Orchestrator] 품질 검증 요청: {decision.get('target', '')}")]
+            "next_agent": checkers[0],
+            "messages": [AIMessage(content=f"[Orchestrator] 품질 검증 요청: {decision.target}")]
         }
     
     elif action == "refine":
@@ -300,22 +404,78 @@ def decide_next_step(state: AgentState) -> Dict[str, Any]:
                 "messages": [AIMessage(content=f"⚠️ 추가 수정이 필요하지만 반복 횟수({max_iterations}회)에 도달했습니다. 현재 결과로 완료합니다.")]
             }
         
-        agent_name = decision.get("agent", "coder")
+        agent_name = decision.agent or "coder"
         print(f"[ORCHESTRATOR] refine 요청: {agent_name} (iteration {new_iteration}/{max_iterations})")
         return {
             "next_agent": agent_name,
             "iteration_count": new_iteration,
             "current_step": current_step + 1,
-            "messages": [AIMessage(content=f"[Orchestrator] 수정 요청 ({new_iteration}/{max_iterations}회): {decision.get('feedback', '')}")]
+            "messages": [AIMessage(content=f"[Orchestrator] 수정 요청 ({new_iteration}/{max_iterations}회): {decision.feedback}")]
         }
     
     else:  # finish
         return {
             "next_agent": "finish",
-            "messages": [AIMessage(content=f"[Orchestrator] 작업 완료: {decision.get('summary', '모든 작업이 완료되었습니다.')}")]
+            "messages": [AIMessage(content=f"[Orchestrator] 작업 완료: {decision.summary or '모든 작업이 완료되었습니다.'}")]
         }
 
 
+def decide_next_step(state: AgentState) -> Dict[str, Any]:
+    """다음 단계 결정"""
+    result = _decide_locally(state)
+    if result is not None:
+        return result
+    
+    # iteration_count > 0이면 리뷰/수정 사이클 중 - LLM 판단 사용
+    llm = get_orchestrator_llm()
+    decision, _ = invoke_structured(llm, _build_decide_messages(state), DecisionOutput, "orchestrator")
+    return _apply_decision(state, decision)
+
+
+async def adecide_next_step(state: AgentState) -> Dict[str, Any]:
+    """다음 단계 결정 (async)"""
+    result = _decide_locally(state)
+    if result is not None:
+        return result
+    
+    llm = get_orchestrator_llm()
+    decision, _ = await ainvoke_structured(llm, _build_decide_messages(state), DecisionOutput, "orchestrator")
+    return _apply_decision(state, decision)
+
+
+def _log_orchestrator_state(state: AgentState) -> None:
+    """Orchestrator 진입 시 상태 로그"""
+    print(f"\n[ORCHESTRATOR] 상태 분석 중...")
+    print(f"  - 메시지 수: {len(state.get('messages', []))}")
+    print(f"  - 실행 계획: {'있음' if state.get('execution_plan') else '없음'}")
+    print(f"  - 현재 단계: {state.get('current_step', 0)}")
+    print(f"  - 반복 횟수: {state.get('iteration_count', 0)}")
+    usage = state.get("usage") or {}
+    if usage:
+        print(
+            f"  - LLM 사용량: {int(usage.get('llm_calls', 0))}회, "
+            f"입력 {int(usage.get('input_tokens', 0))} / 출력 {int(usage.get('output_tokens', 0))} 토큰, "
+            f"${usage.get('cost_usd', 0):.4f}"
+        )
+
+
+def _orchestrator_error(state: AgentState, e: Exception) -> Dict[str, Any]:
+    """Orchestrator 에러를 상태 업데이트로 변환"""
+    print(f"[ORCHESTRATOR] 에러 발생: {e}")
+    error = AgentError(
+        agent="orchestrator",
+        error_type=type(e).__name__,
+        message=str(e),
+        recoverable=True,
+        occurred_at=datetime.now().isoformat()
+    )
+    return {
+        "errors": [error],
+        "next_agent": "finish",
+        "messages": [AIMessage(content=f"[Orchestrator] 에러 발생: {e}")]
+    }
+
+
 def orchestrator_node(state: AgentState) -> Dict[str, Any]:
     """
     Orchestrator 메인 노드
@@ -323,11 +483,7 @@ def orchestrator_node(state: AgentState) -> Dict[str, Any]:
     1. 실행 계획이 없으면 계획 생성
     2. 계획이 있으면 다음 단계 결정
     """
-    print(f"\n[ORCHESTRATOR] 상태 분석 중...")
-    print(f"  - 메시지 수: {len(state.get('messages', []))}")
-    print(f"  - 실행 계획: {'있음' if state.get('execution_plan') else '없음'}")
-    print(f"  - 현재 단계: {state.get('current_step', 0)}")
-    print(f"  - 반복 횟수: {state.get('iteration_count', 0)}")
+    _log_orchestrator_state(state)
     
     try:
         if state.get("execution_plan") is None:
@@ -338,30 +494,43 @@ def orchestrator_node(state: AgentState) -> Dict[str, Any]:
             print("[ORCHESTRATOR] 다음 단계 결정 중...")
             result = decide_next_step(state)
             print(f"[ORCHESTRATOR] 결정 완료. 다음 에이전트: {result.get('next_agent')}")
+            if result.get("next_agent") == "finish":
+                _remember_successful_plan(state)
         
         return result
         
     except Exception as e:
-        print(f"[ORCHESTRATOR] 에러 발생: {e}")
-        error = AgentError(
-            agent="orchestrator",
-            error_type=type(e).__name__,
-            message=str(e),
-            recoverable=True,
-            occurred_at=datetime.now().isoformat()
-        )
-        return {
-            "errors": state.get("errors", []) + [error],
-            "next_agent": "finish",
-            "messages": [AIMessage(content=f"[Orchestrator] 에러 발생: {e}")]
-        }
+        return _orchestrator_error(state, e)
+
+
+async def aorchestrator_node(state: AgentState) -> Dict[str, Any]:
+    """Orchestrator 메인 노드 (async)"""
+    _log_orchestrator_state(state)
+    
+    try:
+        if state.get("execution_plan") is None:
+            print("[ORCHESTRATOR] 실행 계획 생성 중...")
+            result = await acreate_execution_plan(state)
+            print(f"[ORCHESTRATOR] 계획 생성 완료. 첫 에이전트: {result.get('next_agent')}")
+        else:
+            print("[ORCHESTRATOR] 다음 단계 결정 중...")
+            result = await adecide_next_step(state)
+            print(f"[ORCHESTRATOR] 결정 완료. 다음 에이전트: {result.get('next_agent')}")
+            if result.get("next_agent") == "finish":
+                # 색인 JSON 파일 저장 (동기 파일 I/O)
+                await asyncio.to_thread(_remember_successful_plan, state)
+        
+        return result
+        
+    except Exception as e:
+        return _orchestrator_error(state, e)
 
 
 def route_from_orchestrator(state: AgentState) -> str:
     """Orchestrator 라우팅 함수"""
     next_agent = state.get("next_agent", "finish")
     
-    valid_agents = get_agent_names() + ["finish"]
+    valid_agents = get_agent_names() + ["quality_gate", "finish"]
     if next_agent not in valid_agents:
         print(f"[ROUTER] 알 수 없는 에이전트: {next_agent}, finish로 폴백")
         return "finish"
@@ -0,0 +1,239 @@
+"""
+Plan Index - 유사 요청 실행 계획 재사용
+
+성공적으로 완료된 실행 계획을 사용자 요청의 문자 n-gram MinHash로 색인.
+새 요청과 충분히 유사하면 계획을 그대로 재사용하고, 어느 정도 유사하면
+LLM에 초안으로 전달하여 계획 생성 비용을 줄임
+
+환경 변수:
+- VIBRIC_PLAN_INDEX_MAX_ENTRIES: 최대 색인 항목 수 (기본값: 500)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any
+
+from agents.utils.storage import get_data_path
+
+
+# === 설정 ===
+
+NUM_PERM = 64          # MinHash 시그니처 길이
+BANDS = 32             # LSH 밴드 수 (밴드당 NUM_PERM // BANDS 행)
+NGRAM_SIZE = 3         # 문자 n-gram 크기 (한국어/영어 공통)
+
+REUSE_THRESHOLD = 0.85  # 이상이면 계획을 그대로 재사용
+DRAFT_THRESHOLD = 0.3   # 이상이면 LLM에 초안으로 전달
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _permutations() -> List[tuple]:
+    """결정적 MinHash 순열 계수 (프로세스 간 동일)"""
+    perms = []
+    for i in range(NUM_PERM):
+        digest = hashlib.blake2b(f"vibric-minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "big") % _MERSENNE_PRIME or 1
+        b = int.from_bytes(digest[8:], "big") % _MERSENNE_PRIME
+        perms.append((a, b))
+    return perms
+
+
+_PERMS = _permutations()
+
+
+# === MinHash ===
+
+def normalize_request(text: str) -> str:
+    """요청 정규화 (소문자, 구두점 제거, 공백 정리)"""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def shingles(text: str) -> set:
+    """정규화된 요청의 문자 n-gram 집합 (띄어쓰기 차이 무시)"""
+    text = normalize_request(text).replace(" ", "")
+    if len(text) <= NGRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def minhash(text: str) -> List[int]:
+    """MinHash 시그니처"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingles(text)
+    ]
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERM
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMS
+    ]
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """시그니처 간 추정 Jaccard 유사도"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def _band_keys(signature: List[int]) -> List[str]:
+    rows = NUM_PERM // BANDS
+    return [
+        f"{band}:{hash(tuple(signature[band * rows:(band + 1) * rows]))}"
+        for band in range(BANDS)
+    ]
+
+
+# === 색인 ===
+
+@dataclass
+class PlanMatch:
+    """유사 계획 조회 결과"""
+    request: str
+    plan: Dict[str, Any]
+    score: float
+
+
+class PlanIndex:
+    """
+    성공한 실행 계획의 유사도 색인
+    
+    - LSH 밴드 버킷으로 후보를 좁힌 뒤 MinHash 유사도로 최종 선택
+    - 항목 수 초과 시 마지막 사용 시각 기준으로 제거
+    - JSON 파일에 영속화 (추가 시마다 갱신)
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_entries: int = 500):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[str, set] = {}
+        self._load()
+    
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[PLAN_INDEX] ⚠️ 색인 로드 실패: {e}")
+            return
+        for entry in entries:
+            self._insert(entry)
+    
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self._entries.values()), f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+    
+    def _insert(self, entry: Dict[str, Any]) -> None:
+        self._entries[entry["id"]] = entry
+        for key in _band_keys(entry["signature"]):
+            self._buckets.setdefault(key, set()).add(entry["id"])
+    
+    def _remove(self, entry_id: str) -> None:
+        entry = self._entries.pop(entry_id)
+        for key in _band_keys(entry["signature"]):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+    
+    def find(self, request: str) -> Optional[PlanMatch]:
+        """가장 유사한 계획 조회 (후보가 없으면 None)"""
+        signature = minhash(request)
+        with self._lock:
+            candidates = set()
+            for key in _band_keys(signature):
+                candidates |= self._buckets.get(key, set())
+            
+            best, best_score = None, 0.0
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                score = similarity(signature, entry["signature"])
+                if score > best_score:
+                    best, best_score = entry, score
+            
+            if best is None:
+                return None
+            best["last_used"] = time.time()
+            return PlanMatch(request=best["request"], plan=best["plan"], score=best_score)
+    
+    def add(self, request: str, plan: Dict[str, Any]) -> None:
+        """성공한 계획 추가 (같은 요청이면 갱신)"""
+        normalized = normalize_request(request)
+        if not normalized:
+            return
+        entry_id = hashlib.sha1(normalized.encode()).hexdigest()
+        now = time.time()
+        with self._lock:
+            previous = self._entries.get(entry_id)
+            if previous:
+                self._remove(entry_id)
+            self._insert({
+                "id": entry_id,
+                "request": request,
+                "signature": minhash(request),
+                "plan": plan,
+                "uses": (previous or {}).get("uses", 0) + 1,
+                "created_at": (previous or {}).get("created_at", now),
+                "last_used": now,
+            })
+            
+            # 크기 제한: 가장 오래 사용되지 않은 항목 제거
+            while len(self._entries) > self.max_entries:
+                oldest = min(self._entries.values(), key=lambda e: e["last_used"])
+                self._remove(oldest["id"])
+            
+            self._save()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# === 글로벌 인스턴스 ===
+
+_plan_index: Optional[PlanIndex] = None
+_plan_index_lock = threading.Lock()
+
+
+def get_plan_index() -> PlanIndex:
+    """프로세스 전역 계획 색인 (첫 호출 시 로드)"""
+    global _plan_index
+    with _plan_index_lock:
+        if _plan_index is None:
+            _plan_index = PlanIndex(
+                str(get_data_path("plan_index.json")),
+                max_entries=int(os.getenv("VIBRIC_PLAN_INDEX_MAX_ENTRIES", "500")),
+            )
+        return _plan_index
+
+
+def plan_template(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """ExecutionPlan에서 재사용 가능한 부분만 추출 (완료 여부/생성 시각 제외)"""
+    return {
+        "goal": plan.get("goal", ""),
+        "required_agents": plan.get("required_agents", []),
+        "steps": [
+            {
+                "step_number": step.get("step_number", i + 1),
+                "agent": step.get("agent", ""),
+                "instruction": step.get("instruction", ""),
+                "expected_output": step.get("expected_output", ""),
+            }
+            for i, step in enumerate(plan.get("steps", []))
+        ],
+    }
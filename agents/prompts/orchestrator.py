@@ -50,6 +50,18 @@ CREATE_PLAN_PROMPT = """## 현재 상황
 실행 계획을 JSON으로 출력하세요:"""
 
 
+# === 유사 계획 초안 프롬프트 (CREATE_PLAN_PROMPT 앞에 추가) ===
+
+PLAN_DRAFT_PROMPT = """## 참고 계획 (유사한 요청에서 성공한 계획, 유사도 {score:.0%})
+이전 요청: {draft_request}
+```json
+{draft_plan}
+```
+현재 요청에 맞게 필요한 부분만 수정하여 사용하세요.
+
+"""
+
+
 # === 다음 단계 결정 프롬프트 ===
 
 DECIDE_NEXT_STEP_PROMPT = """## 현재 상황
@@ -73,9 +85,9 @@ DECIDE_NEXT_STEP_PROMPT = """## 현재 상황
 {{"action": "call_agent", "agent": "에이전트이름", "instruction": "구체적인 지시사항"}}
 ```
 
-2. 품질 검증 요청:
+2. 품질 검증 요청 (여러 검증자를 지정하면 병렬 실행):
 ```json
-{{"action": "verify", "checker": "reviewer", "target": "검증할 산출물"}}
+{{"action": "verify", "checkers": ["reviewer", "security"], "target": "검증할 산출물"}}
 ```
 
 3. 수정 요청 (품질 검증 실패 시):
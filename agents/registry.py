@@ -5,7 +5,7 @@ Agent Registry - 에이전트 카탈로그
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Tuple
 from enum import Enum
 
 
@@ -20,6 +20,16 @@ class AgentCapability(Enum):
     DEVOPS = "devops"
 
 
+@dataclass
+class HedgePolicy:
+    """꼬리 지연 대비 중복 요청 정책 (agents.utils.hedging)"""
+    backup_model: str               # 중복 요청/장애 전환 대상 (다른 프로바이더 권장)
+    percentile: float = 0.95        # 이 백분위 지연까지 첫 토큰(응답)이 없으면 backup에 중복 요청
+    min_delay: float = 1.0          # 관측 지연이 짧아도 최소 이만큼은 primary를 기다림
+    max_delay: float = 30.0         # 관측값이 부족할 때(워밍업) 또는 백분위가 더 클 때의 대기 상한
+    failover: bool = True           # primary 에러 시 재시도 없이 즉시 backup으로 전환
+
+
 @dataclass
 class AgentDefinition:
     """에이전트 정의"""
@@ -30,6 +40,8 @@ class AgentDefinition:
     model: str
     temperature: float = 0.7
     max_tokens: int = 4096
+    cache_responses: bool = False  # 동일 프롬프트 응답 캐시 사용 (저온도 검증 에이전트)
+    hedge: Optional[HedgePolicy] = None  # 꼬리 지연 헤징 + 장애 전환 (None이면 사용 안 함)
     
     def to_dict(self) -> Dict:
         """딕셔너리로 변환 (프롬프트에서 사용)"""
@@ -73,7 +85,8 @@ CODER_AGENT = AgentDefinition(
     ],
     model="claude-opus-4-5-20251101",
     temperature=0.3,
-    max_tokens=16384
+    max_tokens=16384,
+    hedge=HedgePolicy(backup_model="gpt-5.2")
 )
 
 TESTER_AGENT = AgentDefinition(
@@ -106,7 +119,8 @@ REVIEWER_AGENT = AgentDefinition(
     ],
     model="claude-opus-4-5-20251101",
     temperature=0.2,
-    max_tokens=8192
+    max_tokens=8192,
+    cache_responses=True
 )
 
 UX_DESIGNER_AGENT = AgentDefinition(
@@ -138,7 +152,8 @@ SECURITY_AGENT = AgentDefinition(
     ],
     model="gpt-5.2",
     temperature=0.2,
-    max_tokens=4096
+    max_tokens=4096,
+    cache_responses=True
 )
 
 DB_AGENT = AgentDefinition(
@@ -166,6 +181,8 @@ class AgentRegistry:
     
     def __init__(self):
         self._agents: Dict[str, AgentDefinition] = {}
+        self.version = 0  # 등록 변경 시 증가 (프롬프트 prefix 캐시 키)
+        self._description_cache: Optional[Tuple[int, str]] = None
         self._register_default_agents()
     
     def _register_default_agents(self):
@@ -185,6 +202,7 @@ class AgentRegistry:
     def register(self, agent: AgentDefinition) -> None:
         """에이전트 등록"""
         self._agents[agent.name] = agent
+        self.version += 1
     
     def get(self, name: str) -> Optional[AgentDefinition]:
         """에이전트 조회"""
@@ -206,7 +224,10 @@ class AgentRegistry:
         ]
     
     def get_registry_description(self) -> str:
-        """Orchestrator 프롬프트용 에이전트 카탈로그 설명"""
+        """Orchestrator 프롬프트용 에이전트 카탈로그 설명 (버전별로 한 번만 생성)"""
+        if self._description_cache and self._description_cache[0] == self.version:
+            return self._description_cache[1]
+        
         lines = []
         for agent in self._agents.values():
             lines.append(f"## {agent.name} ({agent.role})")
@@ -215,13 +236,18 @@ class AgentRegistry:
             for cap in agent.capabilities:
                 lines.append(f"  - {cap}")
             lines.append("")
-        return "\n".join(lines)
+        description = "\n".join(lines)
+        self._description_cache = (self.version, description)
+        return description
 
 
 # === 글로벌 인스턴스 ===
 
 AGENT_REGISTRY = AgentRegistry()
 
+# quality_gate에서 병렬 실행 가능한 검증 에이전트
+VERIFIER_AGENTS = ["reviewer", "tester", "security", "ux_designer"]
+
 
 # === 헬퍼 함수 ===
 
@@ -0,0 +1,205 @@
+"""
+Routing Rules - decide_next_step 결정 규칙
+
+quality_checks / execution_plan / iteration_count 만으로 결정 가능한 라우팅을
+LLM 호출 없이 처리. 규칙으로 결정할 수 없는 모호한 상태만 LLM에 위임
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Any, Optional, Tuple, List
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.state import AgentState, AgentError, QualityCheck, get_latest_artifact
+from agents.registry import VERIFIER_AGENTS
+
+
+# 검증 에이전트가 전부 실행 실패해 결과 없이 끝난 검증을 최신 코드당 몇 번까지 다시 시도할지
+MAX_VERIFY_ATTEMPTS = 2
+
+
+# === 경로별 적중률 ===
+
+class RoutingStats:
+    """결정 경로별 횟수 집계 (limit / plan / rule:* / llm)"""
+    
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, path: str) -> None:
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """경로별 횟수 및 적중률"""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        return {
+            "total": total,
+            "counts": counts,
+            "hit_rate": {path: count / total for path, count in counts.items()} if total else {},
+            "llm_rate": counts.get("llm", 0) / total if total else 0.0,
+        }
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+ROUTING_STATS = RoutingStats()
+
+
+def get_routing_stats() -> Dict[str, Any]:
+    """라우팅 경로 통계 (편의 함수)"""
+    return ROUTING_STATS.snapshot()
+
+
+# === 상태 분석 헬퍼 ===
+
+def latest_check_round(state: AgentState) -> List[QualityCheck]:
+    """최신 코드 이후 수행된 품질 검증 목록"""
+    code = get_latest_artifact(state, "code")
+    checks = state.get("quality_checks", [])
+    if not code:
+        return checks
+    return [qc for qc in checks if qc["checked_at"] >= code["created_at"]]
+
+
+def failed_verifications(state: AgentState) -> List[AgentError]:
+    """최신 코드 이후 실행 실패한 검증 에이전트 에러 목록"""
+    code = get_latest_artifact(state, "code")
+    return [
+        error for error in state.get("errors", [])
+        if error["agent"] in VERIFIER_AGENTS and (not code or error["occurred_at"] >= code["created_at"])
+    ]
+
+
+def _plan_verifiers(state: AgentState) -> List[str]:
+    """실행 계획에 포함된 검증 에이전트 목록"""
+    plan = state.get("execution_plan") or {}
+    agents = []
+    for step in plan.get("steps", []):
+        if step["agent"] in VERIFIER_AGENTS and step["agent"] not in agents:
+            agents.append(step["agent"])
+    return agents or ["reviewer"]
+
+
+# === 규칙 ===
+
+def _rule_user_feedback(state: AgentState) -> Optional[Dict[str, Any]]:
+    """마지막 메시지가 유저 피드백이면 규칙으로 판단하지 않음 (LLM 위임)"""
+    messages = state.get("messages", [])
+    if messages and isinstance(messages[-1], HumanMessage):
+        return None
+    return {}
+
+
+def _rule_refine_failed(state: AgentState) -> Optional[Dict[str, Any]]:
+    """최신 코드에 대한 검증이 실패했으면 coder에게 수정 요청"""
+    failed = [qc for qc in latest_check_round(state) if not qc["passed"]]
+    if not get_latest_artifact(state, "code") or not failed:
+        return None
+    
+    iteration_count = state.get("iteration_count", 0)
+    max_iterations = state.get("max_iterations", 5)
+    new_iteration = iteration_count + 1
+    if new_iteration >= max_iterations:
+        return {
+            "next_agent": "finish",
+            "iteration_count": new_iteration,
+            "messages": [AIMessage(content=f"⚠️ 추가 수정이 필요하지만 반복 횟수({max_iterations}회)에 도달했습니다. 현재 결과로 완료합니다.")]
+        }
+    
+    issues = [issue for qc in failed for issue in qc["issues"]][:5]
+    feedback = ", ".join(issues) if issues else f"{', '.join(qc['checker'] for qc in failed)} 검증 실패"
+    return {
+        "next_agent": "coder",
+        "iteration_count": new_iteration,
+        "current_step": state.get("current_step", 0) + 1,
+        "messages": [AIMessage(content=f"[Orchestrator] 수정 요청 ({new_iteration}/{max_iterations}회): {feedback}")]
+    }
+
+
+def _rule_verify_new_code(state: AgentState) -> Optional[Dict[str, Any]]:
+    """최신 코드가 아직 검증되지 않았으면 검증 요청 (결과 없는 검증이 반복되면 종료)"""
+    if not get_latest_artifact(state, "code") or latest_check_round(state):
+        return None
+    
+    # 결과 없이 끝난 검증 횟수 = 검증 에이전트별 실행 실패 횟수의 최댓값 (한 번에 에이전트당 최대 1건)
+    failures = Counter(error["agent"] for error in failed_verifications(state))
+    attempts = max(failures.values(), default=0)
+    if attempts >= MAX_VERIFY_ATTEMPTS:
+        failed = ", ".join(sorted(failures))
+        return {
+            "next_agent": "finish",
+            "messages": [AIMessage(content=f"⚠️ 품질 검증을 {attempts}회 시도했지만 검증 에이전트({failed}) 실행에 실패했습니다. 검증 없이 현재 결과로 완료합니다.")]
+        }
+    
+    verifiers = _plan_verifiers(state)
+    if len(verifiers) > 1:
+        return {
+            "next_agent": "quality_gate",
+            "quality_gate_agents": verifiers,
+            "messages": [AIMessage(content=f"[Orchestrator] 품질 검증 병렬 요청 ({', '.join(verifiers)}): code.tsx")]
+        }
+    return {
+        "next_agent": verifiers[0],
+        "messages": [AIMessage(content="[Orchestrator] 품질 검증 요청: code.tsx")]
+    }
+
+
+def _rule_plan_remaining(state: AgentState) -> Optional[Dict[str, Any]]:
+    """실행 계획에 남은 단계가 있으면 다음 단계 진행"""
+    plan = state.get("execution_plan")
+    current_step = state.get("current_step", 0)
+    if not plan or current_step >= len(plan.get("steps", [])):
+        return None
+    
+    next_step = plan["steps"][current_step]
+    return {
+        "next_agent": next_step["agent"],
+        "current_step": current_step + 1,
+        "messages": [AIMessage(content=f"[Orchestrator] {next_step['agent']} 에이전트 호출: {next_step.get('instruction', '')}")]
+    }
+
+
+def _rule_all_passed(state: AgentState) -> Optional[Dict[str, Any]]:
+    """계획 완료 + 최신 코드 검증 통과 시 종료"""
+    latest_round = latest_check_round(state)
+    if not latest_round or not all(qc["passed"] for qc in latest_round):
+        return None
+    
+    checkers = ", ".join(qc["checker"] for qc in latest_round)
+    return {
+        "next_agent": "finish",
+        "messages": [AIMessage(content=f"[Orchestrator] 작업 완료: 모든 품질 검증 통과 ({checkers})")]
+    }
+
+
+# 순서대로 평가. 첫 번째로 결정을 반환한 규칙이 적용됨
+ROUTING_RULES = [
+    ("refine_failed", _rule_refine_failed),
+    ("verify_new_code", _rule_verify_new_code),
+    ("plan_remaining", _rule_plan_remaining),
+    ("all_passed", _rule_all_passed),
+]
+
+
+def decide_by_rules(state: AgentState) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    규칙 기반 다음 단계 결정
+    
+    Returns:
+        (경로 이름, 상태 업데이트) 또는 모호한 상태면 None
+    """
+    if _rule_user_feedback(state) is None:
+        return None
+    
+    for name, rule in ROUTING_RULES:
+        result = rule(state)
+        if result is not None:
+            return f"rule:{name}", result
+    return None
@@ -0,0 +1,146 @@
+"""
+에이전트 출력 스키마
+
+각 에이전트의 JSON 출력 형식을 pydantic 모델로 정의.
+프로바이더 native structured output(tool calling / JSON schema)과 로컬 검증에 공통으로 사용
+"""
+
+import json
+from typing import Any, Dict, List, Literal, Optional, Type
+
+from pydantic import BaseModel, Field, field_validator
+
+
+def _to_str_list(value: Any) -> List[str]:
+    """문자열 목록으로 정규화 (객체 항목은 JSON 문자열로)"""
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [
+        item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)
+        for item in value
+    ]
+
+
+class _StrListModel(BaseModel):
+    """문자열 목록 필드를 관대하게 받는 기본 모델"""
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _coerce_str_lists(cls, value: Any, info) -> Any:
+        field = cls.model_fields.get(info.field_name)
+        if field is not None and field.annotation == List[str]:
+            return _to_str_list(value)
+        return value
+
+
+# === Orchestrator ===
+
+class PlanStepOutput(BaseModel):
+    """실행 계획 단계"""
+    step_number: int
+    agent: str = Field(description="실행할 에이전트 이름")
+    instruction: str = Field(description="에이전트에게 줄 구체적인 지시사항")
+    expected_output: str = ""
+
+
+class PlanOutput(_StrListModel):
+    """실행 계획"""
+    goal: str = Field(description="작업 목표 한 줄")
+    required_agents: List[str] = []
+    steps: List[PlanStepOutput] = Field(min_length=1)
+
+
+class DecisionOutput(_StrListModel):
+    """다음 단계 결정"""
+    action: Literal["call_agent", "verify", "refine", "finish"]
+    agent: Optional[str] = Field(default=None, description="call_agent/refine 대상 에이전트")
+    instruction: str = ""
+    checkers: List[str] = Field(default=[], description="verify 시 실행할 검증 에이전트 목록")
+    target: str = ""
+    feedback: str = ""
+    summary: str = ""
+
+
+class InterruptOutput(_StrListModel):
+    """유저 수정 요청 분석 결과"""
+    scope: Literal["reset", "modify", "append"]
+    confidence: float = Field(default=0.5, ge=0.0, le=1.0)
+    affected_agents: List[str] = []
+    reason: str = ""
+    new_instruction: str = ""
+
+
+# === 에이전트 ===
+
+class PlannerDesign(_StrListModel):
+    """완성된 설계"""
+    goal: str = ""
+    requirements: List[str] = []
+    tech_stack: List[str] = []
+    tasks: List[str] = []
+    outputs: List[str] = []
+
+
+class PlannerOutput(_StrListModel):
+    """Planner 출력"""
+    phase: Literal["understanding", "exploring", "designing", "complete"]
+    question: Optional[str] = None
+    options: List[str] = []
+    design: Optional[PlannerDesign] = None
+
+
+class CodeFile(BaseModel):
+    """생성/수정된 파일"""
+    path: str
+    content: str
+
+
+class CoderOutput(BaseModel):
+    """Coder 출력"""
+    files: List[CodeFile] = Field(min_length=1)
+    summary: str = ""
+
+
+class ReviewOutput(_StrListModel):
+    """Reviewer 출력"""
+    verdict: Literal["pass", "fail"]
+    issues: List[str] = []
+    summary: str = ""
+
+
+class TesterOutput(_StrListModel):
+    """Tester 출력"""
+    test_cases: List[str] = []
+    test_code: str = ""
+    verdict: Literal["pass", "fail"] = "pass"
+    failures: List[str] = []
+    summary: str = ""
+
+
+class SecurityOutput(_StrListModel):
+    """Security 출력"""
+    verdict: Literal["pass", "fail"]
+    vulnerabilities: List[str] = []
+    recommendations: List[str] = []
+    summary: str = ""
+
+
+class UXDesignerOutput(_StrListModel):
+    """UX Designer 출력"""
+    verdict: Literal["pass", "fail"]
+    ux_issues: List[str] = []
+    suggestions: List[str] = []
+    summary: str = ""
+
+
+# 에이전트 이름 → 출력 스키마
+AGENT_OUTPUT_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "planner": PlannerOutput,
+    "coder": CoderOutput,
+    "reviewer": ReviewOutput,
+    "tester": TesterOutput,
+    "security": SecurityOutput,
+    "ux_designer": UXDesignerOutput,
+}
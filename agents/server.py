@@ -3,26 +3,62 @@ LangGraph WebSocket Server
 
 FastAPI + WebSocket 기반 LangGraph 서버
 Vibric 프론트엔드와 실시간 통신
+
+여러 워커 프로세스로 실행 가능 (VIBRIC_WORKERS, 같은 VIBRIC_DATA_DIR 공유):
+- 세션 상태는 체크포인터에만 있음 → 어느 워커든 session_id로 접속해 이어서 실행
+- 실행 이벤트는 세션 버스에 기록 → 클라이언트 소켓을 가진 워커가 구독해서 전달
+  (재접속 시 last_event_id 이후 이벤트를 재전송, 다른 워커에서 진행 중인 실행도 이어서 수신)
+- 세션별 실행 리스 → 같은 세션의 실행은 모든 워커를 통틀어 하나만
+- 실행 스케줄러/프로바이더 리미터의 전역 상한은 워커 수로 나눈 몫을 워커마다 적용
 """
 
 import asyncio
 import json
-from typing import Optional
+import os
+import uuid
+from typing import Optional, Any
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from langgraph.types import interrupt, Command
+from langgraph.types import Command
+from langchain_core.messages import AIMessageChunk, HumanMessage
+from langgraph.graph.message import add_messages
+
+from agents.graph import create_agent_graph
+from agents.state import create_initial_state, get_artifact_content
+from agents.utils.llm_factory import warmup_llm_registry, warmup_llm_connections, clear_llm_registry
+from agents.utils.compaction import ConversationCompactor
+from agents.utils.streaming import message_text
+from agents.utils.metrics import EVENT_LOOP_LAG, MODEL_LATENCY, render_metrics
+from agents.utils.tracing import trace_span
+from agents.utils.checkpointer import get_checkpointer
+from agents.utils.rate_limit import get_rate_limit_stats
+from agents.utils.scheduler import PRIORITIES, SchedulerBusy, get_scheduler
+from agents.utils.session_bus import WORKER_ID, get_session_bus
+
 
-from agents.graph import app_graph
-from agents.state import create_initial_state
+# 서버용 그래프: 세션 상태를 로컬 SQLite 체크포인터에 저장 → 재시작/재접속 후에도 이어서 실행
+# (langgraph dev용 app_graph는 자체 체크포인터를 사용)
+server_graph = create_agent_graph(checkpointer=get_checkpointer())
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 시작/종료 시 실행"""
     print("[Server] LangGraph WebSocket Server starting...")
+    
+    # LLM 클라이언트 사전 생성 + 커넥션 풀 연결 (첫 요청의 생성/연결 비용 제거)
+    ready = await asyncio.to_thread(warmup_llm_registry)
+    print(f"[Server] LLM registry ready: {[name for name, ok in ready.items() if ok]}")
+    connected = await warmup_llm_connections()
+    print(f"[Server] LLM connections warmed: {[name for name, ok in connected.items() if ok]}")
+    
+    EVENT_LOOP_LAG.start()
     yield
+    EVENT_LOOP_LAG.stop()
+    clear_llm_registry()
     print("[Server] Server shutting down...")
 
 
@@ -42,7 +78,7 @@ app.add_middleware(
 
 
 class ConnectionManager:
-    """WebSocket 연결 관리"""
+    """WebSocket 연결 관리 (이 워커의 연결만, 세션 이벤트 전달은 세션 버스)"""
     
     def __init__(self):
         self.active_connections: list[WebSocket] = []
@@ -68,15 +104,216 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+# 확인 요청에서 대신 호출할 수 있는 에이전트
+ALTERNATIVE_AGENTS = ["planner", "coder", "reviewer", "db_agent"]
+
+
+def _pending_interrupt(snapshot) -> Optional[tuple]:
+    """체크포인트에서 응답을 기다리는 interrupt (에이전트 이름, Interrupt) 조회"""
+    for task in snapshot.tasks:
+        if task.interrupts:
+            pending = task.interrupts[0]
+            # 확인 노드(<agent>_approval)는 페이로드에 원래 에이전트 이름을 담음
+            agent = pending.value.get("agent", task.name) if isinstance(pending.value, dict) else task.name
+            return agent, pending
+    return None
+
+
+def _interrupt_frame(agent: str, pending: Any) -> dict:
+    """노드 interrupt() 페이로드 → interrupt 프레임"""
+    payload = pending.value if isinstance(pending.value, dict) else {"message": str(pending.value)}
+    return {
+        "type": "interrupt",
+        "agent": agent,
+        "interrupt_id": pending.id,
+        "stage": payload.get("stage", ""),
+        "preview": payload.get("preview", ""),
+        "confirmation": {
+            "agent": agent,
+            "instruction": payload.get("message", f"{agent} 에이전트 결과를 확인해주세요."),
+            "alternatives": [name for name in ALTERNATIVE_AGENTS if name != agent]
+        }
+    }
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """메인 WebSocket 엔드포인트"""
     await manager.connect(websocket)
     
-    # 세션별 상태
-    thread_id = f"session-{id(websocket)}"
-    graph_state = create_initial_state()
-    pending_interrupt = False
+    # 세션별 상태 (session_id로 재접속하면 체크포인트에서 복원)
+    thread_id = websocket.query_params.get("session_id") or f"session-{uuid.uuid4().hex}"
+    user_id = websocket.query_params.get("user_id") or thread_id  # 유저별 동시 실행 상한 기준
+    config = {"configurable": {"thread_id": thread_id}}
+    bus = get_session_bus()
+    # 재접속: 마지막으로 받은 이벤트 이후부터 재전송, 새 접속: 지금부터
+    last_event_id = websocket.query_params.get("last_event_id", "")
+    replay = last_event_id.isdigit()
+    after_id = int(last_event_id) if replay else bus.last_id(thread_id)
+    graph_state: dict = {}
+    restored = False
+    pending_interrupt: Optional[tuple] = None  # (에이전트, Interrupt)
+    sent_artifacts: dict = {}  # file_path -> 마지막으로 전송한 digest
+    compactor = ConversationCompactor()
+    
+    async def load_session() -> None:
+        """체크포인트에서 세션 상태 갱신 (다른 워커/소켓이 이어서 실행했을 수 있음)"""
+        nonlocal graph_state, restored, pending_interrupt
+        snapshot = await server_graph.aget_state(config)
+        restored = bool(snapshot.values)
+        graph_state = dict(snapshot.values) if restored else create_initial_state(session_id=thread_id)
+        pending_interrupt = _pending_interrupt(snapshot) if restored else None
+    
+    def publish(frame: dict) -> None:
+        """실행 이벤트를 세션 버스로 (소켓을 가진 워커의 forward_events가 전달)"""
+        bus.publish(thread_id, frame)
+    
+    async def forward_events() -> None:
+        """세션 버스 → 소켓 (프레임에 재접속용 event_id를 붙임)"""
+        try:
+            async for event_id, frame in bus.subscribe(thread_id, after_id):
+                await manager.send_json(websocket, {**frame, "event_id": event_id})
+        except Exception as e:
+            # 소켓이 닫힘 → 실행은 계속되고, 재접속한 소켓이 last_event_id부터 이어서 받음
+            print(f"[WS] Event forwarding stopped: {thread_id} ({type(e).__name__})")
+    
+    async def run_graph(graph_input: Any) -> None:
+        """
+        그래프 실행 (스트리밍) - 새 턴 입력 또는 Command(resume=...)
+        
+        - messages: LLM 토큰 단위 스트리밍 → token 프레임
+        - custom: 노드 내부 진행 이벤트 → progress 프레임
+        - values: 상태 스냅샷 → message/artifact 프레임, interrupt() 발생 시 interrupt 프레임
+        """
+        nonlocal graph_state, restored, pending_interrupt
+        interrupted = False
+        with trace_span(
+            "run", "run",
+            session_id=thread_id,
+            messages=len(graph_state["messages"]),
+            resume=isinstance(graph_input, Command) or graph_input is None
+        ):
+            async for mode, chunk in server_graph.astream(
+                graph_input,
+                config=config,
+                stream_mode=["messages", "custom", "values"]
+            ):
+                if mode == "messages":
+                    msg_chunk, metadata = chunk
+                    # 노드가 직접 만든 완성 메시지는 values에서 전송
+                    if isinstance(msg_chunk, AIMessageChunk):
+                        text = message_text(msg_chunk)
+                        if text:
+                            publish({
+                                "type": "token",
+                                "agent": metadata.get("agent") or metadata.get("langgraph_node", ""),
+                                "content": text
+                            })
+                    continue
+                
+                if mode == "custom":
+                    publish(chunk if "type" in chunk else {"type": "progress", **chunk})
+                    continue
+                
+                # 노드가 interrupt()로 멈춤 → 유저 응답 대기 (체크포인트에 저장됨)
+                if "__interrupt__" in chunk:
+                    interrupted = True
+                    continue
+                
+                event = chunk
+                graph_state = {**event}  # 다음 턴 요약 판단용 (실제 상태는 체크포인터)
+                restored = True
+                next_agent = event.get("next_agent", "")
+                
+                # 메시지 스트리밍
+                messages = event.get("messages", [])
+                if messages:
+                    last_msg = messages[-1]
+                    if hasattr(last_msg, "content"):
+                        publish({
+                            "type": "message",
+                            "agent": next_agent,
+                            "content": last_msg.content
+                        })
+                
+                # Artifacts 전송 (변경된 산출물만 본문 조회)
+                artifacts = event.get("artifacts", {})
+                for path, artifact in artifacts.items():
+                    if not isinstance(artifact, dict):
+                        continue
+                    digest = artifact.get("digest")
+                    if digest and sent_artifacts.get(path) == digest:
+                        continue
+                    sent_artifacts[path] = digest
+                    publish({
+                        "type": "artifact",
+                        "artifact": {
+                            "path": path,
+                            "content": get_artifact_content(artifact)
+                        }
+                    })
+        
+        if interrupted:
+            pending_interrupt = _pending_interrupt(await server_graph.aget_state(config))
+        if pending_interrupt:
+            publish(_interrupt_frame(*pending_interrupt))
+        else:
+            # 실행 완료
+            publish({
+                "type": "status",
+                "content": "completed"
+            })
+            # 임계치를 넘었으면 다음 턴 전까지 백그라운드에서 요약
+            compactor.schedule(graph_state["messages"])
+    
+    async def notify_queued(position: int, estimated_wait: float) -> None:
+        publish({
+            "type": "status",
+            "content": "queued",
+            "position": position,
+            "estimated_wait_s": round(estimated_wait, 1)
+        })
+    
+    async def run_safely(graph_input: Any, priority: str = "interactive") -> None:
+        """
+        세션 실행 리스 + 실행 슬롯을 받아 그래프 실행
+        
+        혼잡하면 queued 후 대기, 한도 초과나 다른 워커/소켓에서 같은 세션 실행 중이면 busy
+        """
+        try:
+            async with bus.run_lease(thread_id), get_scheduler().slot(user_id, priority, on_queued=notify_queued):
+                await run_graph(graph_input)
+        except SchedulerBusy as e:
+            print(f"[WS] Run rejected ({e.reason}): {thread_id}")
+            # 실행되지 않았으므로 체크포인트 기준으로 되돌림 (재개 요청이었다면 interrupt는 그대로 대기)
+            await load_session()
+            publish({
+                "type": "status",
+                "content": "busy",
+                "reason": e.reason,
+                "retry_after_s": round(e.retry_after, 1),
+                "error": str(e)
+            })
+        except Exception as e:
+            print(f"[WS] Graph execution error: {e}")
+            publish({
+                "type": "error",
+                "error": str(e)
+            })
+    
+    await load_session()
+    await manager.send_json(websocket, {
+        "type": "session",
+        "session_id": thread_id,
+        "restored": restored,
+        "worker": WORKER_ID
+    })
+    if restored:
+        print(f"[WS] Session restored: {thread_id} (messages: {len(graph_state.get('messages', []))})")
+    if pending_interrupt and not replay:
+        # 재전송(replay)하는 경우 interrupt 프레임은 버스 이벤트에 포함됨
+        await manager.send_json(websocket, _interrupt_frame(*pending_interrupt))
+    forwarder = asyncio.create_task(forward_events())
     
     try:
         while True:
@@ -85,112 +322,96 @@ async def websocket_endpoint(websocket: WebSocket):
             message = json.loads(data)
             
             msg_type = message.get("type")
+            if msg_type in ("message", "confirm"):
+                await load_session()
             
             if msg_type == "message":
                 # 유저 메시지 처리
                 content = message.get("content", "")
+                priority = message.get("priority", "interactive")
+                if priority not in PRIORITIES:
+                    priority = "interactive"
                 print(f"[WS] User message: {content[:50]}...")
                 
-                # 상태 업데이트
-                from langchain_core.messages import HumanMessage
-                graph_state["messages"].append(HumanMessage(content=content))
+                if pending_interrupt:
+                    # 확인 대기 중인 메시지는 해당 에이전트에 대한 수정 요청 → 멈춘 지점에서 재개
+                    agent, _ = pending_interrupt
+                    print(f"[WS] Feedback for {agent}, resuming")
+                    pending_interrupt = None
+                    await run_safely(Command(resume=content), priority)
+                    continue
                 
-                # 그래프 실행 (스트리밍)
-                try:
-                    async for event in app_graph.astream(
-                        graph_state,
-                        config={"configurable": {"thread_id": thread_id}},
-                        stream_mode="values"
-                    ):
-                        # 현재 에이전트 확인
-                        next_agent = event.get("next_agent", "")
-                        
-                        # Interrupt 확인 요청
-                        if next_agent and not pending_interrupt:
-                            # 에이전트 호출 전 확인 요청
-                            await manager.send_json(websocket, {
-                                "type": "interrupt",
-                                "agent": next_agent,
-                                "confirmation": {
-                                    "agent": next_agent,
-                                    "instruction": f"{next_agent} 에이전트를 호출합니다.",
-                                    "alternatives": ["planner", "coder", "reviewer", "db_agent"]
-                                }
-                            })
-                            pending_interrupt = True
-                            break  # 확인 대기
-                        
-                        # 메시지 스트리밍
-                        messages = event.get("messages", [])
-                        if messages:
-                            last_msg = messages[-1]
-                            if hasattr(last_msg, "content"):
-                                await manager.send_json(websocket, {
-                                    "type": "message",
-                                    "agent": next_agent,
-                                    "content": last_msg.content
-                                })
-                        
-                        # Artifacts 전송
-                        artifacts = event.get("artifacts", {})
-                        for path, artifact in artifacts.items():
-                            if isinstance(artifact, dict) and "content" in artifact:
-                                await manager.send_json(websocket, {
-                                    "type": "artifact",
-                                    "artifact": {
-                                        "path": path,
-                                        "content": artifact["content"]
-                                    }
-                                })
-                    
-                    # 실행 완료
-                    if not pending_interrupt:
-                        await manager.send_json(websocket, {
-                            "type": "status",
-                            "content": "completed"
-                        })
-                        
-                except Exception as e:
-                    print(f"[WS] Graph execution error: {e}")
+                # 이번 턴 입력: 체크포인트가 있으면 변경분(요약 + 새 메시지)만 전달
+                # (이전 상태는 체크포인터가 보관, 리듀서 채널이 중복 누적되지 않음)
+                new_messages = compactor.apply(graph_state["messages"]) or []
+                new_messages.append(HumanMessage(content=content))
+                graph_state["messages"] = add_messages(graph_state["messages"], new_messages)
+                turn_input = {"messages": new_messages} if restored else graph_state
+                await run_safely(turn_input, priority)
+            
+            elif msg_type == "confirm":
+                # interrupt 응답: 멈춘 체크포인트에서 바로 재개 (route_entry/orchestrator 재실행 없음)
+                if not pending_interrupt:
                     await manager.send_json(websocket, {
                         "type": "error",
-                        "error": str(e)
+                        "error": "확인을 기다리는 작업이 없습니다."
                     })
-            
-            elif msg_type == "confirm":
-                # 에이전트 확인 응답
+                    continue
+                
                 confirm = message.get("confirm", False)
+                feedback = message.get("feedback", "")
                 alternative = message.get("alternativeAgent")
+                agent, _ = pending_interrupt
+                pending_interrupt = None
                 
-                pending_interrupt = False
-                
-                if confirm:
-                    print(f"[WS] Agent confirmed")
-                    # 그래프 계속 실행
-                    # (실제 구현에서는 Command로 재개)
+                if confirm or feedback:
+                    print(f"[WS] {agent} confirmed{' with feedback' if feedback else ''}")
+                    await run_safely(Command(resume=feedback))
+                elif alternative:
+                    # 대기 중인 에이전트 대신 다른 에이전트로 라우팅 (orchestrator 결정으로 기록)
+                    print(f"[WS] {agent} rejected, alternative: {alternative}")
+                    await server_graph.aupdate_state(
+                        config, {"next_agent": alternative, "pending_approval": None}, as_node="orchestrator"
+                    )
+                    await run_safely(None)
                 else:
-                    print(f"[WS] Agent rejected, alternative: {alternative}")
-                    if alternative:
-                        graph_state["next_agent"] = alternative
-                
-                await manager.send_json(websocket, {
-                    "type": "status",
-                    "content": "resumed"
-                })
+                    # 거절: 대기 중인 작업을 버림 (다음 메시지는 새 턴으로 처리)
+                    print(f"[WS] {agent} rejected")
+                    publish({
+                        "type": "status",
+                        "content": "cancelled"
+                    })
     
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
         print(f"[WS] Error: {e}")
         manager.disconnect(websocket)
+    finally:
+        forwarder.cancel()
+        compactor.cancel()
 
 
 @app.get("/health")
 async def health_check():
     """헬스 체크"""
-    return {"status": "healthy", "connections": len(manager.active_connections)}
+    return {
+        "status": "healthy",
+        "worker": WORKER_ID,
+        "connections": len(manager.active_connections),
+        "runs": get_scheduler().snapshot(),
+        "providers": get_rate_limit_stats(),
+        "latency": MODEL_LATENCY.snapshot()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """LLM 호출 지표 (Prometheus 텍스트 형식)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # 워커가 여러 개면 import 문자열로 넘겨야 함 (각 워커가 앱을 따로 로드)
+    uvicorn.run("agents.server:app", host="0.0.0.0", port=8000, workers=int(os.getenv("VIBRIC_WORKERS", "1")))
@@ -4,6 +4,8 @@ AgentState 및 관련 타입 정의
 프로덕션 레벨 멀티 에이전트 시스템을 위한 풍부한 상태 관리
 """
 
+import json
+import re
 from typing import List, Dict, Optional, Literal, Annotated, Any
 from typing_extensions import TypedDict
 from dataclasses import dataclass, field
@@ -11,6 +13,9 @@ from datetime import datetime
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
 
+from agents.utils.blob_store import get_blob_store
+from agents.utils.artifact_history import get_artifact_history
+
 
 # === 기본 타입 정의 ===
 
@@ -32,10 +37,16 @@ class ExecutionPlan(TypedDict):
 
 
 class Artifact(TypedDict):
-    """에이전트가 생성하는 산출물"""
+    """
+    에이전트가 생성하는 산출물
+
+    본문은 blob 저장소에 두고 상태에는 참조만 보관 (get_artifact_content로 조회)
+    """
     type: Literal["plan", "code", "test", "review", "design"]
     file_path: str
-    content: str
+    digest: str   # 본문 sha256 (blob 저장소 키)
+    size: int     # 본문 바이트 수
+    summary: str  # 짧은 요약 (메시지/로그용)
     created_by: str
     version: int
     created_at: str
@@ -75,6 +86,66 @@ class ModificationContext(TypedDict):
     original_goal: str           # 원래 목표 (reset 시에도 유지)
 
 
+class PendingApproval(TypedDict):
+    """
+    유저 확인을 기다리는 에이전트 결과 - 생성 노드가 저장, 확인 노드가 interrupt
+
+    본문은 체크포인트에 다시 싣지 않고 산출물 참조만 보관 (확인 노드가 artifacts에서 조회)
+    """
+    agent: str                   # planner | coder | reviewer
+    file_path: str               # 생성된 산출물 키 (피드백 반영 시 기준 본문)
+    message_id: str              # 피드백 반영 시 교체할 메시지 ID
+    artifact_version: int        # 생성된 산출물 버전
+    passed: Optional[bool]       # 리뷰 통과 여부 (reviewer만)
+
+
+# === 리듀서 ===
+
+def append_list(existing: Optional[List], new: Optional[List]) -> List:
+    """
+    append-only 리듀서
+    
+    노드는 새로 추가할 항목(delta)만 반환하고, 병렬 노드의 결과도 유실 없이 누적됨
+    """
+    return (existing or []) + (new or [])
+
+
+def merge_artifacts(
+    existing: Optional[Dict[str, "Artifact"]],
+    new: Optional[Dict[str, Optional["Artifact"]]]
+) -> Dict[str, "Artifact"]:
+    """
+    file_path 기준 merge 리듀서
+    
+    노드는 변경된 산출물만 반환. 값이 None인 키는 삭제하고,
+    업데이트 자체가 None이면 전체 초기화 (RESET)
+    """
+    if new is None:
+        return {}
+    merged = dict(existing or {})
+    for file_path, artifact in new.items():
+        if artifact is None:
+            merged.pop(file_path, None)
+        else:
+            merged[file_path] = artifact
+    return merged
+
+
+def add_usage(
+    existing: Optional[Dict[str, float]],
+    new: Optional[Dict[str, float]]
+) -> Dict[str, float]:
+    """
+    합산 리듀서
+
+    노드는 자신이 실행한 LLM 호출의 사용량만 반환하고 키별로 누적됨
+    """
+    merged = dict(existing or {})
+    for key, value in (new or {}).items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
 # === 메인 AgentState ===
 
 class AgentState(TypedDict):
@@ -95,21 +166,26 @@ class AgentState(TypedDict):
     current_step: int
     
     # === 작업 산출물 ===
-    artifacts: Dict[str, Artifact]  # file_path -> Artifact
+    artifacts: Annotated[Dict[str, Artifact], merge_artifacts]  # file_path -> Artifact (노드는 변경분만 반환)
     
     # === 품질 추적 ===
-    quality_checks: List[QualityCheck]
+    quality_checks: Annotated[List[QualityCheck], append_list]  # 노드는 새 결과만 반환
+    quality_gate_agents: List[str]  # quality_gate에서 병렬 실행할 검증 에이전트
     iteration_count: int
     max_iterations: int  # 기본값: 5
     
     # === 컨텍스트 ===
     project_context: Optional[ProjectContext]
     modification_context: Optional[ModificationContext]  # 수정 요청 시 설정됨
+    pending_approval: Optional[PendingApproval]  # 확인 노드가 처리할 생성 결과
     
     # === 에러 처리 ===
-    errors: List[AgentError]
+    errors: Annotated[List[AgentError], append_list]  # 노드는 새 에러만 반환
     retry_count: int
     
+    # === LLM 사용량 ===
+    usage: Annotated[Dict[str, float], add_usage]  # llm_calls, input/output/cached_tokens, cost_usd, llm_seconds
+    
     # === 메타데이터 ===
     session_id: str
     started_at: str
@@ -131,12 +207,15 @@ def create_initial_state(
         current_step=0,
         artifacts={},
         quality_checks=[],
+        quality_gate_agents=[],
         iteration_count=0,
         modification_context=None,  # 수정 요청 시 interrupt_handler가 설정
+        pending_approval=None,
         max_iterations=max_iterations,
         project_context=project_context,
         errors=[],
         retry_count=0,
+        usage={},
         session_id=session_id,
         started_at=datetime.now().isoformat()
     )
@@ -152,6 +231,68 @@ def add_artifact(state: AgentState, artifact: Artifact) -> AgentState:
     return state
 
 
+ARTIFACT_SUMMARY_LENGTH = 200
+
+
+def summarize_content(content: str) -> str:
+    """산출물 요약 (JSON의 summary 필드, 없으면 첫 줄)"""
+    match = re.search(r'"summary"\s*:\s*"((?:[^"\\]|\\.)*)"', content)
+    if match:
+        try:
+            return json.loads(f'"{match.group(1)}"')[:ARTIFACT_SUMMARY_LENGTH]
+        except json.JSONDecodeError:
+            pass
+    for line in content.splitlines():
+        line = line.strip().strip("`{").strip()
+        if line:
+            return line[:ARTIFACT_SUMMARY_LENGTH]
+    return ""
+
+
+def make_artifact(
+    artifact_type: str,
+    file_path: str,
+    content: str,
+    created_by: str,
+    version: int = 1,
+    session_id: Optional[str] = None
+) -> Artifact:
+    """
+    본문을 blob 저장소에 저장하고 참조만 담은 산출물 생성
+
+    session_id가 있으면 버전 이력에도 추가.
+    blob 저장소는 모든 세션/파일이 공유하는 내용 주소 저장소라 대체된 직전 버전의 blob도 지우지 않음
+    (같은 내용을 다른 세션/파일이 참조하고 있을 수 있음)
+    """
+    digest = get_blob_store().put(content)
+    if session_id:
+        get_artifact_history().append(session_id, file_path, content, digest)
+    
+    return Artifact(
+        type=artifact_type,
+        file_path=file_path,
+        digest=digest,
+        size=len(content.encode("utf-8")),
+        summary=summarize_content(content),
+        created_by=created_by,
+        version=version,
+        created_at=datetime.now().isoformat()
+    )
+
+
+def get_artifact_content(artifact: Optional[Artifact]) -> str:
+    """산출물 본문 조회 (이전 형식의 content 필드도 지원)"""
+    if not artifact:
+        return ""
+    if "content" in artifact:
+        return artifact["content"]
+    content = get_blob_store().get(artifact["digest"])
+    if content is None:
+        # 이전 버전에서 write 시점에 제거된 blob은 이력의 델타로 복원
+        content = get_artifact_history().find_by_digest(artifact["digest"])
+    return content or ""
+
+
 def add_quality_check(state: AgentState, check: QualityCheck) -> AgentState:
     """품질 검증 결과 추가"""
     quality_checks = state.get("quality_checks", [])
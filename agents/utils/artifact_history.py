@@ -0,0 +1,228 @@
+"""
+Artifact History - 산출물 버전 이력 (델타 압축)
+
+세션/파일 경로별 append-only 이력을 SQLite에 저장.
+첫 버전과 주기적인 keyframe은 전체 본문을, 나머지는 직전 버전 대비 줄 단위 델타만 저장.
+
+- 최신 버전: blob 저장소의 digest로 O(1) 조회
+- 이전 버전: 가장 가까운 keyframe부터 델타를 순서대로 적용해 복원
+
+환경 변수:
+- VIBRIC_HISTORY_KEYFRAME_INTERVAL: keyframe 간격 (기본값: 8)
+"""
+
+import difflib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents.utils.blob_store import get_blob_store
+from agents.utils.storage import get_data_path
+
+
+# === 델타 인코딩 ===
+# 델타는 JSON 배열: [start, end] = 직전 버전의 줄 범위 복사, 문자열 = 새로 삽입된 텍스트
+
+def make_delta(old: str, new: str) -> List[Any]:
+    """직전 버전 대비 줄 단위 델타 생성"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    delta: List[Any] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            delta.append("".join(new_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(old: str, delta: List[Any]) -> str:
+    """델타를 적용해 다음 버전 복원"""
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(payload: bytes) -> Any:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+# === 이력 저장소 ===
+
+class ArtifactHistory:
+    """
+    SQLite 기반 산출물 버전 이력
+
+    - revision은 (session_id, file_path)별로 1부터 증가
+    - keyframe_interval마다, 또는 델타가 전체 본문보다 크면 keyframe 저장
+    - blob 저장소에 본문이 없는 digest도 이력에서 복원 가능 (find_by_digest)
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = 8):
+        self.path = path
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS artifact_versions (
+                session_id TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                revision INTEGER NOT NULL,
+                is_keyframe INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (session_id, file_path, revision)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_artifact_versions_digest ON artifact_versions(digest)")
+
+    def _latest_row(self, session_id: str, file_path: str) -> Optional[Tuple[int, str, int]]:
+        """(revision, digest, 직전 keyframe 이후 델타 수)"""
+        row = self._conn.execute(
+            """SELECT revision, digest FROM artifact_versions
+               WHERE session_id = ? AND file_path = ? ORDER BY revision DESC LIMIT 1""",
+            (session_id, file_path)
+        ).fetchone()
+        if row is None:
+            return None
+        keyframe = self._conn.execute(
+            """SELECT MAX(revision) FROM artifact_versions
+               WHERE session_id = ? AND file_path = ? AND is_keyframe = 1""",
+            (session_id, file_path)
+        ).fetchone()[0]
+        return row[0], row[1], row[0] - keyframe
+
+    def append(self, session_id: str, file_path: str, content: str, digest: str) -> Optional[str]:
+        """
+        새 버전 추가
+
+        Returns:
+            대체된 직전 버전의 digest (최신 버전과 내용이 같으면 추가하지 않고 None)
+        """
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            latest = self._latest_row(session_id, file_path)
+            if latest is not None and latest[1] == digest:
+                return None
+
+            previous_digest = None
+            revision, is_keyframe, payload = 1, True, _pack(content)
+            if latest is not None:
+                revision = latest[0] + 1
+                previous_digest = latest[1]
+                previous = self._reconstruct(session_id, file_path, latest[0])
+                if previous is not None and latest[2] + 1 < self.keyframe_interval:
+                    delta_payload = _pack(make_delta(previous, content))
+                    if len(delta_payload) < len(payload):
+                        is_keyframe, payload = False, delta_payload
+
+            self._conn.execute(
+                "INSERT INTO artifact_versions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, file_path, revision, int(is_keyframe), payload, digest, size, time.time())
+            )
+        return previous_digest
+
+    def _reconstruct(self, session_id: str, file_path: str, revision: int) -> Optional[str]:
+        """가장 가까운 keyframe부터 델타를 적용해 revision 복원 (락 보유 상태에서 호출)"""
+        rows = self._conn.execute(
+            """SELECT is_keyframe, payload FROM artifact_versions
+               WHERE session_id = ? AND file_path = ? AND revision <= ? AND revision >= (
+                   SELECT MAX(revision) FROM artifact_versions
+                   WHERE session_id = ? AND file_path = ? AND revision <= ? AND is_keyframe = 1
+               )
+               ORDER BY revision""",
+            (session_id, file_path, revision, session_id, file_path, revision)
+        ).fetchall()
+        if not rows:
+            return None
+
+        content = _unpack(rows[0][1])
+        for _, payload in rows[1:]:
+            content = apply_delta(content, _unpack(payload))
+        return content
+
+    def get(self, session_id: str, file_path: str, revision: Optional[int] = None) -> Optional[str]:
+        """특정 revision 본문 조회 (None이면 최신)"""
+        if revision is None:
+            return self.latest(session_id, file_path)
+        with self._lock:
+            return self._reconstruct(session_id, file_path, revision)
+
+    def latest(self, session_id: str, file_path: str) -> Optional[str]:
+        """최신 버전 본문 (blob 저장소에서 바로 조회)"""
+        with self._lock:
+            latest = self._latest_row(session_id, file_path)
+            if latest is None:
+                return None
+            content = get_blob_store().get(latest[1])
+            if content is None:
+                content = self._reconstruct(session_id, file_path, latest[0])
+        return content
+
+    def find_by_digest(self, digest: str) -> Optional[str]:
+        """digest로 본문 복원 (blob이 제거된 이전 버전 조회용)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_id, file_path, revision FROM artifact_versions WHERE digest = ? LIMIT 1",
+                (digest,)
+            ).fetchone()
+            if row is None:
+                return None
+            return self._reconstruct(*row)
+
+    def revisions(self, session_id: str, file_path: str) -> List[Dict[str, Any]]:
+        """버전 목록 (본문 제외)"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT revision, is_keyframe, digest, size, length(payload), created_at
+                   FROM artifact_versions WHERE session_id = ? AND file_path = ? ORDER BY revision""",
+                (session_id, file_path)
+            ).fetchall()
+        return [
+            {
+                "revision": revision,
+                "keyframe": bool(is_keyframe),
+                "digest": digest,
+                "size": size,
+                "stored_bytes": stored,
+                "created_at": created_at
+            }
+            for revision, is_keyframe, digest, size, stored, created_at in rows
+        ]
+
+
+# === 전역 인스턴스 ===
+
+_artifact_history: Optional[ArtifactHistory] = None
+_artifact_history_lock = threading.Lock()
+
+
+def get_artifact_history() -> ArtifactHistory:
+    """프로세스 전역 산출물 이력 (첫 호출 시 생성)"""
+    global _artifact_history
+    with _artifact_history_lock:
+        if _artifact_history is None:
+            _artifact_history = ArtifactHistory(
+                str(get_data_path("artifact_history.sqlite")),
+                keyframe_interval=int(os.getenv("VIBRIC_HISTORY_KEYFRAME_INTERVAL", "8"))
+            )
+        return _artifact_history
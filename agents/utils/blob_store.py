@@ -0,0 +1,100 @@
+"""
+Blob Store - 내용 주소 기반(content-addressed) 산출물 저장소
+
+산출물 본문은 SHA-256 해시를 키로 로컬 디스크에 한 번만 저장하고,
+AgentState에는 해시/크기/요약만 담아 체크포인트 크기를 코드 크기와 무관하게 유지.
+읽기는 mmap으로 수행
+
+환경 변수:
+- VIBRIC_DATA_DIR: 저장 위치 (blobs/ 하위 디렉토리 사용)
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from agents.utils.storage import get_data_path
+
+
+def compute_digest(data: bytes) -> str:
+    """내용 해시 (sha256 hex)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """
+    해시 → 바이트 저장소
+
+    - 같은 내용은 한 번만 저장 (중복 제거)
+    - 쓰기는 임시 파일 + rename으로 원자적으로 수행
+    - 해시 앞 2자리로 디렉토리를 나눠 한 디렉토리의 파일 수를 제한
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, digest: str) -> Path:
+        """해시에 해당하는 파일 경로"""
+        return self.root / digest[:2] / digest[2:]
+
+    def exists(self, digest: str) -> bool:
+        return self.path_for(digest).exists()
+
+    def put(self, content: str) -> str:
+        """내용 저장 후 해시 반환 (이미 있으면 쓰지 않음)"""
+        data = content.encode("utf-8")
+        digest = compute_digest(data)
+        path = self.path_for(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest
+
+    def delete(self, digest: str) -> None:
+        """내용 삭제 (없으면 무시)"""
+        try:
+            self.path_for(digest).unlink()
+        except FileNotFoundError:
+            pass
+
+    def get(self, digest: str) -> Optional[str]:
+        """해시로 내용 조회 (없으면 None)"""
+        path = self.path_for(digest)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return ""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return mm[:].decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+
+# === 전역 인스턴스 ===
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """프로세스 전역 blob 저장소 (첫 호출 시 생성)"""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore(get_data_path("blobs"))
+        return _blob_store
@@ -0,0 +1,391 @@
+"""
+Checkpointer - SQLite(WAL) 기반 영속 체크포인터
+
+그래프 체크포인트를 로컬 SQLite에 저장해 interrupt()/재개와 서버 재시작 후 세션 복원을 지원.
+
+- 체크포인트 본문에는 채널 버전만 저장, 채널 값은 (채널, 버전)별 blob으로 분리
+  → put은 이번 superstep에서 바뀐 채널(new_versions)만 기록, 읽기는 버전 목록으로 한 번에 조회
+- 모든 테이블의 기본 키가 (thread_id, checkpoint_ns, ...)로 시작 → 스레드별 조회는 인덱스 범위 스캔
+- 직렬화: LangGraph msgpack 직렬화기 + 일정 크기 이상은 zlib 압축 (메시지 목록, 산출물 요약 등)
+- 여러 워커 프로세스가 같은 파일을 공유 → 쓰기 트랜잭션은 BEGIN IMMEDIATE로 시작해
+  다른 프로세스와 겹칠 때 중간 승격 실패(SQLITE_BUSY) 대신 busy timeout 동안 대기
+
+환경 변수:
+- VIBRIC_CHECKPOINT_PATH: DB 파일 경로 (기본값: VIBRIC_DATA_DIR/checkpoints.sqlite)
+- VIBRIC_CHECKPOINT_COMPRESS_MIN: 압축을 시도할 최소 바이트 수 (기본값: 1024)
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from agents.utils.storage import get_data_path
+
+
+# === 직렬화 ===
+
+COMPRESSED_SUFFIX = "+z"
+
+
+class CompactSerializer:
+    """
+    msgpack 직렬화 + 큰 값 zlib 압축
+
+    압축 결과가 더 작을 때만 압축본을 쓰고 타입에 "+z"를 붙여 구분
+    """
+
+    def __init__(self, inner: Optional[Any] = None, compress_min_bytes: int = 1024, level: int = 1):
+        self.inner = inner or JsonPlusSerializer()
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) >= self.compress_min_bytes:
+            packed = zlib.compress(data, self.level)
+            if len(packed) < len(data):
+                return type_ + COMPRESSED_SUFFIX, packed
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(COMPRESSED_SUFFIX):
+            type_, payload = type_[:-len(COMPRESSED_SUFFIX)], zlib.decompress(payload)
+        return self.inner.loads_typed((type_, payload))
+
+
+# === 체크포인터 ===
+
+def _parent_config(thread_id: str, checkpoint_ns: str, parent_id: Optional[str]) -> Optional[RunnableConfig]:
+    if not parent_id:
+        return None
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    SQLite 기반 체크포인터
+
+    테이블:
+    - checkpoints: 채널 값을 뺀 체크포인트 본문 + 메타데이터 + 부모 ID
+    - blobs: (채널, 버전)별 값 (바뀐 채널만 기록되므로 같은 값은 한 번만 저장)
+    - writes: 실행 중인 superstep의 태스크별 중간 쓰기 (재개 시 완료된 태스크 재실행 방지)
+    """
+
+    def __init__(self, path: str, serde: Optional[Any] = None):
+        super().__init__(serde=serde or CompactSerializer())
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                parent_id TEXT,
+                type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS blobs (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                channel TEXT NOT NULL,
+                version TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB NOT NULL,
+                task_path TEXT NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            )"""
+        )
+
+    # === 조회 ===
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        """체크포인트의 채널 버전 목록에 해당하는 값 (한 번의 쿼리)"""
+        if not versions:
+            return {}
+        pairs = [(channel, str(version)) for channel, version in versions.items()]
+        rows = self._conn.execute(
+            f"""SELECT channel, type, value FROM blobs
+                WHERE thread_id = ? AND checkpoint_ns = ?
+                AND (channel, version) IN (VALUES {", ".join(["(?, ?)"] * len(pairs))})""",
+            (thread_id, checkpoint_ns, *(item for pair in pairs for item in pair))
+        ).fetchall()
+        return {
+            channel: self.serde.loads_typed((type_, value))
+            for channel, type_, value in rows
+            if type_ != "empty"
+        }
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self._conn.execute(
+            """SELECT task_id, idx, channel, type, value, task_path FROM writes
+               WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?""",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        rows.sort(key=lambda row: writes_sort_key(row[5], row[0], row[1]))
+        return [(task_id, channel, self.serde.loads_typed((type_, value))) for task_id, _, channel, type_, value, _ in rows]
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint_b, metadata_type, metadata_b = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_b)),
+            parent_config=_parent_config(thread_id, checkpoint_ns, parent_id),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """checkpoint_id가 있으면 해당 체크포인트, 없으면 스레드의 최신 체크포인트"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"""SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                        ORDER BY checkpoint_id DESC LIMIT 1""",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """체크포인트 목록 (최신순)"""
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                result = self._to_tuple(thread_id, checkpoint_ns, tuple(row))
+            yield result
+
+    # === 저장 ===
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """체크포인트 저장 (바뀐 채널 값만 blob으로 기록)"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        body = checkpoint.copy()
+        values: Dict[str, Any] = body.pop("channel_values")  # type: ignore[misc]
+
+        blob_rows = []
+        for channel, version in new_versions.items():
+            type_, value = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+            blob_rows.append((thread_id, checkpoint_ns, channel, str(version), type_, value))
+        type_, checkpoint_b = self.serde.dumps_typed(body)
+        metadata_type, metadata_b = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blob_rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id, checkpoint_ns, checkpoint["id"],
+                        config["configurable"].get("checkpoint_id"),
+                        type_, checkpoint_b, metadata_type, metadata_b
+                    )
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """태스크 중간 쓰기 저장 (특수 쓰기는 덮어쓰고, 일반 쓰기는 이미 있으면 유지)"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        special, regular = [], []
+        for idx, (channel, value) in enumerate(writes):
+            type_, value_b = self.serde.dumps_typed(value)
+            row = (
+                thread_id, checkpoint_ns, checkpoint_id, task_id,
+                WRITES_IDX_MAP.get(channel, idx), channel, type_, value_b, task_path
+            )
+            (special if channel in WRITES_IDX_MAP else regular).append(row)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", special)
+                self._conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", regular)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_thread(self, thread_id: str) -> None:
+        """스레드의 체크포인트/값/중간 쓰기 전체 삭제"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("checkpoints", "blobs", "writes"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """정렬 가능한 문자열 버전 (InMemorySaver와 같은 형식)"""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # === async (이벤트 루프를 막지 않도록 스레드에서 실행) ===
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+# === 전역 인스턴스 ===
+
+_checkpointer: Optional[SQLiteCheckpointSaver] = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> SQLiteCheckpointSaver:
+    """프로세스 전역 체크포인터 (첫 호출 시 생성)"""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            path = os.getenv("VIBRIC_CHECKPOINT_PATH") or str(get_data_path("checkpoints.sqlite"))
+            _checkpointer = SQLiteCheckpointSaver(
+                path,
+                serde=CompactSerializer(compress_min_bytes=int(os.getenv("VIBRIC_CHECKPOINT_COMPRESS_MIN", "1024")))
+            )
+        return _checkpointer
@@ -0,0 +1,189 @@
+"""
+Conversation Compaction - 대화 메시지 롤링 압축
+
+messages 채널은 add_messages로 계속 누적되므로, 크기 임계치를 넘으면
+최근 메시지는 그대로 두고 이전 메시지를 누적 요약 메시지 하나로 접음.
+
+- 첫 HumanMessage(원래 요청)는 항상 유지 (get_user_request가 사용)
+- 요약은 이전 요약 + 새로 접히는 메시지만으로 갱신 (증분)
+- 요약 생성은 백그라운드 태스크로 수행하고, 다음 턴 시작 전에 적용
+
+환경 변수:
+- VIBRIC_COMPACT_MAX_TOKENS: 압축 시작 추정 토큰 수 (기본값: 12000)
+- VIBRIC_COMPACT_MAX_MESSAGES: 압축 시작 메시지 수 (기본값: 40)
+- VIBRIC_COMPACT_KEEP_RECENT: 그대로 유지할 최근 메시지 수 (기본값: 12)
+"""
+
+import asyncio
+import os
+from typing import List, Optional, Set, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from agents.utils.llm_factory import get_summarizer_llm
+from agents.utils.streaming import message_text
+
+
+SUMMARY_MESSAGE_ID = "conversation-summary"
+SUMMARY_PREFIX = "[대화 요약]"
+
+SUMMARIZE_PROMPT = """다음은 멀티 에이전트 작업 세션의 대화 기록입니다.
+이전 요약에 새 대화 내용을 반영하여 하나의 요약으로 갱신하세요.
+
+## 이전 요약
+{previous_summary}
+
+## 새 대화 내용
+{transcript}
+
+## 규칙
+- 유저의 요청/수정 요청, 확정된 결정, 생성된 산출물, 남은 이슈를 유지하세요
+- 코드 본문은 포함하지 말고 무엇이 바뀌었는지만 적으세요
+- 한국어 bullet 목록으로 최대 20줄"""
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """추정 토큰 수 (문자 수 / 4)"""
+    return sum(len(message_text(m)) for m in messages) // 4
+
+
+def needs_compaction(messages: List[BaseMessage]) -> bool:
+    """압축 임계치 초과 여부"""
+    return (
+        len(messages) > _env_int("VIBRIC_COMPACT_MAX_MESSAGES", 40)
+        or estimate_tokens(messages) > _env_int("VIBRIC_COMPACT_MAX_TOKENS", 12000)
+    )
+
+
+def split_messages(
+    messages: List[BaseMessage]
+) -> Tuple[Optional[BaseMessage], Optional[BaseMessage], List[BaseMessage], List[BaseMessage]]:
+    """
+    (원래 요청, 기존 요약, 요약할 이전 메시지, 유지할 최근 메시지)로 분리
+
+    최근 구간이 ToolMessage로 시작하지 않도록 경계를 앞으로 당김 (도구 호출/결과 쌍 유지)
+    """
+    pinned = next((m for m in messages if isinstance(m, HumanMessage)), None)
+    summary = next((m for m in messages if m.id == SUMMARY_MESSAGE_ID), None)
+    rest = [m for m in messages if m is not pinned and m is not summary]
+
+    cut = max(0, len(rest) - _env_int("VIBRIC_COMPACT_KEEP_RECENT", 12))
+    while cut > 0 and isinstance(rest[cut], ToolMessage):
+        cut -= 1
+    return pinned, summary, rest[:cut], rest[cut:]
+
+
+def _summary_text(summary: Optional[BaseMessage]) -> str:
+    if summary is None:
+        return ""
+    return message_text(summary).removeprefix(SUMMARY_PREFIX).strip()
+
+
+def _build_summarize_messages(previous_summary: str, old: List[BaseMessage]) -> list:
+    """요약 프롬프트 구성"""
+    transcript = "\n".join(
+        f"- ({m.type}) {message_text(m)[:1000]}" for m in old
+    )
+    return [
+        SystemMessage(content="당신은 대화 기록을 간결하게 요약하는 어시스턴트입니다."),
+        HumanMessage(content=SUMMARIZE_PROMPT.format(
+            previous_summary=previous_summary or "없음",
+            transcript=transcript
+        ))
+    ]
+
+
+def summarize(previous_summary: str, old: List[BaseMessage]) -> str:
+    """이전 요약 + 새 메시지로 요약 갱신"""
+    response = get_summarizer_llm().invoke(_build_summarize_messages(previous_summary, old))
+    return message_text(response)
+
+
+async def asummarize(previous_summary: str, old: List[BaseMessage]) -> str:
+    """이전 요약 + 새 메시지로 요약 갱신 (async)"""
+    response = await get_summarizer_llm().ainvoke(_build_summarize_messages(previous_summary, old))
+    return message_text(response)
+
+
+def compaction_updates(
+    messages: List[BaseMessage],
+    summary_text: str,
+    summarized_ids: Set[str]
+) -> List[BaseMessage]:
+    """
+    add_messages에 넘길 압축 업데이트
+
+    전체 삭제 후 [원래 요청, 요약, 요약되지 않은 메시지] 순서로 다시 추가
+    (요약 계산 이후 추가된 메시지도 그대로 유지)
+    """
+    pinned, _, rest, recent = split_messages(messages)
+    kept = [m for m in rest + recent if m.id not in summarized_ids]
+    summary = AIMessage(content=f"{SUMMARY_PREFIX}\n{summary_text}", id=SUMMARY_MESSAGE_ID)
+    return [
+        RemoveMessage(id=REMOVE_ALL_MESSAGES),
+        *([pinned] if pinned is not None else []),
+        summary,
+        *kept
+    ]
+
+
+class ConversationCompactor:
+    """
+    세션별 백그라운드 압축기
+
+    턴이 끝나면 schedule()로 요약을 백그라운드에서 만들고,
+    다음 턴 시작 전 apply()로 완료된 요약을 반영 (그래프 실행을 기다리게 하지 않음)
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._summarized_ids: Set[str] = set()
+
+    def schedule(self, messages: List[BaseMessage]) -> bool:
+        """임계치를 넘었으면 요약 태스크 시작 (이미 진행 중이면 무시)"""
+        if self._task is not None or not needs_compaction(messages):
+            return False
+
+        _, summary, old, _ = split_messages(messages)
+        old = [m for m in old if m.id]
+        if not old:
+            return False
+
+        self._summarized_ids = {m.id for m in old}
+        self._task = asyncio.create_task(asummarize(_summary_text(summary), old))
+        print(f"[COMPACT] 요약 시작: {len(old)}개 메시지 (추정 {estimate_tokens(messages)} 토큰)")
+        return True
+
+    def apply(self, messages: List[BaseMessage]) -> Optional[List[BaseMessage]]:
+        """완료된 요약이 있으면 압축 업데이트 반환 (없거나 실패하면 None)"""
+        if self._task is None or not self._task.done():
+            return None
+
+        task, self._task = self._task, None
+        try:
+            summary_text = task.result()
+        except Exception as e:
+            print(f"[COMPACT] ⚠️ 요약 실패: {e}")
+            return None
+
+        updates = compaction_updates(messages, summary_text, self._summarized_ids)
+        print(f"[COMPACT] 요약 적용: {len(messages)} → {len(updates) - 1}개 메시지")
+        return updates
+
+    def cancel(self) -> None:
+        """진행 중인 요약 취소 (연결 종료 시)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,334 @@
+"""
+Hedging - 꼬리 지연 대비 중복 요청 + 프로바이더 장애 전환
+
+HedgePolicy가 있는 에이전트의 LLM을 primary/backup 두 러너블로 감싸서:
+
+- primary가 관측된 p95(스트리밍은 첫 토큰, invoke는 전체 응답)까지 결과를 못 내면
+  backup 모델에 같은 요청을 한 번 더 보내고, 먼저 첫 청크(결과)를 낸 쪽을 채택, 다른 쪽은 취소
+- primary가 에러로 끝나면 재시도 없이(fail_fast) 바로 backup으로 전환
+- 지연 기준은 MODEL_LATENCY의 (에이전트, 모델)별 최근 샘플. 샘플이 부족하면 max_delay
+
+환경 변수:
+- VIBRIC_HEDGING: "0"이면 비활성화 (기본값: 활성)
+
+백분위 기준이라 중복 요청은 대략 (1 - percentile) 비율의 호출에만 발생.
+backup 호출은 "nostream" 태그를 달아 LangGraph messages 스트림(토큰 프레임)에 섞이지 않게 함.
+bind_tools / with_structured_output은 각 모델에서 따로 만든 러너블을 다시 헤징으로 묶음
+"""
+
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import ensure_config
+from langgraph.constants import TAG_NOSTREAM
+
+from agents.registry import HedgePolicy
+from agents.utils.metrics import METRICS, MODEL_LATENCY
+from agents.utils.rate_limit import fail_fast
+
+
+METRICS.describe("vibric_llm_hedge_total", "Hedged LLM calls by event (hedged/backup_won/failover)")
+
+PRIMARY = "primary"
+BACKUP = "backup"
+
+_DONE = object()
+
+
+def is_hedging_enabled() -> bool:
+    return os.getenv("VIBRIC_HEDGING", "1") != "0"
+
+
+class HedgedLLM(Runnable):
+    """
+    primary/backup 러너블을 경쟁시키는 러너블 (chat model 자리에 그대로 사용)
+
+    sync 호출은 스레드에서 경쟁시키며, 진 쪽 스레드는 취소할 수 없어 다음 청크에서 멈추거나
+    (invoke는) 끝까지 실행된 뒤 결과가 버려짐
+    """
+
+    def __init__(
+        self,
+        primary: Runnable,
+        backup_factory: Callable[[], Optional[Runnable]],
+        policy: HedgePolicy,
+        agent: str,
+        model: str
+    ):
+        self.primary = primary
+        self.policy = policy
+        self.agent = agent
+        self.model = model
+        self._backup_factory = backup_factory
+        self._backup: Optional[Runnable] = None
+        self._backup_lock = threading.Lock()
+
+    # === 구성 ===
+
+    def _get_backup(self) -> Optional[Runnable]:
+        """backup 러너블 (첫 사용 시 생성, API 키가 없는 등 생성 실패면 None)"""
+        with self._backup_lock:
+            if self._backup is None and self._backup_factory is not None:
+                try:
+                    self._backup = self._backup_factory()
+                except Exception as e:
+                    print(f"[HEDGE] ⚠️ {self.agent} backup 모델 준비 실패: {e}")
+                self._backup_factory = None
+            return self._backup
+
+    def _derive(self, build: Callable[[Runnable], Runnable]) -> "HedgedLLM":
+        """양쪽에 같은 변환을 적용한 새 HedgedLLM (backup 변환은 첫 사용 시)"""
+        def backup_factory() -> Optional[Runnable]:
+            backup = self._get_backup()
+            return build(backup) if backup is not None else None
+        return HedgedLLM(build(self.primary), backup_factory, self.policy, self.agent, self.model)
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "HedgedLLM":
+        return self._derive(lambda llm: llm.bind_tools(tools, **kwargs))
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> "HedgedLLM":
+        return self._derive(lambda llm: llm.with_structured_output(schema, **kwargs))
+
+    def hedge_delay(self, kind: str) -> float:
+        """backup에 중복 요청을 보내기 전 primary 대기 시간"""
+        observed = MODEL_LATENCY.percentile(self.agent, self.model, kind, self.policy.percentile)
+        if observed is None:
+            return self.policy.max_delay
+        return min(self.policy.max_delay, max(self.policy.min_delay, observed))
+
+    def _record(self, event: str) -> None:
+        METRICS.inc("vibric_llm_hedge_total", (("agent", self.agent), ("event", event)))
+
+    def _record_cancelled(self, kind: str, started: float) -> None:
+        # 취소된 primary의 경과 시간은 실제 지연의 하한 → 샘플에서 빠지면 p95가 점점 낮아져 헤징이 늘어남
+        MODEL_LATENCY.record(self.agent, self.model, kind, time.monotonic() - started)
+
+    def _backup_config(self, config: Optional[RunnableConfig]) -> RunnableConfig:
+        config = ensure_config(config)
+        return {**config, "tags": [*(config.get("tags") or []), TAG_NOSTREAM]}
+
+    # === 경쟁 (async) ===
+
+    async def _arace(
+        self,
+        kind: str,
+        calls: Dict[str, Callable[[], AsyncIterator[Any]]]
+    ) -> AsyncIterator[Any]:
+        """
+        먼저 첫 항목을 낸 쪽의 항목들을 그대로 내보냄
+
+        calls: {PRIMARY: ..., BACKUP: ...} 각 호출의 async iterator 팩토리
+        """
+        items: asyncio.Queue = asyncio.Queue()
+
+        async def pump(name: str) -> None:
+            try:
+                if name == PRIMARY and self.policy.failover and BACKUP in calls:
+                    with fail_fast():
+                        async for item in calls[name]():
+                            await items.put((name, item, None))
+                else:
+                    async for item in calls[name]():
+                        await items.put((name, item, None))
+                await items.put((name, _DONE, None))
+            except Exception as e:
+                await items.put((name, None, e))
+
+        started = time.monotonic()
+        tasks = {PRIMARY: asyncio.ensure_future(pump(PRIMARY))}
+        deadline = started + self.hedge_delay(kind)
+        winner: Optional[str] = None
+        errors: Dict[str, BaseException] = {}
+
+        def start_backup(event: str) -> bool:
+            if BACKUP not in calls or BACKUP in tasks:
+                return False
+            self._record(event)
+            tasks[BACKUP] = asyncio.ensure_future(pump(BACKUP))
+            return True
+
+        try:
+            while True:
+                timeout = None
+                if winner is None and BACKUP in calls and BACKUP not in tasks:
+                    timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    name, item, error = await asyncio.wait_for(items.get(), timeout)
+                except asyncio.TimeoutError:
+                    start_backup("hedged")
+                    continue
+
+                if winner is not None and name != winner:
+                    continue
+                if error is not None:
+                    if winner is not None:
+                        raise error
+                    errors[name] = error
+                    if name == PRIMARY and self.policy.failover and start_backup("failover"):
+                        continue
+                    if len(errors) == len(tasks):
+                        raise errors.get(PRIMARY, error)
+                    continue
+
+                if winner is None:
+                    winner = name
+                    for other, task in tasks.items():
+                        if other != name and not task.done():
+                            task.cancel()
+                            if other == PRIMARY:
+                                self._record_cancelled(kind, started)
+                    if name == BACKUP:
+                        self._record("backup_won")
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+
+    def _async_calls(self, method: str, input: Any, config: Optional[RunnableConfig], kwargs: Dict[str, Any]):
+        backup = self._get_backup()
+        targets = {PRIMARY: (self.primary, config)}
+        if backup is not None:
+            targets[BACKUP] = (backup, self._backup_config(config))
+
+        def factory(runnable: Runnable, call_config: Optional[RunnableConfig]) -> Callable[[], AsyncIterator[Any]]:
+            if method == "astream":
+                return lambda: runnable.astream(input, call_config, **kwargs)
+
+            async def one() -> AsyncIterator[Any]:
+                yield await runnable.ainvoke(input, call_config, **kwargs)
+            return one
+
+        return {name: factory(runnable, call_config) for name, (runnable, call_config) in targets.items()}
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        race = self._arace("latency", self._async_calls("ainvoke", input, config, kwargs))
+        try:
+            async for result in race:
+                return result
+        finally:
+            await race.aclose()
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        async for chunk in self._arace("ttft", self._async_calls("astream", input, config, kwargs)):
+            yield chunk
+
+    # === 경쟁 (sync, 스레드) ===
+
+    def _race(self, kind: str, calls: Dict[str, Callable[[], Iterator[Any]]]) -> Iterator[Any]:
+        """_arace의 sync 버전 (각 호출을 현재 컨텍스트를 복사한 스레드에서 실행)"""
+        items: queue.Queue = queue.Queue()
+        stop = {name: threading.Event() for name in calls}
+
+        def pump(name: str) -> None:
+            try:
+                if name == PRIMARY and self.policy.failover and BACKUP in calls:
+                    with fail_fast():
+                        self._pump_sync(name, calls[name], stop[name], items)
+                else:
+                    self._pump_sync(name, calls[name], stop[name], items)
+            except Exception as e:
+                items.put((name, None, e))
+
+        def start(name: str) -> None:
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(pump, name), daemon=True).start()
+            started_names.add(name)
+
+        started = time.monotonic()
+        started_names: set = set()
+        start(PRIMARY)
+        deadline = started + self.hedge_delay(kind)
+        winner: Optional[str] = None
+        errors: Dict[str, BaseException] = {}
+
+        def start_backup(event: str) -> bool:
+            if BACKUP not in calls or BACKUP in started_names:
+                return False
+            self._record(event)
+            start(BACKUP)
+            return True
+
+        try:
+            while True:
+                timeout = None
+                if winner is None and BACKUP in calls and BACKUP not in started_names:
+                    timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    name, item, error = items.get(timeout=timeout)
+                except queue.Empty:
+                    start_backup("hedged")
+                    continue
+
+                if winner is not None and name != winner:
+                    continue
+                if error is not None:
+                    if winner is not None:
+                        raise error
+                    errors[name] = error
+                    if name == PRIMARY and self.policy.failover and start_backup("failover"):
+                        continue
+                    if len(errors) == len(started_names):
+                        raise errors.get(PRIMARY, error)
+                    continue
+
+                if winner is None:
+                    winner = name
+                    for other in started_names - {name}:
+                        stop[other].set()
+                        if other == PRIMARY:
+                            self._record_cancelled(kind, started)
+                    if name == BACKUP:
+                        self._record("backup_won")
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            for event in stop.values():
+                event.set()
+
+    @staticmethod
+    def _pump_sync(name: str, call: Callable[[], Iterator[Any]], stop: threading.Event, items: queue.Queue) -> None:
+        iterator = call()
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    return
+                items.put((name, item, None))
+            items.put((name, _DONE, None))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    def _sync_calls(self, method: str, input: Any, config: Optional[RunnableConfig], kwargs: Dict[str, Any]):
+        backup = self._get_backup()
+        targets = {PRIMARY: (self.primary, config)}
+        if backup is not None:
+            targets[BACKUP] = (backup, self._backup_config(config))
+
+        def factory(runnable: Runnable, call_config: Optional[RunnableConfig]) -> Callable[[], Iterator[Any]]:
+            if method == "stream":
+                return lambda: runnable.stream(input, call_config, **kwargs)
+            return lambda: iter([runnable.invoke(input, call_config, **kwargs)])
+
+        return {name: factory(runnable, call_config) for name, (runnable, call_config) in targets.items()}
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        race = self._race("latency", self._sync_calls("invoke", input, config, kwargs))
+        try:
+            for result in race:
+                return result
+        finally:
+            race.close()
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        yield from self._race("ttft", self._sync_calls("stream", input, config, kwargs))
@@ -0,0 +1,157 @@
+"""
+JSON Stream - 스트리밍 LLM 출력의 증분 JSON 파서
+
+토큰 청크를 받을 때마다 새로 들어온 문자만 스캔하면서 JSON 구조(경로)를 추적하고,
+관심 경로의 값이 완성되는 즉시 이벤트로 반환.
+전체 응답을 기다리지 않고 files[i], question 등을 바로 처리할 수 있음
+
+- 첫 '{' 이전의 텍스트(```json 펜스, 설명 문장)는 무시
+- 경로 패턴의 "*"는 임의의 키/인덱스와 일치
+
+예시:
+    parser = IncrementalJSONParser([("files", "*"), ("question",)])
+    for chunk in stream:
+        for path, value in parser.feed(chunk):
+            ...  # path == ("files", 0), value == {"path": ..., "content": ...}
+"""
+
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+JSONPath = Tuple[Any, ...]
+
+_WHITESPACE = " \t\r\n"
+
+
+class _Frame:
+    """열려 있는 객체/배열"""
+    __slots__ = ("kind", "start", "key", "index", "expect_key")
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind        # "object" | "array"
+        self.start = start
+        self.key: Optional[str] = None
+        self.index = 0
+        self.expect_key = kind == "object"
+
+
+class IncrementalJSONParser:
+    """
+    관심 경로의 값이 완성될 때마다 (경로, 값)을 반환하는 증분 파서
+
+    각 문자는 한 번만 스캔하며, 완성된 값만 json.loads로 디코딩
+    """
+
+    def __init__(self, watch: Sequence[JSONPath]):
+        self.watch = [tuple(p) for p in watch]
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._scalar_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """최상위 JSON 객체가 닫혔는지"""
+        return self._done
+
+    def _matches(self, path: JSONPath) -> bool:
+        return any(
+            len(pattern) == len(path)
+            and all(p == "*" or p == v for p, v in zip(pattern, path))
+            for pattern in self.watch
+        )
+
+    def _current_path(self) -> JSONPath:
+        """최상위 프레임 안에서 현재 값의 경로"""
+        return tuple(
+            frame.key if frame.kind == "object" else frame.index
+            for frame in self._stack
+        )
+
+    def _complete(self, start: int, end: int, events: list) -> None:
+        """값 완성 처리 (관심 경로면 디코딩해서 이벤트 추가)"""
+        if not self._stack:
+            return
+        path = self._current_path()
+        if self._matches(path):
+            try:
+                events.append((path, json.loads(self._buf[start:end])))
+            except json.JSONDecodeError:
+                pass
+
+    def _end_scalar(self, end: int, events: list) -> None:
+        if self._scalar_start is not None:
+            self._complete(self._scalar_start, end, events)
+            self._scalar_start = None
+
+    def feed(self, text: str) -> List[Tuple[JSONPath, Any]]:
+        """청크 추가 후 새로 완성된 관심 값 목록 반환"""
+        events: List[Tuple[JSONPath, Any]] = []
+        if self._done or not text:
+            return events
+
+        self._buf += text
+        buf = self._buf
+        i = self._pos
+
+        if not self._started:
+            i = buf.find("{", i)
+            if i < 0:
+                self._pos = len(buf)
+                return events
+            self._started = True
+
+        while i < len(buf):
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    frame = self._stack[-1] if self._stack else None
+                    if frame is not None and frame.kind == "object" and frame.expect_key:
+                        frame.key = json.loads(buf[self._string_start:i + 1])
+                    else:
+                        self._complete(self._string_start, i + 1, events)
+                i += 1
+                continue
+
+            if self._scalar_start is not None and (ch in _WHITESPACE or ch in ",]}"):
+                self._end_scalar(i, events)
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._stack.append(_Frame("object" if ch == "{" else "array", i))
+            elif ch in "}]":
+                frame = self._stack.pop()
+                if not self._stack:
+                    self._done = True
+                    self._pos = i + 1
+                    return events
+                self._complete(frame.start, i + 1, events)
+            elif ch == ",":
+                frame = self._stack[-1]
+                if frame.kind == "object":
+                    frame.expect_key = True
+                    frame.key = None
+                else:
+                    frame.index += 1
+            elif ch == ":":
+                self._stack[-1].expect_key = False
+            elif ch not in _WHITESPACE and self._scalar_start is None:
+                self._scalar_start = i
+            i += 1
+
+        self._pos = i
+        return events
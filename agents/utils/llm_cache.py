@@ -0,0 +1,321 @@
+"""
+LLM Response Cache - 영속 응답 캐시 + single-flight
+
+모델/파라미터/정규화된 메시지 목록의 해시를 키로 SQLite에 응답을 저장.
+동일한 요청이 동시에 들어오면 하나만 프로바이더를 호출하고 나머지는 그 결과(캐시)를 사용
+
+환경 변수:
+- VIBRIC_LLM_CACHE: "0"이면 비활성화
+- VIBRIC_LLM_CACHE_TTL: 항목 유효 시간(초, 기본값: 86400)
+- VIBRIC_LLM_CACHE_MAX_ENTRIES: 최대 항목 수 (기본값: 5000)
+- VIBRIC_LLM_CACHE_MAX_BYTES: 최대 저장 크기 (기본값: 200MB)
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import ChatResult
+
+from agents.utils.storage import get_data_path
+
+
+def make_cache_key(prompt: str, llm_string: str) -> str:
+    """캐시 키 생성 (모델/파라미터 + 정규화된 메시지 목록의 해시)"""
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+def is_response_cache_enabled() -> bool:
+    """응답 캐시 사용 여부"""
+    return os.getenv("VIBRIC_LLM_CACHE", "1") != "0"
+
+
+# === 저장소 ===
+
+# put 몇 번마다 만료 항목을 정리하고 항목 수/크기 카운터를 다시 계산할지
+# (다른 워커 프로세스가 같은 파일에 쓴 항목도 이때 반영)
+SWEEP_EVERY = 200
+
+
+class ResponseCache:
+    """
+    SQLite 기반 응답 저장소
+    
+    - TTL 경과 항목은 조회 시 무효화, put SWEEP_EVERY번마다 일괄 정리
+    - 항목 수/크기 초과 시 마지막 접근 시각 기준 LRU 제거
+      (항목 수/크기는 카운터로 유지 → put마다 전체 테이블을 집계하지 않음)
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 86400,
+        max_entries: int = 5000,
+        max_bytes: int = 200 * 1024 * 1024
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._count, self._bytes = self._totals()
+        self._puts = 0
+        self._agents: Dict[str, "AgentResponseCache"] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
+    def get(self, key: str) -> Optional[str]:
+        """저장된 값 조회 (TTL 경과 시 삭제 후 None)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, size, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= size
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            return value
+    
+    def put(self, key: str, value: str) -> None:
+        """값 저장 후 용량 초과분 제거"""
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now)
+            )
+            if previous is not None:
+                self._count -= 1
+                self._bytes -= previous[0]
+            self._count += 1
+            self._bytes += len(value)
+            
+            self._puts += 1
+            if self._puts % SWEEP_EVERY == 0:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._count, self._bytes = self._totals()
+            if self._count > self.max_entries or self._bytes > self.max_bytes:
+                self._evict()
+    
+    def _totals(self) -> tuple:
+        """(항목 수, 총 크기) 전체 집계"""
+        return self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+    
+    def _evict(self) -> None:
+        """LRU 초과분 제거 (락 보유 상태에서 호출)"""
+        to_delete = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            self._count -= 1
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._count, self._bytes = 0, 0
+    
+    # === 에이전트별 뷰 / 통계 ===
+    
+    def for_agent(self, agent: str) -> "AgentResponseCache":
+        """에이전트별 캐시 뷰 (저장소 공유, 히트/미스는 에이전트별 집계)"""
+        with self._lock:
+            if agent not in self._agents:
+                self._agents[agent] = AgentResponseCache(self, agent)
+                self._stats[agent] = {"hits": 0, "misses": 0, "coalesced": 0}
+            return self._agents[agent]
+    
+    def record(self, agent: str, event: str) -> None:
+        with self._lock:
+            self._stats.setdefault(agent, {"hits": 0, "misses": 0, "coalesced": 0})[event] += 1
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """에이전트별 hits / misses / coalesced / hit_rate"""
+        with self._lock:
+            result = {}
+            for agent, counts in self._stats.items():
+                total = counts["hits"] + counts["misses"]
+                result[agent] = {**counts, "hit_rate": counts["hits"] / total if total else 0.0}
+            return result
+
+
+class AgentResponseCache(BaseCache):
+    """LangChain BaseCache 어댑터 (chat model의 cache 파라미터로 전달)"""
+    
+    def __init__(self, store: ResponseCache, agent: str):
+        self.store = store
+        self.agent = agent
+    
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        value = self.store.get(make_cache_key(prompt, llm_string))
+        if value is None:
+            self.store.record(self.agent, "misses")
+            return None
+        self.store.record(self.agent, "hits")
+        return loads(value, allowed_objects="core")
+    
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.store.put(make_cache_key(prompt, llm_string), dumps(list(return_val)))
+    
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+
+# === Single-flight ===
+
+class SingleFlight:
+    """
+    동일 키 요청 병합
+    
+    첫 요청(leader)이 완료될 때까지 같은 키의 다른 요청을 대기시킴.
+    leader가 성공하면 대기자는 캐시에서 결과를 얻고, 실패하면 각자 다시 시도
+    """
+    
+    def __init__(self, timeout: float = 300):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._flights: Dict[str, threading.Event] = {}
+        self._aflights: Dict[tuple, asyncio.Event] = {}
+    
+    def acquire(self, key: str) -> bool:
+        """키의 leader가 될 때까지 대기. 다른 요청을 기다렸으면 True"""
+        waited = False
+        while True:
+            with self._lock:
+                event = self._flights.get(key)
+                if event is None:
+                    self._flights[key] = threading.Event()
+                    return waited
+            waited = True
+            event.wait(self.timeout)
+    
+    def release(self, key: str) -> None:
+        with self._lock:
+            event = self._flights.pop(key, None)
+        if event is not None:
+            event.set()
+    
+    async def aacquire(self, key: str) -> bool:
+        """키의 leader가 될 때까지 대기. 다른 요청을 기다렸으면 True (async)"""
+        flight_key = (id(asyncio.get_running_loop()), key)
+        waited = False
+        while True:
+            event = self._aflights.get(flight_key)
+            if event is None:
+                self._aflights[flight_key] = asyncio.Event()
+                return waited
+            waited = True
+            try:
+                await asyncio.wait_for(event.wait(), self.timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    def arelease(self, key: str) -> None:
+        flight_key = (id(asyncio.get_running_loop()), key)
+        event = self._aflights.pop(flight_key, None)
+        if event is not None:
+            event.set()
+
+
+_SINGLE_FLIGHT = SingleFlight()
+
+
+class SingleFlightMixin:
+    """
+    chat model 클래스에 single-flight를 더하는 믹스인
+    
+    캐시 조회 + 프로바이더 호출 구간(_generate_with_cache)을 키 단위로 직렬화
+    """
+    
+    def _flight_key(self, messages: Sequence, stop: Optional[list], **kwargs: Any) -> str:
+        normalized = [
+            msg.model_copy(update={"id": None}) if getattr(msg, "id", None) is not None else msg
+            for msg in messages
+        ]
+        return make_cache_key(dumps(normalized), self._get_llm_string(stop=stop, **kwargs))
+    
+    def _record_coalesced(self) -> None:
+        if isinstance(self.cache, AgentResponseCache):
+            self.cache.store.record(self.cache.agent, "coalesced")
+    
+    def _generate_with_cache(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._flight_key(messages, stop, **kwargs)
+        if _SINGLE_FLIGHT.acquire(key):
+            self._record_coalesced()
+        try:
+            return super()._generate_with_cache(messages, stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            _SINGLE_FLIGHT.release(key)
+    
+    async def _agenerate_with_cache(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._flight_key(messages, stop, **kwargs)
+        if await _SINGLE_FLIGHT.aacquire(key):
+            self._record_coalesced()
+        try:
+            return await super()._agenerate_with_cache(messages, stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            _SINGLE_FLIGHT.arelease(key)
+
+
+_single_flight_classes: Dict[type, type] = {}
+
+
+def single_flight_class(model_class: type) -> type:
+    """프로바이더 chat model 클래스에 SingleFlightMixin을 적용한 서브클래스"""
+    if model_class not in _single_flight_classes:
+        _single_flight_classes[model_class] = type(
+            f"SingleFlight{model_class.__name__}", (SingleFlightMixin, model_class), {}
+        )
+    return _single_flight_classes[model_class]
+
+
+# === 글로벌 인스턴스 ===
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """프로세스 전역 응답 캐시 (첫 호출 시 생성)"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                str(get_data_path("llm_cache.sqlite")),
+                ttl_seconds=float(os.getenv("VIBRIC_LLM_CACHE_TTL", "86400")),
+                max_entries=int(os.getenv("VIBRIC_LLM_CACHE_MAX_ENTRIES", "5000")),
+                max_bytes=int(os.getenv("VIBRIC_LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024))),
+            )
+        return _response_cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """에이전트별 캐시 통계 (편의 함수)"""
+    return get_response_cache().stats() if _response_cache is not None else {}
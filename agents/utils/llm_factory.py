@@ -4,16 +4,27 @@ LLM Factory - LLM 인스턴스 생성 팩토리
 에이전트별 최적화된 LLM 인스턴스 생성
 """
 
+import asyncio
 import os
-from typing import Optional, Dict, Any
-from functools import lru_cache
+import threading
+from typing import Callable, Optional, Dict, Any, Tuple, Union
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 from langchain_core.language_models.chat_models import BaseChatModel
 
-from agents.registry import AgentDefinition, get_agent
+from agents.registry import AgentDefinition, HedgePolicy, get_agent, get_all_agents
+from agents.utils.hedging import HedgedLLM, is_hedging_enabled
+from agents.utils.llm_cache import get_response_cache, is_response_cache_enabled, single_flight_class
+from agents.utils.prompt_cache import PROMPT_CACHE_USAGE
+from agents.utils.rate_limit import SDK_NO_RETRY, get_rate_limiter, is_rate_limit_enabled, rate_limited_class
+from agents.utils.metrics import LLM_METRICS
+from agents.utils.tracing import LLM_TRACING
+
+
+# 모든 LLM에 붙는 콜백 (캐시 토큰 집계, 지표, 트레이싱)
+LLM_CALLBACKS = [PROMPT_CACHE_USAGE, LLM_METRICS, LLM_TRACING]
 
 
 # === LLM 프로바이더 매핑 ===
@@ -24,6 +35,9 @@ PROVIDER_MAP = {
     "gpt": ChatOpenAI,
 }
 
+# 프로바이더 → verify_api_keys() 키 이름
+PROVIDER_KEY_NAMES = {"gemini": "google", "claude": "anthropic", "gpt": "openai"}
+
 
 def get_provider_from_model(model_name: str) -> str:
     """모델 이름에서 프로바이더 추출"""
@@ -37,11 +51,32 @@ def get_provider_from_model(model_name: str) -> str:
         raise ValueError(f"알 수 없는 모델: {model_name}")
 
 
+# === 모델 오버라이드 (벤치마크/오프라인 실행용) ===
+# 설정되면 create_llm이 프로바이더 클래스 대신 이 팩토리로 모델을 만듦.
+# 팩토리는 (model_name, agent_name, tags, metadata, callbacks) 키워드 인자를 받음
+
+LLMOverride = Callable[..., BaseChatModel]
+
+_llm_override: Optional[LLMOverride] = None
+
+
+def set_llm_override(factory: Optional[LLMOverride]) -> None:
+    """
+    모델 생성 오버라이드 설정 (None이면 해제)
+    
+    레지스트리에 남은 기존 인스턴스는 비움
+    """
+    global _llm_override
+    _llm_override = factory
+    clear_llm_registry()
+
+
 def create_llm(
     model_name: str,
     temperature: float = 0.7,
     max_tokens: int = 4096,
     agent_name: Optional[str] = None,
+    cache: bool = False,
     **kwargs
 ) -> BaseChatModel:
     """
@@ -52,6 +87,7 @@ def create_llm(
         temperature: 생성 온도
         max_tokens: 최대 토큰 수
         agent_name: 에이전트 이름 (LangSmith 태깅용)
+        cache: 영속 응답 캐시 + single-flight 사용 여부
         **kwargs: 추가 설정
     
     Returns:
@@ -70,96 +106,337 @@ def create_llm(
         common_config["tags"] = [agent_name]
         common_config["metadata"] = {"agent": agent_name}
     
-    # 프로바이더별 LLM 생성
-    if provider == "gemini":
-        return ChatGoogleGenerativeAI(
-            model=model_name,
-            temperature=temperature,
-            max_output_tokens=max_tokens,
-            **kwargs
+    if _llm_override is not None:
+        return _llm_override(
+            model_name=model_name,
+            agent_name=agent_name,
+            tags=common_config.get("tags"),
+            metadata=common_config.get("metadata"),
+            callbacks=LLM_CALLBACKS
         )
+    
+    # 응답 캐시 (opt-in): 캐시 어댑터 + 동시 요청 병합 서브클래스 사용
+    use_cache = cache and is_response_cache_enabled()
+    if use_cache:
+        kwargs["cache"] = get_response_cache().for_agent(agent_name or model_name)
+    
+    # 프로바이더 리미터 (RPM/TPM + 적응형 동시 호출 수 + 키 풀 + 재시도)
+    use_rate_limit = is_rate_limit_enabled()
+    
+    def model_class(cls: type) -> type:
+        if use_rate_limit:
+            cls = rate_limited_class(cls, provider)
+        return single_flight_class(cls) if use_cache else cls
+    
+    # 프로바이더별 LLM 설정
+    if provider == "gemini":
+        provider_class = ChatGoogleGenerativeAI
+        config = {"model": model_name, "temperature": temperature, "max_output_tokens": max_tokens}
     elif provider == "claude":
-        return ChatAnthropic(
-            model=model_name,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            **kwargs
-        )
+        provider_class = ChatAnthropic
+        config = {"model": model_name, "temperature": temperature, "max_tokens": max_tokens}
     elif provider == "gpt":
-        return ChatOpenAI(
-            model=model_name,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            **kwargs
-        )
+        provider_class = ChatOpenAI
+        config = {"model": model_name, "temperature": temperature, "max_tokens": max_tokens}
+        # 자동 prefix 캐싱: 같은 에이전트의 요청을 같은 캐시로 라우팅
+        if agent_name:
+            kwargs.setdefault("model_kwargs", {}).setdefault("prompt_cache_key", f"vibric-{agent_name}")
     else:
         raise ValueError(f"지원하지 않는 프로바이더: {provider}")
+    
+    config.update(
+        tags=common_config.get("tags"),
+        metadata=common_config.get("metadata"),
+        callbacks=LLM_CALLBACKS,
+        **kwargs
+    )
+    if not use_rate_limit:
+        return model_class(provider_class)(**config)
+    
+    # 재시도는 리미터가 담당 (429 신호를 동시 호출 수 조절에 반영)
+    config.setdefault("max_retries", SDK_NO_RETRY[provider])
+    keys = [None] if "api_key" in config else get_rate_limiter(provider).keys
+    llm = model_class(provider_class)(**_with_api_key(config, keys[0]))
+    # 나머지 키는 같은 설정의 원본 클래스 인스턴스로 (캐시/리미터는 llm 쪽에서 한 번만)
+    pool_config = {k: v for k, v in config.items() if k != "cache"}
+    llm._key_pool = [provider_class(**_with_api_key(pool_config, key)) for key in keys[1:]]
+    return llm
+
+
+def _with_api_key(config: Dict[str, Any], key: Optional[str]) -> Dict[str, Any]:
+    """키가 있으면 api_key 설정 추가 (None이면 SDK 기본 환경 변수 사용)"""
+    return {**config, "api_key": key} if key is not None else config
+
+
+# === LLM 클라이언트 레지스트리 ===
+# 프로세스 전역에서 (provider, model, temperature, max_tokens, tags) 별로
+# 인스턴스를 하나만 만들어 재사용. 인스턴스가 보유한 HTTP 클라이언트(커넥션 풀)도
+# 함께 재사용되므로 매 스텝마다 TLS 핸드셰이크/객체 생성 비용을 내지 않음.
+
+RegistryKey = Tuple[str, str, float, int, Tuple[str, ...], bool]
+
+_llm_registry: Dict[RegistryKey, BaseChatModel] = {}
+_llm_registry_lock = threading.Lock()
+
+
+def _registry_key(
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    agent_name: Optional[str] = None,
+    cache: bool = False
+) -> RegistryKey:
+    """레지스트리 키 생성"""
+    tags = (agent_name,) if agent_name else ()
+    return (
+        get_provider_from_model(model_name),
+        model_name,
+        float(temperature),
+        int(max_tokens),
+        tags,
+        cache,
+    )
+
+
+def get_llm(
+    model_name: str,
+    temperature: float = 0.7,
+    max_tokens: int = 4096,
+    agent_name: Optional[str] = None,
+    cache: bool = False,
+    **kwargs
+) -> BaseChatModel:
+    """
+    레지스트리에서 LLM 인스턴스 조회 (없으면 생성 후 등록)
+    
+    추가 설정(**kwargs)이 있으면 키로 표현할 수 없으므로 새 인스턴스를 생성
+    """
+    if kwargs:
+        return create_llm(model_name, temperature, max_tokens, agent_name, cache=cache, **kwargs)
+    
+    key = _registry_key(model_name, temperature, max_tokens, agent_name, cache)
+    llm = _llm_registry.get(key)
+    if llm is not None:
+        return llm
+    
+    with _llm_registry_lock:
+        # 락 대기 중 다른 스레드가 생성했을 수 있음
+        llm = _llm_registry.get(key)
+        if llm is None:
+            llm = create_llm(model_name, temperature, max_tokens, agent_name, cache=cache)
+            _llm_registry[key] = llm
+    return llm
 
 
-def create_llm_for_agent(agent_name: str, **kwargs) -> BaseChatModel:
+def warmup_llm_registry() -> Dict[str, bool]:
     """
-    에이전트 정의에 따라 LLM 인스턴스 생성
+    모든 에이전트 + Orchestrator의 LLM 인스턴스를 미리 생성 (서버 시작 시 호출)
+    
+    객체 생성만 하며 네트워크 연결은 열지 않음 (연결은 warmup_llm_connections)
+    API 키가 없는 프로바이더는 건너뜀
+    
+    Returns:
+        에이전트별 준비 완료 여부
+    """
+    key_status = verify_api_keys()
+    targets = [(agent.name, agent.model) for agent in get_all_agents()]
+    targets.append(("orchestrator", ORCHESTRATOR_MODEL))
+    
+    result = {}
+    for name, model_name in targets:
+        if not key_status[PROVIDER_KEY_NAMES[get_provider_from_model(model_name)]]:
+            result[name] = False
+            continue
+        try:
+            if name == "orchestrator":
+                get_orchestrator_llm()
+            else:
+                create_llm_for_agent(name)
+            result[name] = True
+        except Exception as e:
+            print(f"[LLM] ⚠️ {name} LLM 준비 실패: {e}")
+            result[name] = False
+    return result
+
+
+async def _open_connection(llm: BaseChatModel) -> None:
+    """async 클라이언트로 모델 목록을 한 번 조회 (DNS/TCP/TLS 연결이 커넥션 풀에 남음)"""
+    if isinstance(llm, ChatAnthropic):
+        await llm._async_client.models.list(limit=1)
+    elif isinstance(llm, ChatOpenAI):
+        await llm.root_async_client.models.list()
+    elif isinstance(llm, ChatGoogleGenerativeAI):
+        await llm.client.aio.models.list(config={"page_size": 1})
+
+
+async def warmup_llm_connections(timeout: float = 10.0) -> Dict[str, bool]:
+    """
+    레지스트리 인스턴스(키 풀 포함)의 HTTP 커넥션 풀을 미리 엶 (서버 이벤트 루프에서 호출)
+    
+    첫 LLM 호출이 연결 수립 비용을 내지 않도록 가벼운 조회 요청을 한 번씩 보냄.
+    실패해도 서버 시작은 계속 (첫 호출에서 다시 연결)
+    
+    Returns:
+        모델별 연결 성공 여부 (같은 모델의 클라이언트가 하나라도 실패하면 False)
+    """
+    with _llm_registry_lock:
+        targets = [
+            (model_name, llm)
+            for (_, model_name, *_), primary in _llm_registry.items()
+            for llm in [primary, *getattr(primary, "_key_pool", [])]
+        ]
+    
+    async def open_one(llm: BaseChatModel) -> Optional[Exception]:
+        try:
+            await asyncio.wait_for(_open_connection(llm), timeout)
+        except Exception as e:
+            # HTTP 상태 에러(권한 없음 등)도 응답을 받았으면 연결은 열린 것
+            if not isinstance(getattr(e, "status_code", getattr(e, "code", None)), int):
+                return e
+        return None
+    
+    result: Dict[str, bool] = {}
+    errors = await asyncio.gather(*(open_one(llm) for _, llm in targets))
+    for (model_name, _), error in zip(targets, errors):
+        if error is not None and result.get(model_name, True):
+            print(f"[LLM] ⚠️ {model_name} 연결 준비 실패: {type(error).__name__}: {error}")
+        result[model_name] = result.get(model_name, True) and error is None
+    return result
+
+
+def clear_llm_registry() -> None:
+    """레지스트리 초기화 (서버 종료/테스트용)"""
+    with _llm_registry_lock:
+        _llm_registry.clear()
+
+
+# === 헤징 (꼬리 지연 중복 요청 + 장애 전환) ===
+
+AgentLLM = Union[BaseChatModel, HedgedLLM]
+
+
+def with_hedging(
+    primary: BaseChatModel,
+    policy: Optional[HedgePolicy],
+    model_name: str,
+    agent_name: str,
+    **llm_kwargs
+) -> AgentLLM:
+    """
+    정책이 있으면 primary를 HedgedLLM으로 감쌈
+    
+    backup은 같은 에이전트 설정(온도, 토큰 수, 캐시)으로 레지스트리에서 첫 사용 시 조회.
+    backup 프로바이더 API 키가 없으면 헤징 없이 primary만 사용
+    """
+    if policy is None or not is_hedging_enabled():
+        return primary
+    
+    def backup_factory() -> Optional[BaseChatModel]:
+        if _llm_override is None:
+            provider = get_provider_from_model(policy.backup_model)
+            if not verify_api_keys()[PROVIDER_KEY_NAMES[provider]]:
+                return None
+        return get_llm(model_name=policy.backup_model, agent_name=agent_name, **llm_kwargs)
+    
+    return HedgedLLM(primary, backup_factory, policy, agent=agent_name, model=model_name)
+
+
+def create_llm_for_agent(agent_name: str, **kwargs) -> AgentLLM:
+    """
+    에이전트 정의에 따라 LLM 인스턴스 조회 (레지스트리 공유)
     
     Args:
         agent_name: Agent Registry에 등록된 에이전트 이름
-        **kwargs: 추가 설정 (온도, 토큰 수 오버라이드 가능)
+        **kwargs: 추가 설정 (온도, 토큰 수, 캐시 사용 여부 오버라이드 가능)
     
     Returns:
-        BaseChatModel 인스턴스
+        BaseChatModel 인스턴스 (에이전트에 HedgePolicy가 있으면 HedgedLLM)
     """
     agent = get_agent(agent_name)
     if not agent:
         raise ValueError(f"등록되지 않은 에이전트: {agent_name}")
     
-    return create_llm(
-        model_name=agent.model,
-        temperature=kwargs.get("temperature", agent.temperature),
-        max_tokens=kwargs.get("max_tokens", agent.max_tokens),
-        agent_name=agent_name,
-        **{k: v for k, v in kwargs.items() if k not in ["temperature", "max_tokens"]}
-    )
+    llm_kwargs = {
+        "temperature": kwargs.get("temperature", agent.temperature),
+        "max_tokens": kwargs.get("max_tokens", agent.max_tokens),
+        "cache": kwargs.get("cache", agent.cache_responses),
+        **{k: v for k, v in kwargs.items() if k not in ["temperature", "max_tokens", "cache"]}
+    }
+    llm = get_llm(model_name=agent.model, agent_name=agent_name, **llm_kwargs)
+    return with_hedging(llm, agent.hedge, agent.model, agent_name, **llm_kwargs)
 
 
 # === 캐시된 LLM 인스턴스 ===
 
-@lru_cache(maxsize=10)
 def get_cached_llm(model_name: str, temperature: float, max_tokens: int) -> BaseChatModel:
     """
     캐시된 LLM 인스턴스 반환 (동일 설정 시 재사용)
     
-    주의: 캐시는 프로세스 수명 동안 유지됨
+    주의: 캐시는 프로세스 수명 동안 유지됨 (레지스트리 공유)
     """
-    return create_llm(model_name, temperature, max_tokens)
+    return get_llm(model_name, temperature, max_tokens)
 
 
 # === 편의 함수 ===
 
-def get_orchestrator_llm() -> BaseChatModel:
-    """Orchestrator용 LLM (고성능 모델)"""
-    return create_llm(
-        model_name="gemini-2.5-pro",
-        temperature=0.3,
-        max_tokens=8192,
-        agent_name="orchestrator"
+ORCHESTRATOR_MODEL = "gemini-2.5-pro"
+ORCHESTRATOR_HEDGE = HedgePolicy(backup_model="gpt-5.2")
+
+
+def get_orchestrator_llm(cache: bool = False) -> AgentLLM:
+    """
+    Orchestrator용 LLM (고성능 모델, ORCHESTRATOR_HEDGE로 헤징)
+    
+    Args:
+        cache: 응답 캐시 사용 (실행 계획 생성, 수정 요청 분석처럼 동일 프롬프트가 반복되는 호출)
+    """
+    llm_kwargs = {"temperature": 0.3, "max_tokens": 8192, "cache": cache}
+    llm = get_llm(model_name=ORCHESTRATOR_MODEL, agent_name="orchestrator", **llm_kwargs)
+    return with_hedging(llm, ORCHESTRATOR_HEDGE, ORCHESTRATOR_MODEL, "orchestrator", **llm_kwargs)
+
+
+SUMMARIZER_MODEL = "gemini-2.5-flash"
+
+
+def get_summarizer_llm() -> BaseChatModel:
+    """대화 압축 요약용 LLM (저비용 모델)"""
+    return get_llm(
+        model_name=SUMMARIZER_MODEL,
+        temperature=0.2,
+        max_tokens=2048,
+        agent_name="summarizer"
+    )
+
+
+REPAIR_MODEL = "gemini-2.5-flash"
+
+
+def get_repair_llm() -> BaseChatModel:
+    """스키마 검증 실패 출력 복구용 LLM (저비용 모델, 결정적)"""
+    return get_llm(
+        model_name=REPAIR_MODEL,
+        temperature=0.0,
+        max_tokens=16384,
+        agent_name="repair"
     )
 
 
-def get_planner_llm() -> BaseChatModel:
+def get_planner_llm() -> AgentLLM:
     """Planner용 LLM"""
     return create_llm_for_agent("planner")
 
 
-def get_coder_llm() -> BaseChatModel:
+def get_coder_llm() -> AgentLLM:
     """Coder용 LLM"""
     return create_llm_for_agent("coder")
 
 
-def get_reviewer_llm() -> BaseChatModel:
+def get_reviewer_llm() -> AgentLLM:
     """Reviewer용 LLM"""
     return create_llm_for_agent("reviewer")
 
 
-def get_tester_llm() -> BaseChatModel:
+def get_tester_llm() -> AgentLLM:
     """Tester용 LLM"""
     return create_llm_for_agent("tester")
 
@@ -174,9 +451,9 @@ def verify_api_keys() -> Dict[str, bool]:
         프로바이더별 API 키 존재 여부
     """
     return {
-        "google": bool(os.getenv("GOOGLE_GENERATIVE_AI_API_KEY") or os.getenv("GOOGLE_API_KEY")),
-        "anthropic": bool(os.getenv("ANTHROPIC_API_KEY")),
-        "openai": bool(os.getenv("OPENAI_API_KEY")),
+        "google": bool(os.getenv("GOOGLE_GENERATIVE_AI_API_KEY") or os.getenv("GOOGLE_API_KEY") or os.getenv("GOOGLE_API_KEYS")),
+        "anthropic": bool(os.getenv("ANTHROPIC_API_KEY") or os.getenv("ANTHROPIC_API_KEYS")),
+        "openai": bool(os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEYS")),
         "langsmith": bool(os.getenv("LANGCHAIN_API_KEY")),
     }
 
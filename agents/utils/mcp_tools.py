@@ -103,6 +103,20 @@ def get_tools(force_reload: bool = False) -> List[BaseTool]:
     return _cached_tools
 
 
+async def aget_tools(force_reload: bool = False) -> List[BaseTool]:
+    """
+    캐싱된 MCP Tools 반환 (async)
+    
+    이벤트 루프를 블로킹하지 않고 MCP 서버 연결/로드
+    """
+    global _cached_tools
+    
+    if _cached_tools is None or force_reload:
+        _cached_tools = await get_supabase_tools()
+    
+    return _cached_tools
+
+
 # === 테스트 ===
 
 if __name__ == "__main__":
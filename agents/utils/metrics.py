@@ -0,0 +1,405 @@
+"""
+Metrics - LLM 호출 지표 (토큰, 지연, 비용, 에러)
+
+llm_factory로 생성한 모든 LLM에 LLMMetricsHandler 콜백이 붙어
+에이전트/모델/세션별로 프로세스 내에 집계하고, Prometheus 텍스트 형식으로 노출
+
+- 토큰: usage_metadata의 input/output/cache_read
+- 지연: 전체 응답 시간, 첫 토큰까지 시간(TTFT, 스트리밍 호출만)
+- 비용: MODEL_PRICING 기준 추정치 (USD)
+- 에러: 예외 클래스 이름별 카운트
+- 최근 지연 분포: (에이전트, 모델)별 TTFT/응답 시간 백분위 (MODEL_LATENCY, 헤징 기준)
+
+노드 실행 중 발생한 호출의 합계는 track_usage()로 모아 AgentState.usage에 기록
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+# 모델별 단가 (USD / 1M 토큰): (입력, 출력, 캐시 읽기)
+MODEL_PRICING: Dict[str, Tuple[float, float, float]] = {
+    "gemini-2.5-pro": (1.25, 10.0, 0.31),
+    "gemini-2.5-flash": (0.30, 2.50, 0.075),
+    "claude-opus-4-5": (5.0, 25.0, 0.50),
+    "gpt-5.2": (1.75, 14.0, 0.175),
+}
+
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+TTFT_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+# 세션별 집계는 최근 세션만 유지 (라벨 카디널리티 제한)
+MAX_TRACKED_SESSIONS = 200
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int) -> float:
+    """추정 비용 (USD). 단가표에 없는 모델은 0"""
+    pricing = next((p for prefix, p in MODEL_PRICING.items() if model.startswith(prefix)), None)
+    if pricing is None:
+        return 0.0
+    input_price, output_price, cached_price = pricing
+    uncached = max(0, input_tokens - cached_tokens)
+    return (uncached * input_price + cached_tokens * cached_price + output_tokens * output_price) / 1_000_000
+
+
+# === 집계 자료구조 ===
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus 형식)"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels: str) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Dict[str, str]] = None) -> str:
+    items = list(labels) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class MetricsRegistry:
+    """카운터/히스토그램 저장소"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._sessions: "OrderedDict[str, Counter]" = OrderedDict()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: Labels, value: float, buckets: Tuple[float, ...]) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            series.setdefault(labels, Histogram(buckets)).observe(value)
+
+    def add_session(self, session_id: str, totals: Dict[str, float]) -> None:
+        """세션별 합계 (최근 MAX_TRACKED_SESSIONS개만 유지)"""
+        with self._lock:
+            counter = self._sessions.pop(session_id, None) or Counter()
+            counter.update(totals)
+            self._sessions[session_id] = counter
+            while len(self._sessions) > MAX_TRACKED_SESSIONS:
+                self._sessions.popitem(last=False)
+
+    def session_totals(self, session_id: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._sessions.get(session_id, {}))
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 형식 출력"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in series.items():
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_format_labels(labels, {'le': f'{bound:g}'})} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, {'le': '+Inf'})} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {hist.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+
+            if self._sessions:
+                for key in ("input_tokens", "output_tokens", "cost_usd"):
+                    name = f"vibric_session_{key}_total"
+                    lines.append(f"# HELP {name} Session {key} (recent sessions)")
+                    lines.append(f"# TYPE {name} counter")
+                    for session_id, totals in self._sessions.items():
+                        lines.append(f"{name}{_format_labels(_labels(session=session_id))} {totals.get(key, 0):g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._sessions.clear()
+
+
+METRICS = MetricsRegistry()
+METRICS.describe("vibric_llm_calls_total", "LLM calls")
+METRICS.describe("vibric_llm_tokens_total", "LLM tokens by kind (input/output/cached)")
+METRICS.describe("vibric_llm_cost_usd_total", "Estimated LLM cost in USD")
+METRICS.describe("vibric_llm_errors_total", "LLM call errors by exception class")
+METRICS.describe("vibric_llm_latency_seconds", "LLM call latency")
+METRICS.describe("vibric_llm_ttft_seconds", "LLM time to first token (streaming calls)")
+METRICS.describe("vibric_event_loop_lag_seconds", "Event loop scheduling lag")
+
+
+# === 모델별 최근 지연 분포 ===
+
+class LatencyTracker:
+    """
+    (에이전트, 모델)별 최근 지연 샘플 (헤징 지연 계산용 실시간 백분위)
+
+    kind: "ttft" (첫 토큰까지) / "latency" (전체 응답)
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str, str], deque] = {}
+
+    def record(self, agent: str, model: str, kind: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get((agent, model, kind))
+            if samples is None:
+                samples = self._samples[(agent, model, kind)] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, agent: str, model: str, kind: str, q: float) -> Optional[float]:
+        """q 백분위 (샘플이 min_samples 미만이면 None)"""
+        with self._lock:
+            samples = sorted(self._samples.get((agent, model, kind), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """"agent/model/kind" → p50/p95/p99 (샘플이 충분한 항목만)"""
+        with self._lock:
+            keys = list(self._samples)
+        result = {}
+        for agent, model, kind in keys:
+            values = {f"p{int(q * 100)}": self.percentile(agent, model, kind, q) for q in (0.5, 0.95, 0.99)}
+            if values["p50"] is not None:
+                result[f"{agent}/{model}/{kind}"] = {k: round(v, 3) for k, v in values.items()}
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+MODEL_LATENCY = LatencyTracker()
+
+
+# === 이벤트 루프 지연 ===
+
+class EventLoopLagMonitor:
+    """
+    이벤트 루프 지연 측정
+
+    interval마다 sleep에서 깨어나는 시각이 예정보다 얼마나 늦었는지 기록.
+    sync 노드/CPU 작업이 루프를 막으면 지연이 커짐
+    """
+
+    def __init__(self, registry: MetricsRegistry, interval: float = 0.1, window: int = 600):
+        self.registry = registry
+        self.interval = interval
+        self._recent: deque = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled)
+            self._recent.append(lag)
+            self.registry.observe("vibric_event_loop_lag_seconds", (), lag, LOOP_LAG_BUCKETS)
+
+    def start(self) -> None:
+        """실행 중인 이벤트 루프에서 측정 시작"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self, reset: bool = False) -> Dict[str, float]:
+        """최근 구간의 지연 분포 (초)"""
+        samples = sorted(self._recent)
+        if reset:
+            self._recent.clear()
+        if not samples:
+            return {"samples": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "samples": len(samples),
+            "p50": samples[len(samples) // 2],
+            "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+            "max": samples[-1],
+        }
+
+
+EVENT_LOOP_LAG = EventLoopLagMonitor(METRICS)
+
+
+# === 노드 단위 합계 ===
+
+_usage_accumulator: contextvars.ContextVar[Optional[Counter]] = contextvars.ContextVar(
+    "vibric_usage_accumulator", default=None
+)
+
+
+@contextmanager
+def track_usage() -> Iterator[Counter]:
+    """블록 안에서 발생한 LLM 호출 합계 수집 (AgentState.usage 기록용)"""
+    totals: Counter = Counter()
+    token = _usage_accumulator.set(totals)
+    try:
+        yield totals
+    finally:
+        _usage_accumulator.reset(token)
+
+
+# === 콜백 ===
+
+class _CallInfo:
+    __slots__ = ("agent", "model", "session", "started", "first_token", "accumulator")
+
+    def __init__(self, agent: str, model: str, session: str, accumulator: Optional[Counter]):
+        self.agent = agent
+        self.model = model
+        self.session = session
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.accumulator = accumulator
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    LLM 호출별 지표 기록
+
+    에이전트는 create_llm이 붙인 metadata["agent"], 세션은 LangGraph가
+    metadata에 넣는 thread_id에서 가져옴
+    """
+
+    run_inline = True  # 호출 시각 측정을 위해 executor로 넘기지 않음
+
+    def __init__(self, registry: MetricsRegistry, latency: Optional[LatencyTracker] = None):
+        self.registry = registry
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._calls: Dict[UUID, _CallInfo] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs) -> None:
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        info = _CallInfo(
+            agent=str(metadata.get("agent", "unknown")),
+            model=str(metadata.get("ls_model_name") or params.get("model") or params.get("model_name") or "unknown"),
+            session=str(metadata.get("thread_id", "")),
+            accumulator=_usage_accumulator.get()
+        )
+        with self._lock:
+            self._calls[run_id] = info
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs) -> None:
+        info = self._calls.get(run_id)
+        if info is not None and info.first_token is None:
+            info.first_token = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            info = self._calls.pop(run_id, None)
+        if info is None:
+            return
+
+        input_tokens = output_tokens = cached_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+                cached_tokens += (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+
+        now = time.perf_counter()
+        cost = estimate_cost(info.model, input_tokens, output_tokens, cached_tokens)
+        labels = _labels(agent=info.agent, model=info.model)
+
+        self.registry.inc("vibric_llm_calls_total", labels)
+        self.registry.inc("vibric_llm_tokens_total", labels + (("kind", "input"),), input_tokens)
+        self.registry.inc("vibric_llm_tokens_total", labels + (("kind", "output"),), output_tokens)
+        self.registry.inc("vibric_llm_tokens_total", labels + (("kind", "cached"),), cached_tokens)
+        self.registry.inc("vibric_llm_cost_usd_total", labels, cost)
+        self.registry.observe("vibric_llm_latency_seconds", labels, now - info.started, LATENCY_BUCKETS)
+        if info.first_token is not None:
+            self.registry.observe("vibric_llm_ttft_seconds", labels, info.first_token - info.started, TTFT_BUCKETS)
+        if self.latency is not None:
+            self.latency.record(info.agent, info.model, "latency", now - info.started)
+            if info.first_token is not None:
+                self.latency.record(info.agent, info.model, "ttft", info.first_token - info.started)
+
+        totals = {
+            "llm_calls": 1,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cached_tokens": cached_tokens,
+            "cost_usd": cost,
+            "llm_seconds": now - info.started,
+        }
+        if info.session:
+            self.registry.add_session(info.session, totals)
+        if info.accumulator is not None:
+            info.accumulator.update(totals)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            info = self._calls.pop(run_id, None)
+        if info is None:
+            return
+        labels = _labels(agent=info.agent, model=info.model)
+        self.registry.inc("vibric_llm_errors_total", labels + (("error", type(error).__name__),))
+        self.registry.observe("vibric_llm_latency_seconds", labels, time.perf_counter() - info.started, LATENCY_BUCKETS)
+
+
+LLM_METRICS = LLMMetricsHandler(METRICS, MODEL_LATENCY)
+
+
+def render_metrics() -> str:
+    """Prometheus 텍스트 (편의 함수)"""
+    return METRICS.render_prometheus()
+
+
+def get_session_usage(session_id: str) -> Dict[str, float]:
+    """세션별 LLM 사용량 합계 (편의 함수)"""
+    return METRICS.session_totals(session_id)
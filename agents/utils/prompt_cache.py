@@ -0,0 +1,113 @@
+"""
+Prompt Cache - 프로바이더 프롬프트 prefix 캐싱
+
+시스템 프롬프트를 바이트 단위로 고정된 SystemMessage로 한 번만 만들어 재사용하고,
+프로바이더별 prefix 캐시 표시를 붙임
+
+- Anthropic: 시스템 프롬프트 블록에 cache_control (ephemeral)
+- OpenAI: 자동 prefix 캐싱 (prompt_cache_key로 같은 에이전트 요청을 같은 캐시로 라우팅)
+- Gemini: 2.5 모델의 implicit 캐싱 (고정 prefix만 유지하면 자동 적용)
+
+가변 내용(유저 요청, 산출물 등)은 항상 시스템 프롬프트 뒤 HumanMessage에 둠.
+캐시 읽기/쓰기 토큰은 PromptCacheUsageHandler가 에이전트별로 집계
+"""
+
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import SystemMessage
+from langchain_core.outputs import LLMResult
+
+from agents.registry import get_agent
+
+
+def supports_cache_control(model_name: str) -> bool:
+    """명시적 cache_control 블록이 필요한 모델인지 (Anthropic)"""
+    return "claude" in model_name.lower()
+
+
+@lru_cache(maxsize=128)
+def cached_system_message(model_name: str, text: str) -> SystemMessage:
+    """
+    모델별 고정 시스템 메시지 (같은 입력이면 같은 객체 반환)
+
+    Anthropic 모델은 cache_control 블록으로 감싸 prefix 캐시 대상으로 표시
+    """
+    if supports_cache_control(model_name):
+        return SystemMessage(content=[
+            {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+        ])
+    return SystemMessage(content=text)
+
+
+def agent_system_message(agent_name: str, text: str) -> SystemMessage:
+    """에이전트 모델에 맞는 고정 시스템 메시지"""
+    agent = get_agent(agent_name)
+    return cached_system_message(agent.model if agent else "", text)
+
+
+# === 캐시 토큰 집계 ===
+
+class PromptCacheUsageHandler(BaseCallbackHandler):
+    """
+    LLM 응답의 usage_metadata에서 캐시 읽기/쓰기 토큰을 에이전트별로 집계
+
+    에이전트 이름은 create_llm이 붙인 metadata["agent"]에서 가져옴
+    """
+
+    run_inline = True  # 집계만 하므로 async 실행 시에도 executor로 넘기지 않음
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._run_agents: Dict[UUID, str] = {}
+        self._usage: Dict[str, Counter] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs) -> None:
+        with self._lock:
+            self._run_agents[run_id] = (metadata or {}).get("agent", "unknown")
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            agent = self._run_agents.pop(run_id, "unknown")
+            usage = self._usage.setdefault(agent, Counter())
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if not metadata:
+                        continue
+                    details = metadata.get("input_token_details") or {}
+                    usage["calls"] += 1
+                    usage["input_tokens"] += metadata.get("input_tokens", 0)
+                    usage["cache_read_tokens"] += details.get("cache_read", 0) or 0
+                    usage["cache_write_tokens"] += details.get("cache_creation", 0) or 0
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            self._run_agents.pop(run_id, None)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """에이전트별 캐시 토큰 + 입력 토큰 중 캐시 적중 비율"""
+        with self._lock:
+            return {
+                agent: {
+                    **dict(usage),
+                    "cache_hit_rate": usage["cache_read_tokens"] / usage["input_tokens"] if usage["input_tokens"] else 0.0
+                }
+                for agent, usage in self._usage.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._usage.clear()
+
+
+PROMPT_CACHE_USAGE = PromptCacheUsageHandler()
+
+
+def get_prompt_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """에이전트별 프롬프트 캐시 토큰 통계 (편의 함수)"""
+    return PROMPT_CACHE_USAGE.snapshot()
@@ -0,0 +1,590 @@
+"""
+Rate Limit - 프로바이더별 호출 속도 제한
+
+프로바이더(gemini/claude/gpt)마다 쿼터 안에서 최대한 많이 호출하면서 429를 피하도록
+LLM 호출 직전에 슬롯을 받고, 결과(성공/429/지연)로 동시 호출 수를 조절
+
+- 토큰 버킷: API 키마다 분당 요청 수(RPM) + 분당 토큰 수(TPM)
+  (예약량 = 입력 추정치 + max_tokens, 응답 후 실제 사용량으로 정산)
+- 적응형 동시 호출 수 (AIMD): 성공 시 +1/limit, 429 시 ×0.5,
+  출력 토큰당 지연이 기준의 2배를 넘으면 ×0.9
+  (감소 이후에 시작된 호출의 신호만 다시 감소에 반영 → 버스트 429로 한 번에 바닥까지 줄지 않음)
+- API 키 풀: 여러 키를 라운드 로빈, 429 받은 키는 retry-after 동안 제외
+- 재시도: 429/5xx/연결 오류만, retry-after가 있으면 그만큼 키를 쉬게 하고 없으면 full jitter 지수 백오프
+  (스트리밍은 첫 청크 전에 실패한 경우만 재시도)
+
+프로바이더 SDK의 자체 재시도는 끄고(max_retries) 여기서 재시도해야 429 신호가 리미터에 반영됨
+
+환경 변수 (PROVIDER = GEMINI / CLAUDE / GPT):
+- VIBRIC_RATE_LIMIT: "0"이면 비활성화 (기본값: 활성)
+- VIBRIC_{PROVIDER}_RPM, VIBRIC_{PROVIDER}_TPM: 키당 분당 요청/토큰 수
+  (버킷은 프로세스마다 따로 → VIBRIC_WORKERS개 워커가 몫을 나눠 가짐)
+- VIBRIC_{PROVIDER}_CONCURRENCY: 동시 호출 수 초기값, VIBRIC_{PROVIDER}_MAX_CONCURRENCY: 상한
+- VIBRIC_LLM_MAX_RETRIES: 최대 재시도 횟수 (기본값: 4)
+- GOOGLE_API_KEYS / ANTHROPIC_API_KEYS / OPENAI_API_KEYS: 쉼표로 구분한 키 풀
+  (없으면 단일 키 환경 변수를 프로바이더 SDK가 그대로 사용)
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.exceptions import ModelError, ModelRateLimitError
+from pydantic import PrivateAttr
+
+from agents.utils.metrics import METRICS, TTFT_BUCKETS
+
+
+# === 설정 ===
+
+@dataclass
+class ProviderLimits:
+    """프로바이더 쿼터 (키 하나 기준)"""
+    rpm: float
+    tpm: float
+    concurrency: int = 8
+    max_concurrency: int = 64
+
+
+DEFAULT_LIMITS: Dict[str, ProviderLimits] = {
+    "gemini": ProviderLimits(rpm=1000, tpm=2_000_000),
+    "claude": ProviderLimits(rpm=1000, tpm=2_000_000),
+    "gpt": ProviderLimits(rpm=1000, tpm=2_000_000),
+}
+
+# 프로바이더별 키 풀 / 단일 키 환경 변수
+KEY_POOL_ENV = {"gemini": "GOOGLE_API_KEYS", "claude": "ANTHROPIC_API_KEYS", "gpt": "OPENAI_API_KEYS"}
+
+# 프로바이더 SDK 자체 재시도 끄기 (Google SDK는 1이 "재시도 없음")
+SDK_NO_RETRY = {"gemini": 1, "claude": 0, "gpt": 0}
+
+# 재시도 대상 HTTP 상태 (ModelError로 매핑되지 않은 예외용)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504, 529}
+
+LATENCY_TOLERANCE = 2.0   # 출력 토큰당 지연이 기준의 몇 배를 넘으면 감소할지
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+POLL_INTERVAL = 0.05      # 동시 호출 수가 꽉 찼을 때 재확인 간격
+
+METRICS.describe("vibric_llm_ratelimit_wait_seconds", "Time LLM calls waited for a rate limit slot, by provider")
+METRICS.describe("vibric_llm_retries_total", "LLM call retries, by provider and reason")
+
+
+def is_rate_limit_enabled() -> bool:
+    return os.getenv("VIBRIC_RATE_LIMIT", "1") != "0"
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def worker_count() -> int:
+    """같은 키를 나눠 쓰는 서버 워커 프로세스 수"""
+    return max(1, int(_env_float("VIBRIC_WORKERS", 1)))
+
+
+def limits_from_env(provider: str) -> ProviderLimits:
+    """기본 쿼터에 환경 변수 덮어쓰기 (RPM/TPM은 워커 수로 나눈 몫)"""
+    base = DEFAULT_LIMITS[provider]
+    prefix = f"VIBRIC_{provider.upper()}"
+    workers = worker_count()
+    return ProviderLimits(
+        rpm=_env_float(f"{prefix}_RPM", base.rpm) / workers,
+        tpm=_env_float(f"{prefix}_TPM", base.tpm) / workers,
+        concurrency=int(_env_float(f"{prefix}_CONCURRENCY", base.concurrency)),
+        max_concurrency=int(_env_float(f"{prefix}_MAX_CONCURRENCY", base.max_concurrency)),
+    )
+
+
+def api_keys_from_env(provider: str) -> List[Optional[str]]:
+    """키 풀 (없으면 [None] = SDK 기본 키 사용)"""
+    raw = os.getenv(KEY_POOL_ENV[provider], "")
+    keys = [key.strip() for key in raw.split(",") if key.strip()]
+    return keys or [None]
+
+
+# === 토큰 버킷 ===
+
+class TokenBucket:
+    """분당 rate만큼 채워지는 버킷 (용량 = 1분치)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount를 꺼낼 수 있을 때까지 남은 시간 (0이면 바로 가능)"""
+        self._refill(now)
+        deficit = min(amount, self.capacity) - self.level
+        return max(0.0, deficit / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _KeySlot:
+    """API 키 하나의 쿼터 상태"""
+
+    __slots__ = ("key", "requests", "tokens", "blocked_until")
+
+    def __init__(self, key: Optional[str], limits: ProviderLimits):
+        self.key = key
+        self.requests = TokenBucket(limits.rpm)
+        self.tokens = TokenBucket(limits.tpm)
+        self.blocked_until = 0.0
+
+
+@dataclass
+class Lease:
+    """리미터에서 받은 호출 슬롯"""
+    key_index: int
+    tokens: float
+    started: float
+
+
+# === 프로바이더 리미터 ===
+
+class ProviderLimiter:
+    """
+    프로바이더 하나의 키 풀 + 동시 호출 수 제어 (스레드/이벤트 루프 공용)
+
+    사용:
+        lease = await limiter.aacquire(tokens)
+        ... 호출 ...
+        limiter.release(lease, "ok", latency=..., used_tokens=..., output_tokens=...)
+    """
+
+    def __init__(self, provider: str, limits: ProviderLimits, keys: Sequence[Optional[str]] = (None,)):
+        self.provider = provider
+        self.limits = limits
+        self.slots = [_KeySlot(key, limits) for key in keys] or [_KeySlot(None, limits)]
+        self.limit = float(max(1, min(limits.concurrency, limits.max_concurrency)))
+        self.inflight = 0
+        self._cursor = 0
+        self._last_decrease = 0.0
+        self._latency_per_token: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def keys(self) -> List[Optional[str]]:
+        return [slot.key for slot in self.slots]
+
+    # === 슬롯 ===
+
+    def _try_acquire(self, tokens: float) -> Tuple[Optional[Lease], float]:
+        """바로 받을 수 있으면 Lease, 아니면 (None, 다시 시도할 때까지 대기 시간)"""
+        with self._lock:
+            if self.inflight >= int(self.limit):
+                return None, POLL_INTERVAL
+            now = time.monotonic()
+            wait = float("inf")
+            for offset in range(len(self.slots)):
+                index = (self._cursor + offset) % len(self.slots)
+                slot = self.slots[index]
+                if slot.blocked_until > now:
+                    wait = min(wait, slot.blocked_until - now)
+                    continue
+                slot_wait = max(slot.requests.wait_time(1, now), slot.tokens.wait_time(tokens, now))
+                if slot_wait > 0:
+                    wait = min(wait, slot_wait)
+                    continue
+                slot.requests.take(1)
+                slot.tokens.take(tokens)
+                self.inflight += 1
+                self._cursor = index + 1
+                return Lease(index, tokens, now), 0.0
+            return None, wait
+
+    def acquire(self, tokens: float) -> Lease:
+        started = time.monotonic()
+        while True:
+            lease, wait = self._try_acquire(tokens)
+            if lease is not None:
+                self._observe_wait(started)
+                return lease
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: float) -> Lease:
+        started = time.monotonic()
+        while True:
+            lease, wait = self._try_acquire(tokens)
+            if lease is not None:
+                self._observe_wait(started)
+                return lease
+            await asyncio.sleep(wait)
+
+    def _observe_wait(self, started: float) -> None:
+        METRICS.observe(
+            "vibric_llm_ratelimit_wait_seconds", (("provider", self.provider),),
+            time.monotonic() - started, TTFT_BUCKETS
+        )
+
+    def release(
+        self,
+        lease: Lease,
+        outcome: str,
+        latency: float = 0.0,
+        used_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """
+        슬롯 반납 + 신호 반영
+
+        Args:
+            outcome: "ok" / "rate_limited" / 그 외 (에러, 신호 없음)
+            used_tokens: 실제 사용 토큰 (있으면 TPM 예약분 정산)
+            output_tokens: 출력 토큰 (있으면 출력 토큰당 지연으로 혼잡 판단)
+            retry_after: 429 응답의 retry-after (초), 그동안 이 키는 건너뜀
+        """
+        with self._lock:
+            self.inflight = max(0, self.inflight - 1)
+            slot = self.slots[lease.key_index]
+            if used_tokens is not None and used_tokens < lease.tokens:
+                slot.tokens.give_back(lease.tokens - used_tokens)
+
+            if outcome == "rate_limited":
+                if retry_after:
+                    slot.blocked_until = max(slot.blocked_until, time.monotonic() + retry_after)
+                self._decrease(lease, 0.5)
+            elif outcome == "ok":
+                self._on_success(lease, latency, output_tokens)
+
+    def _decrease(self, lease: Lease, factor: float) -> None:
+        # 마지막 감소 이전에 시작된 호출은 이미 반영된 혼잡의 신호
+        if lease.started < self._last_decrease:
+            return
+        self.limit = max(1.0, self.limit * factor)
+        self._last_decrease = time.monotonic()
+
+    def _on_success(self, lease: Lease, latency: float, output_tokens: Optional[int]) -> None:
+        if output_tokens:
+            per_token = latency / output_tokens
+            baseline = self._latency_per_token
+            self._latency_per_token = per_token if baseline is None else 0.9 * baseline + 0.1 * per_token
+            if baseline is not None and per_token > LATENCY_TOLERANCE * baseline:
+                self._decrease(lease, 0.9)
+                return
+        if self.inflight + 1 >= int(self.limit):
+            # 한도까지 쓰고 있을 때만 늘림 (여유가 있는데 올리면 429 직전까지 무의미하게 커짐)
+            self.limit = min(float(self.limits.max_concurrency), self.limit + 1.0 / self.limit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "concurrency_limit": round(self.limit, 2),
+                "inflight": self.inflight,
+                "keys": len(self.slots),
+                "blocked_keys": sum(1 for slot in self.slots if slot.blocked_until > now),
+            }
+
+
+# === 에러 분류 / 백오프 ===
+
+def _status_code(error: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """재시도할 에러면 "rate_limited" / "server_error", 아니면 None"""
+    for err in (error, error.__cause__):
+        if err is None:
+            continue
+        if isinstance(err, ModelRateLimitError) or _status_code(err) == 429:
+            return "rate_limited"
+        if isinstance(err, ModelError):
+            return "server_error" if err.is_retryable else None
+        if _status_code(err) in RETRYABLE_STATUS:
+            return "server_error"
+    return None
+
+
+def _parse_seconds(value: Any) -> Optional[float]:
+    try:
+        return max(0.0, float(str(value).strip().rstrip("s")))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """429 응답에서 대기 시간 추출 (retry-after-ms / retry-after 헤더, Google RetryInfo)"""
+    for err in (error, error.__cause__):
+        if err is None:
+            continue
+        headers = getattr(getattr(err, "response", None), "headers", None)
+        if headers is not None:
+            ms = _parse_seconds(headers.get("retry-after-ms"))
+            if ms is not None:
+                return ms / 1000
+            seconds = _parse_seconds(headers.get("retry-after"))
+            if seconds is not None:
+                return seconds
+        details = getattr(err, "details", None)
+        if isinstance(details, dict):
+            for detail in details.get("error", {}).get("details", []) or []:
+                if isinstance(detail, dict) and "retryDelay" in detail:
+                    return _parse_seconds(detail["retryDelay"])
+    return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float]) -> float:
+    """
+    재시도 전 대기 시간
+
+    retry-after가 있으면 해당 키를 리미터가 쉬게 하므로 짧은 jitter만 (다른 키가 있으면 바로 전환),
+    없으면 full jitter 지수 백오프
+    """
+    if retry_after is not None:
+        return random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def max_retries() -> int:
+    return 0 if _FAIL_FAST.get() else int(os.getenv("VIBRIC_LLM_MAX_RETRIES", "4"))
+
+
+_FAIL_FAST: ContextVar[bool] = ContextVar("vibric_rate_limit_fail_fast", default=False)
+
+
+@contextmanager
+def fail_fast() -> Iterator[None]:
+    """블록 안의 호출은 재시도 없이 바로 실패 (backup 모델로 즉시 전환하는 헤징용)"""
+    token = _FAIL_FAST.set(True)
+    try:
+        yield
+    finally:
+        _FAIL_FAST.reset(token)
+
+
+def estimate_tokens(messages: Sequence, max_output_tokens: int) -> int:
+    """TPM 예약량: 입력 추정(문자 수 / 4) + 최대 출력 토큰"""
+    chars = sum(len(str(getattr(msg, "content", msg))) for msg in messages)
+    return chars // 4 + max_output_tokens
+
+
+def _usage(message: Any) -> Tuple[Optional[int], Optional[int]]:
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return None, None
+    return usage.get("total_tokens"), usage.get("output_tokens")
+
+
+# === 전역 리미터 ===
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> ProviderLimiter:
+    """프로바이더 리미터 (환경 변수 기준, 첫 호출 시 생성)"""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(provider, limits_from_env(provider), api_keys_from_env(provider))
+            _limiters[provider] = limiter
+        return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """생성된 리미터 상태 (헬스 체크용)"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.provider: limiter.snapshot() for limiter in limiters}
+
+
+def reset_rate_limiters() -> None:
+    """리미터 초기화 (환경 변수 변경 후/테스트용)"""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+# === Chat model 믹스인 ===
+
+# 리미터를 거친 호출 안에서 다시 불린 _generate/_stream (streaming=True 모델, 기본 _agenerate의
+# executor 위임 등)은 슬롯을 또 받지 않고 그대로 통과 (중첩 획득 시 동시 호출 한도에서 교착)
+_IN_LIMITED_CALL: ContextVar[bool] = ContextVar("vibric_in_limited_call", default=False)
+
+class RateLimitMixin:
+    """
+    chat model 클래스에 프로바이더 리미터 + 재시도 + 키 풀을 더하는 믹스인
+
+    _generate/_agenerate/_stream/_astream (캐시 조회 이후의 실제 프로바이더 호출)을 감쌈.
+    키 풀의 두 번째 키부터는 같은 설정의 원본 클래스 인스턴스(_key_pool)로 호출을 넘김
+    """
+
+    def _rate_limiter(self) -> ProviderLimiter:
+        return get_rate_limiter(self._rate_provider)
+
+    def _reserve_tokens(self, messages: Sequence) -> int:
+        max_output = getattr(self, "max_tokens", None) or getattr(self, "max_output_tokens", None) or 0
+        return estimate_tokens(messages, int(max_output))
+
+    def _client_for(self, lease: Lease) -> Any:
+        """Lease의 키로 호출할 인스턴스 (None이면 자기 자신 = super())"""
+        if lease.key_index == 0 or lease.key_index > len(self._key_pool):
+            return None
+        return self._key_pool[lease.key_index - 1]
+
+    def _on_error(self, limiter: ProviderLimiter, lease: Lease, error: BaseException, attempt: int) -> float:
+        """에러 반영 후 재시도 대기 시간 반환 (재시도 불가면 다시 raise)"""
+        reason = classify_error(error)
+        retry_after = retry_after_seconds(error) if reason == "rate_limited" else None
+        limiter.release(lease, reason or "error", retry_after=retry_after)
+        if reason is None or attempt >= max_retries():
+            raise error
+        METRICS.inc("vibric_llm_retries_total", (("provider", limiter.provider), ("reason", reason)))
+        return backoff_delay(attempt, retry_after)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if _IN_LIMITED_CALL.get():
+            return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        limiter = self._rate_limiter()
+        tokens = self._reserve_tokens(messages)
+        attempt = 0
+        while True:
+            lease = limiter.acquire(tokens)
+            client = self._client_for(lease)
+            call = client._generate if client is not None else super()._generate
+            started = time.monotonic()
+            reentry = _IN_LIMITED_CALL.set(True)
+            try:
+                result = call(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                time.sleep(self._on_error(limiter, lease, e, attempt))
+                attempt += 1
+                continue
+            finally:
+                _IN_LIMITED_CALL.reset(reentry)
+            used, output = _usage(result.generations[0].message) if result.generations else (None, None)
+            limiter.release(lease, "ok", time.monotonic() - started, used, output)
+            return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if _IN_LIMITED_CALL.get():
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        limiter = self._rate_limiter()
+        tokens = self._reserve_tokens(messages)
+        attempt = 0
+        while True:
+            lease = await limiter.aacquire(tokens)
+            client = self._client_for(lease)
+            call = client._agenerate if client is not None else super()._agenerate
+            started = time.monotonic()
+            reentry = _IN_LIMITED_CALL.set(True)
+            try:
+                result = await call(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except asyncio.CancelledError:
+                limiter.release(lease, "error")
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._on_error(limiter, lease, e, attempt))
+                attempt += 1
+                continue
+            finally:
+                _IN_LIMITED_CALL.reset(reentry)
+            used, output = _usage(result.generations[0].message) if result.generations else (None, None)
+            limiter.release(lease, "ok", time.monotonic() - started, used, output)
+            return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if _IN_LIMITED_CALL.get():
+            yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return
+        limiter = self._rate_limiter()
+        tokens = self._reserve_tokens(messages)
+        attempt = 0
+        while True:
+            lease = limiter.acquire(tokens)
+            client = self._client_for(lease)
+            started = time.monotonic()
+            source = client._stream if client is not None else super()._stream
+            used = output = None
+            yielded = False
+            try:
+                for chunk in source(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    yielded = True
+                    chunk_used, chunk_output = _usage(chunk.message)
+                    used, output = chunk_used or used, chunk_output or output
+                    yield chunk
+            except GeneratorExit:
+                limiter.release(lease, "error")
+                raise
+            except Exception as e:
+                if yielded:  # 이미 내보낸 청크는 되돌릴 수 없음
+                    limiter.release(lease, classify_error(e) or "error", retry_after=retry_after_seconds(e))
+                    raise
+                time.sleep(self._on_error(limiter, lease, e, attempt))
+                attempt += 1
+                continue
+            limiter.release(lease, "ok", time.monotonic() - started, used, output)
+            return
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        if _IN_LIMITED_CALL.get():
+            async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+            return
+        limiter = self._rate_limiter()
+        tokens = self._reserve_tokens(messages)
+        attempt = 0
+        while True:
+            lease = await limiter.aacquire(tokens)
+            client = self._client_for(lease)
+            started = time.monotonic()
+            source = client._astream if client is not None else super()._astream
+            used = output = None
+            yielded = False
+            try:
+                async for chunk in source(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    yielded = True
+                    chunk_used, chunk_output = _usage(chunk.message)
+                    used, output = chunk_used or used, chunk_output or output
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                limiter.release(lease, "error")
+                raise
+            except Exception as e:
+                if yielded:
+                    limiter.release(lease, classify_error(e) or "error", retry_after=retry_after_seconds(e))
+                    raise
+                await asyncio.sleep(self._on_error(limiter, lease, e, attempt))
+                attempt += 1
+                continue
+            limiter.release(lease, "ok", time.monotonic() - started, used, output)
+            return
+
+
+_rate_limited_classes: Dict[Tuple[type, str], type] = {}
+
+
+def rate_limited_class(model_class: type, provider: str) -> type:
+    """프로바이더 chat model 클래스에 RateLimitMixin을 적용한 서브클래스"""
+    key = (model_class, provider)
+    if key not in _rate_limited_classes:
+        _rate_limited_classes[key] = type(
+            f"RateLimited{model_class.__name__}",
+            (RateLimitMixin, model_class),
+            {"_rate_provider": provider, "_key_pool": PrivateAttr(default_factory=list)}
+        )
+    return _rate_limited_classes[key]
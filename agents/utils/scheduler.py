@@ -0,0 +1,232 @@
+"""
+Run Scheduler - 그래프 실행 입장 제어
+
+세션의 그래프 실행(새 턴/재개)마다 실행 슬롯을 받아야 시작하도록 해
+버스트가 와도 프로바이더 쿼터에 동시에 몰리는 호출 수를 제한
+
+- 전역 동시 실행 상한 + 유저별 상한
+- 대기열: 우선순위(interactive > batch) → 실행 중인 run이 적은 유저 → 도착 순
+- 부하 차단: 예상 대기 시간(대기 순번 × 평균 실행 시간 / 동시 실행 수)이 한도를 넘거나
+  대기열이 가득 차면 바로 거절하고, 대기 중 한도를 넘긴 요청도 거절
+  → 입장한 세션의 지연은 한도 안으로 유지, 넘치는 요청은 빠르게 busy 응답
+
+스케줄러는 워커 프로세스마다 따로 → 전역 상한(VIBRIC_MAX_RUNS/VIBRIC_MAX_QUEUE)은
+VIBRIC_WORKERS개 워커가 나눠 가짐 (rate_limit의 RPM/TPM과 같은 방식)
+
+환경 변수:
+- VIBRIC_MAX_RUNS: 서버 전체 동시 실행 수 (기본값: 8, 워커당 올림 몫)
+- VIBRIC_MAX_RUNS_PER_USER: 유저별 동시 실행 수 (기본값: 2, 워커당 - 한 유저의 소켓이
+  여러 워커에 나뉘면 워커마다 따로 적용)
+- VIBRIC_MAX_QUEUE_WAIT: 최대 대기 시간(초, 기본값: 30)
+- VIBRIC_MAX_QUEUE: 서버 전체 최대 대기열 길이 (기본값: 100, 워커당 올림 몫)
+"""
+
+import asyncio
+import itertools
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from agents.utils.metrics import LATENCY_BUCKETS, METRICS
+from agents.utils.rate_limit import worker_count
+
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# 실행 시간 관측값이 없을 때 쓰는 평균 실행 시간 (초)
+DEFAULT_RUN_SECONDS = 20.0
+
+METRICS.describe("vibric_scheduler_admitted_total", "Runs admitted by the scheduler")
+METRICS.describe("vibric_scheduler_shed_total", "Runs rejected by load shedding, by reason")
+METRICS.describe("vibric_scheduler_queue_wait_seconds", "Time admitted runs waited in the queue")
+
+
+class SchedulerBusy(Exception):
+    """부하 차단으로 실행이 거절됨"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"서버가 혼잡합니다 ({reason}). {retry_after:.0f}초 후 다시 시도하세요.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    """대기 중인 실행 요청"""
+
+    __slots__ = ("priority", "seq", "user", "future", "enqueued_at")
+
+    def __init__(self, priority: int, seq: int, user: str, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.user = user
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class RunScheduler:
+    """
+    asyncio 기반 실행 슬롯 스케줄러 (이벤트 루프 하나에서 사용)
+
+    사용:
+        async with scheduler.slot(user_id, "interactive", on_queued=notify):
+            ... 그래프 실행 ...
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_per_user: int = 2,
+        max_queue_wait: float = 30.0,
+        max_queue: int = 100
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_user = max(1, max_per_user)
+        self.max_queue_wait = max_queue_wait
+        self.max_queue = max_queue
+        self._running = 0
+        self._running_by_user: Counter = Counter()
+        self._queue: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._avg_run_s = DEFAULT_RUN_SECONDS
+
+    # === 상태 ===
+
+    def _can_start(self, user: str) -> bool:
+        return self._running < self.max_concurrent and self._running_by_user[user] < self.max_per_user
+
+    def _order(self, ticket: _Ticket) -> tuple:
+        return (ticket.priority, self._running_by_user[ticket.user], ticket.seq)
+
+    def position(self, ticket: _Ticket) -> int:
+        """대기열 순번 (1부터)"""
+        key = self._order(ticket)
+        return 1 + sum(1 for other in self._queue if other is not ticket and self._order(other) < key)
+
+    def estimated_wait(self, position: int) -> float:
+        """순번 기준 예상 대기 시간 (초)"""
+        return position * self._avg_run_s / self.max_concurrent
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "queued": len(self._queue),
+            "max_concurrent": self.max_concurrent,
+            "avg_run_s": round(self._avg_run_s, 2),
+        }
+
+    # === 슬롯 ===
+
+    def _start(self, user: str) -> None:
+        self._running += 1
+        self._running_by_user[user] += 1
+
+    def _dispatch(self) -> None:
+        """빈 슬롯만큼 대기열에서 순서대로 입장 (유저 상한에 걸린 요청은 건너뜀)"""
+        for ticket in sorted(self._queue, key=self._order):
+            if self._running >= self.max_concurrent:
+                break
+            if ticket.future.done() or not self._can_start(ticket.user):
+                continue
+            self._queue.remove(ticket)
+            self._start(ticket.user)
+            ticket.future.set_result(True)
+
+    def _shed(self, reason: str, position: int) -> SchedulerBusy:
+        METRICS.inc("vibric_scheduler_shed_total", (("reason", reason),))
+        return SchedulerBusy(reason, retry_after=max(1.0, self.estimated_wait(position)))
+
+    async def acquire(
+        self,
+        user: str,
+        priority: str = "interactive",
+        on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None
+    ) -> None:
+        """실행 슬롯 획득 (바로 못 받으면 대기, 한도 초과 시 SchedulerBusy)"""
+        if not self._queue and self._can_start(user):
+            self._start(user)
+            return self._admitted(priority, 0.0)
+
+        ticket = _Ticket(PRIORITIES.get(priority, 0), next(self._seq), user, asyncio.get_running_loop().create_future())
+        position = self.position(ticket)
+        if len(self._queue) >= self.max_queue:
+            raise self._shed("queue_full", position)
+        if self.estimated_wait(position) > self.max_queue_wait:
+            raise self._shed("queue_wait", position)
+
+        self._queue.append(ticket)
+        self._dispatch()  # 앞선 요청이 유저 상한에 걸려 있으면 바로 입장 가능
+        if ticket.future.done():
+            return self._admitted(priority, 0.0)
+        try:
+            if on_queued is not None:
+                await on_queued(position, self.estimated_wait(position))
+            remaining = self.max_queue_wait - (time.monotonic() - ticket.enqueued_at)
+            await asyncio.wait_for(asyncio.shield(ticket.future), timeout=max(0.0, remaining))
+        except asyncio.TimeoutError:
+            if ticket.future.done():  # 타임아웃과 동시에 입장한 경우
+                return self._admitted(priority, time.monotonic() - ticket.enqueued_at)
+            raise self._shed("timeout", self.position(ticket))
+        except BaseException:
+            # 연결 종료 등으로 대기 취소 → 이미 받은 슬롯은 반납
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.release(user)
+            raise
+        finally:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                ticket.future.cancel()
+        self._admitted(priority, time.monotonic() - ticket.enqueued_at)
+
+    def _admitted(self, priority: str, waited: float) -> None:
+        METRICS.inc("vibric_scheduler_admitted_total", (("priority", priority),))
+        METRICS.observe("vibric_scheduler_queue_wait_seconds", (), waited, LATENCY_BUCKETS)
+
+    def release(self, user: str, run_seconds: Optional[float] = None) -> None:
+        """슬롯 반납 (실행 시간은 예상 대기 시간 계산용 평균에 반영)"""
+        self._running = max(0, self._running - 1)
+        self._running_by_user[user] -= 1
+        if self._running_by_user[user] <= 0:
+            del self._running_by_user[user]
+        if run_seconds is not None:
+            self._avg_run_s = 0.8 * self._avg_run_s + 0.2 * run_seconds
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user: str,
+        priority: str = "interactive",
+        on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None
+    ) -> AsyncIterator[None]:
+        """실행 슬롯 블록"""
+        await self.acquire(user, priority, on_queued)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user, time.monotonic() - started)
+
+
+# === 전역 인스턴스 ===
+
+_scheduler: Optional[RunScheduler] = None
+
+
+def _per_worker(total: int) -> int:
+    """서버 전체 상한의 워커당 몫 (올림 → 워커가 많아도 최소 1)"""
+    return -(-total // worker_count())
+
+
+def get_scheduler() -> RunScheduler:
+    """프로세스 전역 스케줄러 (환경 변수 기준, 첫 호출 시 생성)"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RunScheduler(
+            max_concurrent=_per_worker(int(os.getenv("VIBRIC_MAX_RUNS", "8"))),
+            max_per_user=int(os.getenv("VIBRIC_MAX_RUNS_PER_USER", "2")),
+            max_queue_wait=float(os.getenv("VIBRIC_MAX_QUEUE_WAIT", "30")),
+            max_queue=_per_worker(int(os.getenv("VIBRIC_MAX_QUEUE", "100")))
+        )
+    return _scheduler
@@ -0,0 +1,209 @@
+"""
+Session Bus - 워커 간 세션 이벤트 전달 + 실행 소유권
+
+uvicorn 워커 여러 개가 같은 데이터 디렉토리를 공유할 때, 세션(thread_id)의 실행 이벤트를
+클라이언트 소켓을 가진 워커로 전달하는 로컬 pub/sub 대용 (SQLite WAL 파일 하나)
+
+- events: 세션 채널별 이벤트 로그 (자동 증가 id가 커서, 재접속 시 last_event_id 이후부터 재전송)
+  같은 프로세스 구독자는 publish 즉시 깨우고, 다른 프로세스의 이벤트는 poll_interval마다 조회
+- runs: 세션별 실행 리스 (한 세션의 그래프 실행은 모든 워커를 통틀어 하나만)
+  실행 중에는 ttl/3마다 갱신, 워커가 죽으면 ttl 후 다른 워커가 가져감
+- 보존 기간(retention)이 지난 이벤트는 publish 중 주기적으로 정리
+
+환경 변수:
+- VIBRIC_BUS_PATH: DB 파일 경로 (기본값: VIBRIC_DATA_DIR/session_bus.sqlite)
+- VIBRIC_BUS_POLL_INTERVAL: 다른 워커 이벤트 조회 간격 (초, 기본값: 0.05)
+- VIBRIC_BUS_RETENTION: 이벤트 보존 기간 (초, 기본값: 3600)
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from agents.utils.scheduler import SchedulerBusy
+from agents.utils.storage import get_data_path
+
+
+# 이 프로세스의 워커 식별자 (리스 소유자 로그용)
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+RUN_LEASE_TTL = 30.0
+PRUNE_EVERY = 1000  # publish 몇 번마다 보존 기간 지난 이벤트를 정리할지
+
+
+class RunInProgress(SchedulerBusy):
+    """같은 세션의 실행이 다른 소켓/워커에서 진행 중"""
+
+    def __init__(self, owner: str, retry_after: float):
+        super().__init__("thread_running", retry_after)
+        self.owner = owner
+
+
+class SessionBus:
+    """세션 이벤트 로그 + 실행 리스 (프로세스 간 공유 SQLite)"""
+
+    def __init__(self, path: str, poll_interval: float = 0.05, retention: float = 3600.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_events_channel ON events (channel, id)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS runs (
+                thread_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._published = 0
+        # 같은 프로세스 구독자: 채널 → {(이벤트 루프, 깨우기 이벤트)}
+        self._waiters: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+    # === 이벤트 ===
+
+    def publish(self, channel: str, frame: Dict[str, Any]) -> int:
+        """이벤트 기록 후 같은 프로세스 구독자를 깨움. 이벤트 id 반환"""
+        payload = json.dumps(frame, ensure_ascii=False, default=str)
+        now = time.time()
+        with self._lock:
+            event_id = self._conn.execute(
+                "INSERT INTO events (channel, payload, created_at) VALUES (?, ?, ?)",
+                (channel, payload, now)
+            ).lastrowid
+            self._published += 1
+            if self._published % PRUNE_EVERY == 0:
+                self._conn.execute("DELETE FROM events WHERE created_at < ?", (now - self.retention,))
+            waiters = list(self._waiters.get(channel, ()))
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+        return event_id
+
+    def read(self, channel: str, after_id: int, limit: int = 500) -> List[Tuple[int, Dict[str, Any]]]:
+        """after_id 이후 이벤트 (id 순)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM events WHERE channel = ? AND id > ? ORDER BY id LIMIT ?",
+                (channel, after_id, limit)
+            ).fetchall()
+        return [(event_id, json.loads(payload)) for event_id, payload in rows]
+
+    def last_id(self, channel: str) -> int:
+        """채널의 마지막 이벤트 id (없으면 0)"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM events WHERE channel = ?", (channel,)).fetchone()
+        return row[0] or 0
+
+    async def subscribe(self, channel: str, after_id: int = 0) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """after_id 이후 이벤트를 계속 전달 (취소될 때까지)"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.setdefault(channel, set()).add(waiter)
+        try:
+            while True:
+                waiter[1].clear()
+                rows = self.read(channel, after_id)
+                for event_id, frame in rows:
+                    after_id = event_id
+                    yield event_id, frame
+                if rows:
+                    continue
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(channel)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[channel]
+
+    # === 실행 리스 ===
+
+    def acquire_run(self, thread_id: str, owner: str, ttl: float = RUN_LEASE_TTL) -> Optional[str]:
+        """세션 실행 리스 획득. 실패하면 현재 소유자 반환 (성공이면 None)"""
+        now = time.time()
+        with self._lock:
+            changed = self._conn.execute(
+                """INSERT INTO runs (thread_id, owner, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT(thread_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                   WHERE runs.expires_at < ?""",
+                (thread_id, owner, now + ttl, now)
+            ).rowcount
+            if changed:
+                return None
+            row = self._conn.execute("SELECT owner FROM runs WHERE thread_id = ?", (thread_id,)).fetchone()
+        return row[0] if row else ""
+
+    def renew_run(self, thread_id: str, owner: str, ttl: float = RUN_LEASE_TTL) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE runs SET expires_at = ? WHERE thread_id = ? AND owner = ?",
+                (time.time() + ttl, thread_id, owner)
+            ).rowcount > 0
+
+    def release_run(self, thread_id: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM runs WHERE thread_id = ? AND owner = ?", (thread_id, owner))
+
+    @asynccontextmanager
+    async def run_lease(self, thread_id: str, ttl: float = RUN_LEASE_TTL) -> AsyncIterator[str]:
+        """
+        세션 실행 블록 (리스를 못 받으면 RunInProgress)
+
+        블록 동안 ttl/3마다 리스를 갱신
+        """
+        owner = f"{WORKER_ID}/{uuid.uuid4().hex[:8]}"
+        holder = self.acquire_run(thread_id, owner, ttl)
+        if holder is not None:
+            raise RunInProgress(holder, retry_after=ttl / 3)
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(ttl / 3)
+                self.renew_run(thread_id, owner, ttl)
+
+        renewer = asyncio.create_task(heartbeat())
+        try:
+            yield owner
+        finally:
+            renewer.cancel()
+            self.release_run(thread_id, owner)
+
+
+# === 전역 인스턴스 ===
+
+_session_bus: Optional[SessionBus] = None
+_session_bus_lock = threading.Lock()
+
+
+def get_session_bus() -> SessionBus:
+    """프로세스 전역 세션 버스 (첫 호출 시 생성)"""
+    global _session_bus
+    with _session_bus_lock:
+        if _session_bus is None:
+            _session_bus = SessionBus(
+                os.getenv("VIBRIC_BUS_PATH") or str(get_data_path("session_bus.sqlite")),
+                poll_interval=float(os.getenv("VIBRIC_BUS_POLL_INTERVAL", "0.05")),
+                retention=float(os.getenv("VIBRIC_BUS_RETENTION", "3600")),
+            )
+        return _session_bus
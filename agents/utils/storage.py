@@ -0,0 +1,23 @@
+"""
+Storage - 로컬 데이터 디렉토리 관리
+
+LLM 응답 캐시 등 프로세스 간 공유되는 로컬 파일의 위치를 결정
+
+환경 변수:
+- VIBRIC_DATA_DIR: 데이터 디렉토리 (기본값: ./.vibric)
+"""
+
+import os
+from pathlib import Path
+
+
+def get_data_dir() -> Path:
+    """데이터 디렉토리 반환 (없으면 생성)"""
+    data_dir = Path(os.getenv("VIBRIC_DATA_DIR", ".vibric"))
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def get_data_path(name: str) -> Path:
+    """데이터 디렉토리 내 파일 경로"""
+    return get_data_dir() / name
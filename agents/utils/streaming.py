@@ -0,0 +1,95 @@
+"""
+Streaming Utilities - 노드 내부 이벤트 발행
+
+LangGraph custom 스트림 모드로 진행 상황 이벤트를 서버(WebSocket)까지 전달
+"""
+
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_chunk_to_message
+from langgraph.config import get_stream_writer
+
+from agents.utils.json_stream import IncrementalJSONParser, JSONPath
+
+
+def emit_event(event: Dict[str, Any]) -> None:
+    """
+    custom 스트림으로 이벤트 발행
+    
+    그래프 실행 컨텍스트 밖(직접 호출, 테스트 등)에서는 아무것도 하지 않음
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer(event)
+
+
+def emit_progress(agent: str, stage: str, **data: Any) -> None:
+    """
+    에이전트 진행 상황 이벤트 발행
+    
+    Args:
+        agent: 이벤트를 발생시킨 노드 이름
+        stage: 진행 단계 (e.g., "started", "completed", "tool_call")
+        **data: 추가 정보
+    """
+    emit_event({"type": "progress", "agent": agent, "stage": stage, **data})
+
+
+def message_text(msg: BaseMessage) -> str:
+    """메시지(청크)에서 텍스트만 추출 (content block 리스트 대응)"""
+    content = msg.content
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and block.get("type") == "text":
+            parts.append(block.get("text", ""))
+    return "".join(parts)
+
+
+# === 증분 JSON 스트리밍 ===
+
+def _finish_stream(response: Optional[AIMessageChunk]) -> AIMessage:
+    return message_chunk_to_message(response) if response is not None else AIMessage(content="")
+
+
+def stream_json(
+    llm: BaseChatModel,
+    messages: list,
+    watch: Sequence[JSONPath],
+    on_value: Callable[[JSONPath, Any], None]
+) -> AIMessage:
+    """
+    LLM 응답을 스트리밍하면서 관심 경로의 JSON 값이 완성될 때마다 on_value 호출
+    
+    Returns:
+        전체 응답 메시지 (invoke 결과와 동일)
+    """
+    parser = IncrementalJSONParser(watch)
+    response: Optional[AIMessageChunk] = None
+    for chunk in llm.stream(messages):
+        response = chunk if response is None else response + chunk
+        for path, value in parser.feed(message_text(chunk)):
+            on_value(path, value)
+    return _finish_stream(response)
+
+
+async def astream_json(
+    llm: BaseChatModel,
+    messages: list,
+    watch: Sequence[JSONPath],
+    on_value: Callable[[JSONPath, Any], None]
+) -> AIMessage:
+    """stream_json의 async 버전"""
+    parser = IncrementalJSONParser(watch)
+    response: Optional[AIMessageChunk] = None
+    async for chunk in llm.astream(messages):
+        response = chunk if response is None else response + chunk
+        for path, value in parser.feed(message_text(chunk)):
+            on_value(path, value)
+    return _finish_stream(response)
@@ -0,0 +1,254 @@
+"""
+Structured Output - 스키마 기반 에이전트 출력 파싱
+
+1. 프로바이더 native structured output (tool calling / JSON schema)
+2. 실패 시 응답 텍스트를 로컬에서 JSON 추출 + 스키마 검증
+3. 그래도 실패하면 저비용 모델로 한 번만 복구 요청
+4. 복구도 실패하면 StructuredOutputError (기본값으로 조용히 대체하지 않음)
+
+단계별 결과는 에이전트별 통계(PARSE_STATS)로 집계
+"""
+
+import json
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from pydantic import BaseModel, ValidationError
+
+from agents.utils.llm_factory import get_repair_llm
+from agents.utils.streaming import message_text
+
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class StructuredOutputError(Exception):
+    """복구 요청 후에도 스키마에 맞는 출력을 얻지 못함"""
+
+
+# === 통계 ===
+
+class ParseStats:
+    """
+    에이전트별 파싱 결과 집계
+
+    - native: 프로바이더 structured output 성공
+    - local: 로컬 추출/검증 성공
+    - repaired: 복구 요청으로 성공
+    - failed: 복구 실패
+    """
+
+    OUTCOMES = ("native", "local", "repaired", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Counter] = {}
+
+    def record(self, agent: str, outcome: str) -> None:
+        with self._lock:
+            self._counts.setdefault(agent, Counter())[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """에이전트별 집계 + 파싱 실패율(복구가 필요했던 비율)"""
+        with self._lock:
+            result = {}
+            for agent, counts in self._counts.items():
+                total = sum(counts.values())
+                result[agent] = {
+                    **{outcome: counts.get(outcome, 0) for outcome in self.OUTCOMES},
+                    "total": total,
+                    "parse_failure_rate": (counts["repaired"] + counts["failed"]) / total if total else 0.0
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+PARSE_STATS = ParseStats()
+
+
+def get_parse_stats() -> Dict[str, Dict[str, Any]]:
+    """에이전트별 파싱 통계 (편의 함수)"""
+    return PARSE_STATS.snapshot()
+
+
+# === 로컬 추출/검증 ===
+
+def parse_json_text(text: str) -> Optional[Dict[str, Any]]:
+    """
+    텍스트에서 첫 번째 JSON 객체 추출
+
+    코드 펜스/설명 문장이 섞여 있어도 각 '{' 위치에서 raw_decode를 시도하므로
+    중첩 객체와 문자열 안의 중괄호를 올바르게 처리
+    """
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value
+        except json.JSONDecodeError:
+            pass
+        start = text.find("{", start + 1)
+    return None
+
+
+def output_text(message: AIMessage) -> str:
+    """
+    검증/복구 대상 텍스트
+
+    tool calling structured output은 본문이 비어 있고 데이터가 tool_calls 인자에 있음
+    → 본문이 없으면 첫 tool call 인자(JSON), 인자 파싱에 실패한 호출이면 원본 인자 문자열
+    """
+    text = message_text(message)
+    if text.strip():
+        return text
+    if message.tool_calls:
+        return json.dumps(message.tool_calls[0]["args"], ensure_ascii=False)
+    if message.invalid_tool_calls:
+        return message.invalid_tool_calls[0].get("args") or ""
+    return text
+
+
+def validate_text(schema: Type[T], text: str) -> Tuple[Optional[T], Optional[str]]:
+    """텍스트를 스키마로 검증 → (결과, 에러 메시지)"""
+    data = parse_json_text(text)
+    if data is None:
+        return None, "JSON 객체를 찾을 수 없음"
+    try:
+        return schema.model_validate(data), None
+    except ValidationError as e:
+        return None, str(e)
+
+
+def to_message(parsed: BaseModel, raw: Optional[AIMessage] = None) -> AIMessage:
+    """검증된 결과를 정규화된 JSON 본문의 AIMessage로 변환 (원본 id/메타데이터 유지)"""
+    content = json.dumps(parsed.model_dump(), ensure_ascii=False, indent=2)
+    if raw is None:
+        return AIMessage(content=content)
+    return AIMessage(
+        content=content,
+        id=raw.id,
+        name=raw.name,
+        response_metadata=raw.response_metadata,
+        usage_metadata=raw.usage_metadata
+    )
+
+
+# === 복구 ===
+
+def _build_repair_messages(schema: Type[BaseModel], text: str, error: str) -> list:
+    schema_json = json.dumps(schema.model_json_schema(), ensure_ascii=False)
+    return [
+        SystemMessage(content="당신은 JSON 교정기입니다. 주어진 스키마에 맞는 JSON 객체 하나만 출력하세요."),
+        HumanMessage(content=f"""## 스키마
+{schema_json}
+
+## 검증 에러
+{error}
+
+## 원본 출력
+{text}
+
+원본의 내용은 유지하고 형식만 스키마에 맞게 고치세요.""")
+    ]
+
+
+def _repair_result(schema: Type[T], agent: str, response: AIMessage, error: str) -> T:
+    parsed, repair_error = validate_text(schema, message_text(response))
+    if parsed is None:
+        PARSE_STATS.record(agent, "failed")
+        raise StructuredOutputError(f"{agent} 출력 복구 실패: {repair_error} (원래 에러: {error[:200]})")
+    PARSE_STATS.record(agent, "repaired")
+    print(f"[STRUCTURED] {agent} 출력 복구 성공")
+    return parsed
+
+
+def repair(schema: Type[T], text: str, error: str, agent: str) -> T:
+    """저비용 모델로 한 번만 복구 요청"""
+    print(f"[STRUCTURED] {agent} 출력 검증 실패, 복구 요청: {error[:100]}")
+    response = get_repair_llm().invoke(_build_repair_messages(schema, text, error))
+    return _repair_result(schema, agent, response, error)
+
+
+async def arepair(schema: Type[T], text: str, error: str, agent: str) -> T:
+    """저비용 모델로 한 번만 복구 요청 (async)"""
+    print(f"[STRUCTURED] {agent} 출력 검증 실패, 복구 요청: {error[:100]}")
+    response = await get_repair_llm().ainvoke(_build_repair_messages(schema, text, error))
+    return _repair_result(schema, agent, response, error)
+
+
+# === 진입점 ===
+
+def validate_or_repair(schema: Type[T], message: AIMessage, agent: str) -> Tuple[T, AIMessage]:
+    """
+    이미 받은 응답(스트리밍 결과 등) 검증
+
+    Returns:
+        (검증된 결과, 메시지) - 복구된 경우 메시지 본문은 정규화된 JSON
+    """
+    text = output_text(message)
+    parsed, error = validate_text(schema, text)
+    if parsed is not None:
+        PARSE_STATS.record(agent, "local")
+        # tool call 인자에서 검증했으면 본문이 비어 있으므로 정규화된 JSON 본문으로
+        return parsed, message if text == message_text(message) else to_message(parsed, message)
+    parsed = repair(schema, text, error, agent)
+    return parsed, to_message(parsed, message)
+
+
+async def avalidate_or_repair(schema: Type[T], message: AIMessage, agent: str) -> Tuple[T, AIMessage]:
+    """validate_or_repair의 async 버전"""
+    text = output_text(message)
+    parsed, error = validate_text(schema, text)
+    if parsed is not None:
+        PARSE_STATS.record(agent, "local")
+        # tool call 인자에서 검증했으면 본문이 비어 있으므로 정규화된 JSON 본문으로
+        return parsed, message if text == message_text(message) else to_message(parsed, message)
+    parsed = await arepair(schema, text, error, agent)
+    return parsed, to_message(parsed, message)
+
+
+def _structured_runnable(llm: BaseChatModel, schema: Type[BaseModel]):
+    """native structured output 러너블 (지원하지 않는 모델이면 None)"""
+    try:
+        return llm.with_structured_output(schema, include_raw=True)
+    except NotImplementedError:
+        return None
+
+
+def invoke_structured(llm: BaseChatModel, messages: list, schema: Type[T], agent: str) -> Tuple[T, AIMessage]:
+    """
+    스키마 기반 호출
+
+    Returns:
+        (검증된 결과, 정규화된 JSON 본문의 AIMessage)
+    """
+    runnable = _structured_runnable(llm, schema)
+    if runnable is None:
+        return validate_or_repair(schema, llm.invoke(messages), agent)
+
+    output = runnable.invoke(messages)
+    if output["parsed"] is not None:
+        PARSE_STATS.record(agent, "native")
+        return output["parsed"], to_message(output["parsed"], output["raw"])
+    return validate_or_repair(schema, output["raw"], agent)
+
+
+async def ainvoke_structured(llm: BaseChatModel, messages: list, schema: Type[T], agent: str) -> Tuple[T, AIMessage]:
+    """invoke_structured의 async 버전"""
+    runnable = _structured_runnable(llm, schema)
+    if runnable is None:
+        return await avalidate_or_repair(schema, await llm.ainvoke(messages), agent)
+
+    output = await runnable.ainvoke(messages)
+    if output["parsed"] is not None:
+        PARSE_STATS.record(agent, "native")
+        return output["parsed"], to_message(output["parsed"], output["raw"])
+    return await avalidate_or_repair(schema, output["raw"], agent)
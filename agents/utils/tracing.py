@@ -0,0 +1,260 @@
+"""
+Tracing - 세션별 span 트레이싱
+
+그래프 노드, LLM 호출, MCP 도구 호출을 중첩 span으로 기록해
+세션 하나의 시간이 어디에 쓰였는지 flame 형태로 확인
+
+- 부모 span은 contextvar로 전파 (async 태스크/병렬 검증에도 이어짐)
+- 샘플링은 세션 단위로 결정 (세션 ID 해시) → 샘플된 세션은 모든 span 기록
+- 출력: 세션별 파일 (JSON lines 또는 Chrome trace - chrome://tracing, Perfetto)
+
+환경 변수:
+- VIBRIC_TRACE_SAMPLE_RATE: 트레이싱할 세션 비율 0.0~1.0 (기본값: 0, 비활성)
+- VIBRIC_TRACE_FORMAT: jsonl | chrome (기본값: jsonl)
+- VIBRIC_TRACE_DIR: 출력 디렉토리 (기본값: VIBRIC_DATA_DIR/traces)
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langgraph.errors import GraphInterrupt
+
+from agents.utils.storage import get_data_path
+
+
+TRACE_FORMATS = ("jsonl", "chrome")
+
+
+class Span:
+    """시간 구간 하나 (노드, LLM 호출, 도구 호출 등)"""
+
+    __slots__ = ("name", "category", "session_id", "span_id", "parent_id", "lane", "start_us", "end_us", "attrs")
+
+    def __init__(self, name: str, category: str, session_id: str, span_id: int, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.session_id = session_id
+        self.span_id = span_id
+        self.parent_id = parent.span_id if parent else None
+        # Chrome trace의 스레드 줄: 노드 단위로 나눠 병렬 노드가 겹치지 않게 표시
+        self.lane = parent.lane if parent and parent.category != "run" else name
+        self.start_us = time.time_ns() // 1000
+        self.end_us: Optional[int] = None
+        self.attrs = attrs
+
+    def set(self, **attrs: Any) -> None:
+        """속성 추가 (크기, 결과 등)"""
+        self.attrs.update(attrs)
+
+    @property
+    def duration_us(self) -> int:
+        return (self.end_us or time.time_ns() // 1000) - self.start_us
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "session_id": self.session_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_us": self.start_us,
+            "duration_us": self.duration_us,
+            "attrs": self.attrs,
+        }
+
+    def to_chrome_event(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": self.start_us,
+            "dur": self.duration_us,
+            "pid": self.session_id,
+            "tid": self.lane,
+            "args": {**self.attrs, "span_id": self.span_id, "parent_id": self.parent_id},
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("vibric_current_span", default=None)
+
+
+class Tracer:
+    """span 생성/샘플링/파일 출력"""
+
+    def __init__(self, directory: Path, fmt: str = "jsonl", sample_rate: float = 0.0):
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(f"지원하지 않는 트레이스 형식: {fmt}")
+        self.directory = directory
+        self.format = fmt
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def sampled(self, session_id: str) -> bool:
+        """세션 샘플 여부 (같은 세션은 항상 같은 결과)"""
+        if self.sample_rate >= 1:
+            return True
+        return zlib.crc32(session_id.encode("utf-8")) / 0xFFFFFFFF < self.sample_rate
+
+    def start_span(self, name: str, category: str, session_id: Optional[str] = None, **attrs: Any) -> Optional[Span]:
+        """
+        현재 span 아래에 새 span 시작 (contextvar는 바꾸지 않음)
+
+        부모가 없으면 session_id로 샘플 여부를 결정. 샘플되지 않으면 None
+        """
+        if not self.enabled:
+            return None
+        parent = _current_span.get()
+        if parent is not None:
+            session_id = parent.session_id
+        elif not session_id or not self.sampled(session_id):
+            return None
+        return Span(name, category, session_id, next(self._ids), parent, attrs)
+
+    def end_span(self, span: Optional[Span], **attrs: Any) -> None:
+        """span 종료 후 세션 파일에 기록"""
+        if span is None:
+            return
+        span.set(**attrs)
+        span.end_us = time.time_ns() // 1000
+        self._export(span)
+
+    @contextmanager
+    def span(self, name: str, category: str, session_id: Optional[str] = None, **attrs: Any) -> Iterator[Optional[Span]]:
+        """블록 단위 span (블록 안의 span은 이 span의 자식이 됨)"""
+        span = self.start_span(name, category, session_id, **attrs)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except GraphInterrupt:
+            span.set(interrupted=True)  # 유저 입력 대기 (에러 아님)
+            raise
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def path_for(self, session_id: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)
+        suffix = ".jsonl" if self.format == "jsonl" else ".trace.json"
+        return self.directory / f"{safe}{suffix}"
+
+    def _export(self, span: Span) -> None:
+        path = self.path_for(span.session_id)
+        try:
+            with self._lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                is_new = not path.exists()
+                with open(path, "a", encoding="utf-8") as f:
+                    if self.format == "jsonl":
+                        f.write(json.dumps(span.to_record(), ensure_ascii=False, default=str) + "\n")
+                    else:
+                        # Chrome trace JSON 배열 형식은 닫는 ']'가 없어도 로드됨 → append 가능
+                        if is_new:
+                            f.write("[\n")
+                        f.write(json.dumps(span.to_chrome_event(), ensure_ascii=False, default=str) + ",\n")
+        except OSError as e:
+            print(f"[TRACE] ⚠️ span 기록 실패: {e}")
+
+
+# === LLM 호출 span ===
+
+class LLMTracingHandler(BaseCallbackHandler):
+    """
+    LLM 호출을 현재 span(노드)의 자식 span으로 기록
+
+    run_inline이므로 콜백이 호출한 쪽 컨텍스트에서 실행되어 부모 span을 볼 수 있음
+    """
+
+    run_inline = True
+
+    def __init__(self, tracer_getter):
+        self._get_tracer = tracer_getter
+        self._lock = threading.Lock()
+        self._spans: Dict[UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs) -> None:
+        metadata = metadata or {}
+        span = self._get_tracer().start_span(
+            f"llm:{metadata.get('agent', 'unknown')}",
+            "llm",
+            session_id=metadata.get("thread_id"),
+            model=metadata.get("ls_model_name", ""),
+            input_messages=sum(len(batch) for batch in messages),
+            input_chars=sum(len(str(m.content)) for batch in messages for m in batch)
+        )
+        if span is not None:
+            with self._lock:
+                self._spans[run_id] = span
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs) -> None:
+        span = self._spans.get(run_id)
+        if span is not None and "ttft_ms" not in span.attrs:
+            span.set(ttft_ms=round(span.duration_us / 1000, 1))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        usage: Dict[str, int] = {}
+        output_chars = 0
+        for generations in response.generations:
+            for generation in generations:
+                output_chars += len(generation.text or "")
+                for key, value in (getattr(getattr(generation, "message", None), "usage_metadata", None) or {}).items():
+                    if isinstance(value, int):
+                        usage[key] = usage.get(key, 0) + value
+        self._get_tracer().end_span(span, output_chars=output_chars, **usage)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            span = self._spans.pop(run_id, None)
+        self._get_tracer().end_span(span, error=type(error).__name__)
+
+
+# === 전역 인스턴스 ===
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """전역 트레이서 (환경 변수 기준, 첫 호출 시 생성)"""
+    global _tracer
+    if _tracer is None:
+        directory = os.getenv("VIBRIC_TRACE_DIR")
+        _tracer = Tracer(
+            directory=Path(directory) if directory else get_data_path("traces"),
+            fmt=os.getenv("VIBRIC_TRACE_FORMAT", "jsonl"),
+            sample_rate=float(os.getenv("VIBRIC_TRACE_SAMPLE_RATE", "0"))
+        )
+    return _tracer
+
+
+LLM_TRACING = LLMTracingHandler(get_tracer)
+
+
+def trace_span(name: str, category: str, session_id: Optional[str] = None, **attrs: Any):
+    """전역 트레이서의 블록 span (편의 함수)"""
+    return get_tracer().span(name, category, session_id, **attrs)
@@ -0,0 +1,8 @@
+"""
+오프라인 벤치마크
+
+녹화 응답을 재생하는 fake 모델로 에이전트 그래프를 실행해
+orchestrator/state 변경에 따른 성능 회귀를 네트워크/API 키 없이 측정
+
+    python -m benchmarks.run --help
+"""
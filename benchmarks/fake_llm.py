@@ -0,0 +1,196 @@
+"""
+Fake LLM - 녹화된 응답을 재생하는 결정적 채팅 모델
+
+에이전트별 응답 목록을 순서대로 재생하고(마지막 응답은 반복),
+에이전트별 지연 분포(로그정규)를 시드 고정 난수로 흉내냄.
+같은 입력이 다시 오면(interrupt 재개로 노드가 재실행되는 경우) 같은 응답을 돌려줌.
+llm_factory.set_llm_override로 설치하면 그래프 코드를 바꾸지 않고 네트워크 없이 실행 가능
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from agents.utils.llm_factory import set_llm_override
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# 스트리밍 청크 크기 (문자)
+CHUNK_SIZE = 32
+
+# 같은 에이전트 LLM을 여러 용도로 쓰는 경우 마지막 메시지의 문구로 호출 종류 구분
+# → 응답은 "<에이전트>.<종류>" 키를 먼저 찾고, 없으면 "<에이전트>" 키 사용
+CALL_KINDS: Dict[str, Dict[str, str]] = {
+    "orchestrator": {
+        "plan": "실행 계획을 JSON으로 출력하세요",
+        "decide": "다음 행동을 결정하세요",
+        "interrupt": "수정 요청을 했습니다",
+    },
+}
+
+
+@dataclass
+class LatencyProfile:
+    """에이전트별 응답 지연 분포 (초 단위 중앙값, 로그정규 표준편차)"""
+    median: float = 0.0
+    sigma: float = 0.0
+    ttft_ratio: float = 0.3  # 스트리밍 시 첫 청크까지 비율
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        return self.median * math.exp(rng.gauss(0, self.sigma))
+
+
+def load_fixture(name: str = "responses") -> Dict[str, List[Any]]:
+    """fixtures/<name>.json의 에이전트별 녹화 응답"""
+    with open(FIXTURES_DIR / f"{name}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _response_key(agent: str, messages: list) -> str:
+    if not messages:
+        return agent
+    last = str(messages[-1].content)
+    for kind, marker in CALL_KINDS.get(agent, {}).items():
+        if marker in last:
+            return f"{agent}.{kind}"
+    return agent
+
+
+def _messages_key(agent: str, messages: list) -> str:
+    body = "\n".join(f"{m.type}:{m.content}" for m in messages)
+    return hashlib.sha256(f"{agent}\n{body}".encode("utf-8")).hexdigest()
+
+
+class ResponseScript:
+    """
+    에이전트별 응답 재생기
+
+    responses: {agent 또는 agent.kind: [응답, ...]} - 응답은 문자열 또는 JSON으로 직렬화할 객체
+    """
+
+    def __init__(
+        self,
+        responses: Dict[str, List[Any]],
+        latency: Optional[Dict[str, LatencyProfile]] = None,
+        seed: int = 0
+    ):
+        self.responses = {
+            agent: [r if isinstance(r, str) else json.dumps(r, ensure_ascii=False) for r in items]
+            for agent, items in responses.items()
+        }
+        self.latency = latency or {}
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._positions: Dict[str, int] = defaultdict(int)
+        self._replies: Dict[str, str] = {}  # 입력 해시 → 응답
+        self.calls: List[str] = []
+        self.model_seconds = 0.0  # 흉내낸 지연의 합 (오버헤드 계산용)
+
+    def next(self, agent: str, messages: list) -> tuple:
+        """(응답 텍스트, 지연 초)"""
+        key = _messages_key(agent, messages)
+        with self._lock:
+            self.calls.append(agent)
+            delay = self.latency_for(agent).sample(self.rng)
+            self.model_seconds += delay
+            if key not in self._replies:
+                name = _response_key(agent, messages)
+                if name not in self.responses:
+                    name = agent
+                items = self.responses.get(name) or ["{}"]
+                position = self._positions[name]
+                self._positions[name] = position + 1
+                self._replies[key] = items[min(position, len(items) - 1)]
+            return self._replies[key], delay
+
+    def latency_for(self, agent: str) -> LatencyProfile:
+        return self.latency.get(agent, self.latency.get("*", LatencyProfile()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._positions.clear()
+            self._replies.clear()
+            self.calls.clear()
+            self.model_seconds = 0.0
+
+
+class ScriptedChatModel(BaseChatModel):
+    """ResponseScript에서 응답을 받아오는 채팅 모델"""
+
+    agent: str = "unknown"
+    script: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _result(self, text: str) -> ChatResult:
+        message = AIMessage(
+            content=text,
+            usage_metadata={"input_tokens": 0, "output_tokens": len(text) // 4, "total_tokens": len(text) // 4}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, delay = self.script.next(self.agent, messages)
+        time.sleep(delay)
+        return self._result(text)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, delay = self.script.next(self.agent, messages)
+        await asyncio.sleep(delay)
+        return self._result(text)
+
+    def _chunks(self, text: str) -> Iterator[ChatGenerationChunk]:
+        for i in range(0, len(text), CHUNK_SIZE):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text[i:i + CHUNK_SIZE]))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        text, delay = self.script.next(self.agent, messages)
+        profile = self.script.latency_for(self.agent)
+        time.sleep(delay * profile.ttft_ratio)
+        chunks = list(self._chunks(text))
+        for chunk in chunks:
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            time.sleep(delay * (1 - profile.ttft_ratio) / max(1, len(chunks)))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        text, delay = self.script.next(self.agent, messages)
+        profile = self.script.latency_for(self.agent)
+        await asyncio.sleep(delay * profile.ttft_ratio)
+        chunks = list(self._chunks(text))
+        for chunk in chunks:
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(delay * (1 - profile.ttft_ratio) / max(1, len(chunks)))
+
+
+def install_fake_llms(script: ResponseScript) -> None:
+    """llm_factory가 ScriptedChatModel을 만들도록 설정"""
+    def factory(model_name: str, agent_name: Optional[str] = None, **config) -> BaseChatModel:
+        return ScriptedChatModel(agent=agent_name or model_name, script=script, **config)
+
+    set_llm_override(factory)
+
+
+def uninstall_fake_llms() -> None:
+    """오버라이드 해제"""
+    set_llm_override(None)
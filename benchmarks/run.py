@@ -0,0 +1,359 @@
+"""
+오프라인 그래프 벤치마크
+
+녹화 응답을 재생하는 fake 모델로 app 그래프를 끝까지 실행하고
+시나리오별로 다음을 측정 (네트워크/API 키 불필요)
+
+- superstep별 그래프 오버헤드 (벽시계 시간 - 흉내낸 모델 지연)
+- 체크포인트 크기와 직렬화/역직렬화 시간
+- 세션당 메모리 (tracemalloc, 별도 1회 실행)
+- 라우팅 결정 (실행된 노드 순서, 결정 경로 통계, LLM 호출 수)
+
+사용법:
+    python -m benchmarks.run                       # 전체 시나리오
+    python -m benchmarks.run -s modify -n 20       # 특정 시나리오, 반복 횟수
+    python -m benchmarks.run --latency 0.05        # 모델 지연 흉내 (중앙값 초)
+    python -m benchmarks.run --checkpointer sqlite # 서버용 SQLite 체크포인터로 측정
+    python -m benchmarks.run -o base.json          # 결과 저장
+    python -m benchmarks.run --compare base.json   # 기준 대비 회귀 검사 (초과 시 exit 1)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.fake_llm import LatencyProfile, ResponseScript, install_fake_llms, load_fixture
+from benchmarks.scenarios import SCENARIOS, Scenario
+
+
+# 회귀 검사 대상 지표 (값이 클수록 나쁨)
+COMPARED_METRICS = (
+    "wall_ms_p50",
+    "overhead_ms_per_step_p50",
+    "checkpoint_bytes_per_session",
+    "serialize_ms_per_session",
+    "memory_retained_kb",
+)
+
+
+# === 체크포인트 측정 ===
+
+class MeasuringSerializer:
+    """체크포인트 직렬화기 래퍼 - 바이트 수와 소요 시간 집계"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.reset()
+
+    def reset(self) -> None:
+        self.dumps = 0
+        self.bytes = 0
+        self.serialize_s = 0.0
+        self.deserialize_s = 0.0
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        started = time.perf_counter()
+        result = self.inner.dumps_typed(obj)
+        self.serialize_s += time.perf_counter() - started
+        self.dumps += 1
+        self.bytes += len(result[1])
+        return result
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        started = time.perf_counter()
+        result = self.inner.loads_typed(data)
+        self.deserialize_s += time.perf_counter() - started
+        return result
+
+
+CHECKPOINTERS = ("memory", "sqlite")
+
+
+def create_checkpointer(kind: str = "memory") -> Tuple[Any, MeasuringSerializer]:
+    """측정용 체크포인터와 직렬화기 (memory: InMemorySaver + JSON+, sqlite: 서버와 같은 SQLite/압축 직렬화)"""
+    if kind == "sqlite":
+        from agents.utils.checkpointer import CompactSerializer, SQLiteCheckpointSaver
+        from agents.utils.storage import get_data_path
+        serde = MeasuringSerializer(CompactSerializer())
+        return SQLiteCheckpointSaver(str(get_data_path(f"bench-{time.time_ns()}.sqlite")), serde=serde), serde
+
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    serde = MeasuringSerializer(JsonPlusSerializer())
+    return InMemorySaver(serde=serde), serde
+
+
+# === 세션 실행 ===
+
+class SessionResult:
+    """세션 1회 실행 결과"""
+
+    def __init__(self):
+        self.wall_s = 0.0
+        self.steps: List[Tuple[float, float]] = []  # (superstep 벽시계 초, 모델 지연 초)
+        self.nodes: List[str] = []
+        self.interrupts = 0
+
+
+def _resume_value(scenario: Scenario, index: int) -> Any:
+    return scenario.resumes[index] if index < len(scenario.resumes) else ""
+
+
+def _turn_inputs(scenario: Scenario, session_id: str):
+    from langchain_core.messages import HumanMessage
+    from agents.state import create_initial_state
+
+    for i, text in enumerate(scenario.turns):
+        if i == 0:
+            state = create_initial_state(session_id)
+            state["messages"] = [HumanMessage(content=text)]
+            yield state
+        else:
+            yield {"messages": [HumanMessage(content=text)]}
+
+
+class _StepClock:
+    """checkpoints 스트림 이벤트 사이 간격으로 superstep 시간 측정"""
+
+    def __init__(self, script: ResponseScript, result: SessionResult):
+        self.script = script
+        self.result = result
+        self.mark()
+
+    def mark(self) -> None:
+        self.started = time.perf_counter()
+        self.model_s = self.script.model_seconds
+
+    def tick(self) -> None:
+        self.result.steps.append((time.perf_counter() - self.started, self.script.model_seconds - self.model_s))
+        self.mark()
+
+    def observe(self, mode: str, chunk: Any) -> Optional[bool]:
+        """스트림 청크 처리 → interrupt 여부"""
+        if mode == "checkpoints":
+            self.tick()
+        elif mode == "updates":
+            for node in chunk:
+                if node == "__interrupt__":
+                    self.result.interrupts += 1
+                    return True
+                self.result.nodes.append(node)
+        return None
+
+
+def run_session(graph, scenario: Scenario, script: ResponseScript, session_id: str) -> SessionResult:
+    """시나리오 1회 실행 (sync)"""
+    from langgraph.types import Command
+
+    result = SessionResult()
+    config = {"configurable": {"thread_id": session_id}}
+    resume_index = 0
+    started = time.perf_counter()
+    for graph_input in _turn_inputs(scenario, session_id):
+        while graph_input is not None:
+            clock = _StepClock(script, result)
+            interrupted = False
+            for mode, chunk in graph.stream(graph_input, config, stream_mode=["updates", "checkpoints"]):
+                interrupted = clock.observe(mode, chunk) or interrupted
+            graph_input = None
+            if interrupted:
+                graph_input = Command(resume=_resume_value(scenario, resume_index))
+                resume_index += 1
+    result.wall_s = time.perf_counter() - started
+    return result
+
+
+async def arun_session(graph, scenario: Scenario, script: ResponseScript, session_id: str) -> SessionResult:
+    """시나리오 1회 실행 (async - 서버와 같은 경로)"""
+    from langgraph.types import Command
+
+    result = SessionResult()
+    config = {"configurable": {"thread_id": session_id}}
+    resume_index = 0
+    started = time.perf_counter()
+    for graph_input in _turn_inputs(scenario, session_id):
+        while graph_input is not None:
+            clock = _StepClock(script, result)
+            interrupted = False
+            async for mode, chunk in graph.astream(graph_input, config, stream_mode=["updates", "checkpoints"]):
+                interrupted = clock.observe(mode, chunk) or interrupted
+            graph_input = None
+            if interrupted:
+                graph_input = Command(resume=_resume_value(scenario, resume_index))
+                resume_index += 1
+    result.wall_s = time.perf_counter() - started
+    return result
+
+
+# === 시나리오 벤치마크 ===
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def benchmark_scenario(
+    scenario: Scenario,
+    iterations: int,
+    latency: float,
+    mode: str,
+    seed: int = 0,
+    checkpointer: str = "memory"
+) -> Dict[str, Any]:
+    """시나리오를 반복 실행하고 지표 집계"""
+    from agents.graph import create_agent_graph
+    from agents.routing_rules import ROUTING_STATS
+
+    script = ResponseScript(
+        scenario.build_responses(load_fixture()),
+        latency={"*": LatencyProfile(median=latency, sigma=0.5 if latency else 0.0)},
+        seed=seed
+    )
+    install_fake_llms(script)
+    saver, serde = create_checkpointer(checkpointer)
+    graph = create_agent_graph(checkpointer=saver)
+
+    def run_once(session_id: str) -> SessionResult:
+        script.reset()
+        if mode == "async":
+            return asyncio.run(arun_session(graph, scenario, script, session_id))
+        return run_session(graph, scenario, script, session_id)
+
+    ROUTING_STATS.reset()
+    results: List[SessionResult] = []
+    llm_calls: List[int] = []
+    for i in range(iterations):
+        results.append(run_once(f"bench-{scenario.name}-{i}"))
+        llm_calls.append(len(script.calls))
+    routing = ROUTING_STATS.snapshot()
+    checkpoint = {"dumps": serde.dumps, "bytes": serde.bytes, "serialize_s": serde.serialize_s, "deserialize_s": serde.deserialize_s}
+
+    # 메모리는 tracemalloc 오버헤드가 시간 측정에 섞이지 않도록 별도 실행
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    run_once(f"bench-{scenario.name}-memory")
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    walls = [r.wall_s * 1000 for r in results]
+    overheads = [max(0.0, wall - model) * 1000 for r in results for wall, model in r.steps]
+    steps_per_session = [len(r.steps) for r in results]
+    return {
+        "description": scenario.description,
+        "iterations": iterations,
+        "wall_ms_p50": round(percentile(walls, 0.5), 3),
+        "wall_ms_p95": round(percentile(walls, 0.95), 3),
+        "supersteps_per_session": round(statistics.mean(steps_per_session), 1),
+        "overhead_ms_per_step_p50": round(percentile(overheads, 0.5), 3),
+        "overhead_ms_per_step_p95": round(percentile(overheads, 0.95), 3),
+        "overhead_ms_per_step_max": round(max(overheads, default=0.0), 3),
+        "checkpoint_values_per_session": round(checkpoint["dumps"] / iterations, 1),
+        "checkpoint_bytes_per_session": round(checkpoint["bytes"] / iterations),
+        "checkpoint_bytes_per_value": round(checkpoint["bytes"] / checkpoint["dumps"]) if checkpoint["dumps"] else 0,
+        "serialize_ms_per_session": round(checkpoint["serialize_s"] * 1000 / iterations, 3),
+        "deserialize_ms_per_session": round(checkpoint["deserialize_s"] * 1000 / iterations, 3),
+        "memory_peak_kb": round((peak - baseline) / 1024, 1),
+        "memory_retained_kb": round((current - baseline) / 1024, 1),
+        "llm_calls_per_session": round(statistics.mean(llm_calls), 1),
+        "interrupts_per_session": round(statistics.mean(r.interrupts for r in results), 1),
+        "nodes": results[0].nodes if results else [],
+        "routing": routing["counts"],
+    }
+
+
+def run_benchmarks(
+    names: List[str],
+    iterations: int,
+    latency: float,
+    mode: str,
+    verbose: bool = False,
+    checkpointer: str = "memory"
+) -> Dict[str, Any]:
+    """여러 시나리오 실행 → 리포트"""
+    import langgraph
+
+    report: Dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "langgraph": getattr(langgraph, "__version__", "unknown"),
+            "mode": mode,
+            "checkpointer": checkpointer,
+            "latency_s": latency,
+            "iterations": iterations,
+        },
+        "scenarios": {},
+    }
+    for name in names:
+        print(f"[BENCH] {name} ({iterations}회, {mode})...", file=sys.stderr)
+        sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with sink:
+            report["scenarios"][name] = benchmark_scenario(SCENARIOS[name], iterations, latency, mode, checkpointer=checkpointer)
+    return report
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """기준 대비 threshold 비율 이상 나빠진 지표 목록"""
+    regressions = []
+    for name, metrics in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for key in COMPARED_METRICS:
+            before, after = base.get(key), metrics.get(key)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change > threshold:
+                regressions.append(f"{name}.{key}: {before} → {after} (+{change:.0%})")
+        if base.get("nodes") != metrics.get("nodes"):
+            regressions.append(f"{name}.nodes: 라우팅 변경 {base.get('nodes')} → {metrics.get('nodes')}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="오프라인 그래프 벤치마크")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="실행할 시나리오 (여러 번 지정 가능)")
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="흉내낼 모델 지연 중앙값 (초)")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--checkpointer", choices=CHECKPOINTERS, default="memory")
+    parser.add_argument("-o", "--output", help="JSON 리포트 저장 경로")
+    parser.add_argument("--compare", help="기준 JSON 리포트")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 판단할 증가 비율")
+    parser.add_argument("-v", "--verbose", action="store_true", help="노드 로그 출력")
+    args = parser.parse_args(argv)
+
+    # 계획 색인/산출물 저장소가 실제 데이터 디렉토리를 건드리지 않도록 격리
+    os.environ["VIBRIC_DATA_DIR"] = tempfile.mkdtemp(prefix="vibric-bench-")
+
+    report = run_benchmarks(args.scenario or list(SCENARIOS), args.iterations, args.latency, args.mode, args.verbose, args.checkpointer)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare_reports(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"[BENCH] ⚠️ 회귀: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
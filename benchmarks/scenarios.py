@@ -0,0 +1,135 @@
+"""
+벤치마크 시나리오
+
+각 시나리오는 유저 메시지 목록(첫 번째는 새 요청, 이후는 수정 요청)과
+기본 응답(fixtures/responses.json) 위에 덮어쓸 에이전트 응답으로 구성
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+
+BUILD_REQUEST = "로그인 페이지를 만들어주세요"
+
+# 응답 목록에서 같은 위치의 기본 응답을 그대로 쓰라는 표시
+FROM_FIXTURE = "__fixture__"
+
+FAILING_REVIEW = {
+    "verdict": "fail",
+    "issues": ["비밀번호 입력값 검증이 없습니다", "제출 중 버튼 비활성화가 필요합니다"],
+    "summary": "수정 필요"
+}
+
+LOGIN_PAGE = """'use client';
+
+import { useState } from 'react';
+import { isEmail } from '@/lib/validate';
+
+export default function LoginPage() {
+  const [email, setEmail] = useState('');
+  const [password, setPassword] = useState('');
+  const [submitting, setSubmitting] = useState(false);
+
+  const valid = isEmail(email) && password.length >= 8;
+
+  return (
+    <form className="mx-auto flex max-w-sm flex-col gap-3 p-6" onSubmit={() => setSubmitting(true)}>
+      <input value={email} onChange={(e) => setEmail(e.target.value)} placeholder="이메일" />
+      <input type="password" value={password} onChange={(e) => setPassword(e.target.value)} placeholder="비밀번호" />
+      <button type="submit" className="__BUTTON__" disabled={__DISABLED__}>로그인</button>
+    </form>
+  );
+}
+"""
+
+MODIFIED_CODE = {
+    "files": [{
+        "path": "src/app/login/page.tsx",
+        "content": LOGIN_PAGE.replace("__BUTTON__", "rounded bg-blue-600 px-4 py-2 text-white").replace("__DISABLED__", "submitting")
+    }],
+    "summary": "버튼 색상을 파란색으로 변경했습니다"
+}
+
+REFINED_CODE = {
+    "files": [{
+        "path": "src/app/login/page.tsx",
+        "content": LOGIN_PAGE.replace("__BUTTON__", "rounded bg-blue-600 px-4 py-2 text-white").replace("__DISABLED__", "!valid || submitting")
+    }],
+    "summary": "비밀번호 검증과 제출 중 비활성화를 추가했습니다"
+}
+
+
+@dataclass
+class Scenario:
+    """벤치마크 시나리오"""
+    name: str
+    description: str
+    turns: List[str]
+    responses: Dict[str, List[Any]] = field(default_factory=dict)  # 기본 응답 덮어쓰기
+    resumes: List[Any] = field(default_factory=list)  # interrupt 재개 값 (순서대로, 모자라면 "")
+
+    def build_responses(self, base: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+        """기본 응답에 시나리오 응답을 덮어쓴 결과"""
+        merged = dict(base)
+        for name, items in self.responses.items():
+            defaults = base.get(name, [])
+            merged[name] = [
+                defaults[min(i, len(defaults) - 1)] if item == FROM_FIXTURE and defaults else item
+                for i, item in enumerate(items)
+            ]
+        return merged
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "new_build": Scenario(
+        name="new_build",
+        description="새 요청 → planner → coder → reviewer → finish",
+        turns=[BUILD_REQUEST]
+    ),
+    "modify": Scenario(
+        name="modify",
+        description="빌드 후 부분 수정 요청 (interrupt_handler MODIFY → coder → reviewer)",
+        turns=[BUILD_REQUEST, "버튼 색상을 파란색으로 바꿔주세요"]
+    ),
+    "append": Scenario(
+        name="append",
+        description="빌드 후 기능 추가 요청 (interrupt_handler APPEND)",
+        turns=[BUILD_REQUEST, "회원가입 링크도 추가해주세요"],
+        responses={
+            "orchestrator.interrupt": [{
+                "scope": "append",
+                "confidence": 0.85,
+                "affected_agents": ["coder"],
+                "reason": "기존 유지 + 기능 추가",
+                "new_instruction": "로그인 폼 아래에 회원가입 링크 추가"
+            }],
+        }
+    ),
+    "reset": Scenario(
+        name="reset",
+        description="빌드 후 처음부터 다시 (interrupt_handler RESET → 새 계획)",
+        turns=[BUILD_REQUEST, "처음부터 다시, 대시보드 페이지로 만들어주세요"],
+        responses={
+            "orchestrator.interrupt": [{
+                "scope": "reset",
+                "confidence": 0.95,
+                "affected_agents": [],
+                "reason": "완전히 새로운 작업",
+                "new_instruction": "대시보드 페이지 구현"
+            }],
+        }
+    ),
+    "review_fail": Scenario(
+        name="review_fail",
+        description="수정 요청 후 리뷰 실패 → coder refine → 재리뷰 통과",
+        turns=[BUILD_REQUEST, "버튼 색상을 파란색으로 바꿔주세요"],
+        responses={
+            "coder": [FROM_FIXTURE, MODIFIED_CODE, REFINED_CODE],
+            "reviewer": [
+                FROM_FIXTURE,
+                FAILING_REVIEW,
+                {"verdict": "pass", "issues": [], "summary": "수정 확인, 통과"}
+            ],
+        }
+    ),
+}
@@ -0,0 +1,285 @@
+"""
+WebSocket 부하 테스트
+
+fake 모델을 설치한 서버(agents.server)를 같은 프로세스의 별도 스레드에서 띄우고,
+동시 접속 수를 단계적으로 늘리며 /ws 세션에 정해진 message 시퀀스를 보냄 (interrupt는 모두 confirm).
+
+단계별 측정:
+- 처리량 (세션/초, 프레임/초, 클라이언트당 처리량)
+- 첫 프레임 지연, 턴 완료 지연, 프레임 간격 p50/p95/p99
+- 서버 이벤트 루프 지연 (EVENT_LOOP_LAG)
+- 연결당 메모리 (RSS 증가분 / 동시 접속 수)
+- 에러율 (error 프레임, 타임아웃, 연결 실패), 입장 대기(queued)/부하 차단(busy) 횟수
+  (서버 실행 상한은 VIBRIC_MAX_RUNS 등 스케줄러 환경 변수로 조절)
+
+사용법:
+    python -m benchmarks.ws_load                             # 1,5,10,25 동시 접속
+    python -m benchmarks.ws_load -c 1 -c 50 --rounds 3       # 단계/반복 지정
+    python -m benchmarks.ws_load --latency 0.2 -o load.json  # 모델 지연 흉내, 리포트 저장
+    python -m benchmarks.ws_load --url ws://host:8000/ws     # 외부 서버 (루프 지연/메모리 제외)
+    (멀티 워커: VIBRIC_WORKERS=4 python -m agents.server 로 띄운 뒤 --url로 측정)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_llm import LatencyProfile, ResponseScript, install_fake_llms, load_fixture
+from benchmarks.run import percentile
+from benchmarks.scenarios import BUILD_REQUEST
+
+
+DEFAULT_CONCURRENCY = [1, 5, 10, 25]
+
+# 클라이언트 스크립트: 보낼 프레임 + 이 턴을 끝내는 응답 프레임 종류
+# (턴 도중 interrupt 프레임이 오면 confirm을 보내고 이어서 수신)
+SCRIPTS: Dict[str, List[Dict[str, Any]]] = {
+    "build": [
+        {"send": {"type": "message", "content": BUILD_REQUEST}, "until": ["status", "error"]},
+    ],
+    "build_modify": [
+        {"send": {"type": "message", "content": BUILD_REQUEST}, "until": ["status", "error"]},
+        {"send": {"type": "message", "content": "버튼 색상을 파란색으로 바꿔주세요"}, "until": ["status", "error"]},
+    ],
+}
+
+CONFIRM_FRAME = {"type": "confirm", "confirm": True}
+
+
+# === 측정 ===
+
+def current_rss_kb() -> float:
+    """현재 RSS (KB). /proc이 없으면 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError):
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+class StageStats:
+    """단계 하나의 클라이언트 측 집계"""
+
+    def __init__(self):
+        self.sessions = 0
+        self.failed_sessions = 0
+        self.frames = 0
+        self.error_frames = 0
+        self.timeouts = 0
+        self.interrupts = 0
+        self.queued = 0
+        self.shed = 0
+        self.first_frame_s: List[float] = []
+        self.turn_s: List[float] = []
+        self.frame_gap_s: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+    def record_error(self, e: BaseException) -> None:
+        name = type(e).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+
+async def run_client(url: str, script: List[Dict[str, Any]], stats: StageStats, timeout: float) -> None:
+    """세션 하나: 연결 → 스크립트 실행 → 종료"""
+    import websockets
+
+    failed = False
+    shed = False
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            for step in script:
+                if shed:
+                    break
+                sent = time.perf_counter()
+                last = sent
+                await ws.send(json.dumps(step["send"], ensure_ascii=False))
+                first = True
+                while True:
+                    frame = json.loads(await asyncio.wait_for(ws.recv(), timeout))
+                    now = time.perf_counter()
+                    stats.frames += 1
+                    if first:
+                        stats.first_frame_s.append(now - sent)
+                        first = False
+                    else:
+                        stats.frame_gap_s.append(now - last)
+                    last = now
+                    if frame.get("type") == "error":
+                        stats.error_frames += 1
+                        failed = True
+                    if frame.get("type") == "status" and frame.get("content") == "queued":
+                        stats.queued += 1
+                        continue  # 입장 대기 (턴 계속)
+                    if frame.get("type") == "status" and frame.get("content") == "busy":
+                        stats.shed += 1
+                        shed = True
+                    if frame.get("type") in step["until"]:
+                        stats.turn_s.append(now - sent)
+                        break
+                    if frame.get("type") == "interrupt":
+                        stats.interrupts += 1
+                        await ws.send(json.dumps(CONFIRM_FRAME))
+    except asyncio.TimeoutError as e:
+        stats.timeouts += 1
+        stats.record_error(e)
+        failed = True
+    except Exception as e:
+        stats.record_error(e)
+        failed = True
+    stats.sessions += 1
+    stats.failed_sessions += int(failed)
+
+
+async def run_stage(
+    url: str,
+    script: List[Dict[str, Any]],
+    concurrency: int,
+    rounds: int,
+    timeout: float,
+    lag_monitor=None
+) -> Dict[str, Any]:
+    """동시 접속 concurrency개 × 클라이언트당 rounds 세션"""
+    stats = StageStats()
+    rss_start = current_rss_kb()
+    rss_peak = rss_start
+    if lag_monitor is not None:
+        lag_monitor.snapshot(reset=True)
+
+    async def client() -> None:
+        for _ in range(rounds):
+            await run_client(url, script, stats, timeout)
+
+    async def sample_memory() -> None:
+        nonlocal rss_peak
+        while True:
+            rss_peak = max(rss_peak, current_rss_kb())
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_memory())
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    sampler.cancel()
+
+    def ms(values: List[float]) -> Dict[str, float]:
+        return {f"p{int(q * 100)}": round(percentile(values, q) * 1000, 2) for q in (0.5, 0.95, 0.99)}
+
+    throughput = stats.sessions / duration if duration else 0.0
+    lag = lag_monitor.snapshot(reset=True) if lag_monitor is not None else None
+    return {
+        "concurrency": concurrency,
+        "sessions": stats.sessions,
+        "duration_s": round(duration, 3),
+        "sessions_per_s": round(throughput, 3),
+        "sessions_per_s_per_client": round(throughput / concurrency, 3),
+        "frames_per_s": round(stats.frames / duration, 1) if duration else 0.0,
+        "first_frame_ms": ms(stats.first_frame_s),
+        "turn_ms": ms(stats.turn_s),
+        "frame_gap_ms": ms(stats.frame_gap_s),
+        "event_loop_lag_ms": {k: round(v * 1000, 2) if k != "samples" else v for k, v in lag.items()} if lag else None,
+        "memory_per_connection_kb": round((rss_peak - rss_start) / concurrency, 1) if lag_monitor is not None else None,
+        "error_rate": round(stats.failed_sessions / stats.sessions, 4) if stats.sessions else 0.0,
+        "error_frames": stats.error_frames,
+        "timeouts": stats.timeouts,
+        "interrupts_per_session": round(stats.interrupts / stats.sessions, 1) if stats.sessions else 0.0,
+        "queued_frames": stats.queued,
+        "shed_turns": stats.shed,
+        "errors": stats.errors,
+    }
+
+
+# === 서버 ===
+
+class LocalServer:
+    """같은 프로세스의 별도 스레드(별도 이벤트 루프)에서 실행되는 uvicorn 서버"""
+
+    def __init__(self, host: str = "127.0.0.1"):
+        import uvicorn
+        from agents.server import app
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=0, log_level="warning", ws="websockets"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "LocalServer":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("서버 시작 실패")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        return f"ws://{host}:{port}/ws"
+
+
+async def run_load(url: str, script_name: str, concurrency: List[int], rounds: int, timeout: float, lag_monitor=None) -> List[Dict[str, Any]]:
+    stages = []
+    for c in concurrency:
+        print(f"[LOAD] 동시 접속 {c} × {rounds}회 ({script_name})...", file=sys.__stderr__)
+        stages.append(await run_stage(url, SCRIPTS[script_name], c, rounds, timeout, lag_monitor))
+    return stages
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="WebSocket 부하 테스트")
+    parser.add_argument("-c", "--concurrency", type=int, action="append", help="동시 접속 수 (여러 번 지정 가능)")
+    parser.add_argument("--rounds", type=int, default=2, help="클라이언트당 세션 수")
+    parser.add_argument("--script", choices=sorted(SCRIPTS), default="build_modify")
+    parser.add_argument("--latency", type=float, default=0.0, help="흉내낼 모델 지연 중앙값 (초)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="프레임 수신 타임아웃 (초)")
+    parser.add_argument("--url", help="외부 서버 /ws 주소 (지정하지 않으면 fake 모델로 로컬 서버 실행)")
+    parser.add_argument("-o", "--output", help="JSON 리포트 저장 경로")
+    parser.add_argument("-v", "--verbose", action="store_true", help="서버 로그 출력")
+    args = parser.parse_args(argv)
+
+    concurrency = args.concurrency or DEFAULT_CONCURRENCY
+    report: Dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "script": args.script,
+            "rounds": args.rounds,
+            "latency_s": args.latency,
+            "target": args.url or "local",
+        },
+    }
+
+    if args.url:
+        report["stages"] = asyncio.run(run_load(args.url, args.script, concurrency, args.rounds, args.timeout))
+    else:
+        os.environ["VIBRIC_DATA_DIR"] = tempfile.mkdtemp(prefix="vibric-load-")
+        from agents.utils.metrics import EVENT_LOOP_LAG
+
+        install_fake_llms(ResponseScript(
+            load_fixture(),
+            latency={"*": LatencyProfile(median=args.latency, sigma=0.5 if args.latency else 0.0)}
+        ))
+        sink = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with sink, LocalServer() as server:
+            report["stages"] = asyncio.run(run_load(server.url, args.script, concurrency, args.rounds, args.timeout, EVENT_LOOP_LAG))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
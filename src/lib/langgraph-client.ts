@@ -8,9 +8,17 @@
 import { useChatStore, type AgentConfirmation } from '@/stores/chat-store';
 
 export interface LangGraphMessage {
-    type: 'message' | 'interrupt' | 'status' | 'artifact' | 'error';
+    type: 'session' | 'message' | 'token' | 'progress' | 'question' | 'interrupt' | 'status' | 'artifact' | 'error';
+    session_id?: string;
+    restored?: boolean;
+    event_id?: number;  // 세션 이벤트 번호 (재접속 시 last_event_id로 이어받기)
+    interrupt_id?: string;
+    preview?: string;
     agent?: string;
     content?: string;
+    stage?: string;
+    question?: string;
+    options?: string[];
     confirmation?: AgentConfirmation;
     artifact?: {
         path: string;
@@ -33,6 +41,8 @@ class LangGraphClient {
     private reconnectAttempts = 0;
     private maxReconnectAttempts = 5;
     private reconnectDelay = 1000;
+    private sessionId: string | null = null;  // 재접속 시 서버 체크포인트에서 세션 복원
+    private lastEventId: number | null = null;  // 재접속 시 이 이후 이벤트부터 다시 받음 (다른 워커여도)
 
     constructor(config: LangGraphClientConfig) {
         this.config = config;
@@ -48,7 +58,13 @@ class LangGraphClient {
         }
 
         try {
-            this.ws = new WebSocket(this.config.url);
+            let url = this.sessionId
+                ? `${this.config.url}${this.config.url.includes('?') ? '&' : '?'}session_id=${encodeURIComponent(this.sessionId)}`
+                : this.config.url;
+            if (this.sessionId && this.lastEventId !== null) {
+                url += `&last_event_id=${this.lastEventId}`;
+            }
+            this.ws = new WebSocket(url);
 
             this.ws.onopen = () => {
                 console.log('[LangGraph] Connected');
@@ -113,9 +129,9 @@ class LangGraphClient {
     }
 
     /**
-     * 에이전트 확인 응답
+     * 에이전트 확인 응답 (feedback이 있으면 해당 에이전트가 반영 후 계속 진행)
      */
-    confirmAgent(confirm: boolean, alternativeAgent?: string): void {
+    confirmAgent(confirm: boolean, alternativeAgent?: string, feedback?: string): void {
         if (this.ws?.readyState !== WebSocket.OPEN) {
             console.error('[LangGraph] Not connected');
             return;
@@ -125,6 +141,7 @@ class LangGraphClient {
             type: 'confirm',
             confirm,
             alternativeAgent,
+            feedback,
         };
 
         this.ws.send(JSON.stringify(payload));
@@ -143,8 +160,18 @@ class LangGraphClient {
      */
     private handleMessage(message: LangGraphMessage): void {
         console.log('[LangGraph] Received:', message.type, message.agent);
+        if (message.event_id !== undefined) {
+            this.lastEventId = message.event_id;
+        }
 
         switch (message.type) {
+            case 'session':
+                // 서버가 배정/복원한 세션 ID (재접속 시 사용)
+                if (message.session_id) {
+                    this.sessionId = message.session_id;
+                }
+                break;
+
             case 'interrupt':
                 // 에이전트 확인 요청
                 if (message.confirmation) {
@@ -161,6 +188,26 @@ class LangGraphClient {
                 }
                 break;
 
+            case 'token':
+                // LLM 토큰 스트리밍 (에이전트별)
+                if (message.content) {
+                    const { currentResponse } = useChatStore.getState();
+                    useChatStore.getState().updateStreamingResponse({
+                        message: currentResponse.message + message.content,
+                    });
+                }
+                break;
+
+            case 'progress':
+                // 노드 진행 이벤트
+                console.log('[LangGraph] Progress:', message.agent, message.stage);
+                break;
+
+            case 'question':
+                // Planner 질문 (응답 완료 전 조기 전달)
+                console.log('[LangGraph] Question:', message.question, message.options);
+                break;
+
             case 'artifact':
                 // 파일 생성/수정
                 if (message.artifact) {
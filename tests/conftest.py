@@ -0,0 +1,11 @@
+"""
+pytest 공통 설정
+
+모듈 전역 저장소(blob/이력/체크포인트/캐시/세션 버스)가 실제 데이터 디렉토리를 건드리지 않도록
+에이전트 모듈 import 전에 임시 데이터 디렉토리를 지정
+"""
+
+import os
+import tempfile
+
+os.environ["VIBRIC_DATA_DIR"] = tempfile.mkdtemp(prefix="vibric-test-")
@@ -0,0 +1,70 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command
+
+from agents.nodes.agents import _pending_approval, areviewer_approval_node, reviewer_approval_node
+from agents.state import AgentState, create_initial_state, make_artifact
+
+
+REVIEW = '{"verdict": "pass", "issues": [], "summary": "좋음"}'
+
+
+def _review_generated(state):
+    response = AIMessage(content=REVIEW)
+    artifact = make_artifact("review", "review.md", response.content, "reviewer", session_id=state["session_id"])
+    return {
+        "messages": [response],
+        "artifacts": {"review.md": artifact},
+        "pending_approval": _pending_approval("reviewer", response, artifact, True)
+    }
+
+
+def _graph(approval_node):
+    builder = StateGraph(AgentState)
+    builder.add_node("reviewer", _review_generated)
+    builder.add_node("reviewer_approval", approval_node)
+    builder.add_edge(START, "reviewer")
+    builder.add_edge("reviewer", "reviewer_approval")
+    builder.add_edge("reviewer_approval", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def test_pending_approval_keeps_reference_not_content():
+    response = AIMessage(content=REVIEW)
+    artifact = make_artifact("review", "review.md", response.content, "reviewer")
+    approval = _pending_approval("reviewer", response, artifact, True)
+    assert approval["file_path"] == "review.md"
+    assert "content" not in approval
+    assert approval["message_id"] == response.id
+
+
+def test_approval_node_resolves_content_from_artifact():
+    graph = _graph(reviewer_approval_node)
+    config = {"configurable": {"thread_id": "sync"}}
+    graph.invoke(create_initial_state("s-sync"), config)
+
+    snapshot = graph.get_state(config)
+    assert REVIEW not in str(snapshot.values["pending_approval"])
+    assert snapshot.tasks[0].interrupts[0].value["preview"] == REVIEW
+
+    result = graph.invoke(Command(resume="이슈 다시 확인"), config)
+    assert result["pending_approval"] is None
+    assert result["messages"][-1].content == "[유저 피드백] 이슈 다시 확인"
+
+
+def test_async_approval_node_matches_sync():
+    graph = _graph(areviewer_approval_node)
+    config = {"configurable": {"thread_id": "async"}}
+
+    async def run():
+        await graph.ainvoke(create_initial_state("s-async"), config)
+        preview = (await graph.aget_state(config)).tasks[0].interrupts[0].value["preview"]
+        return preview, await graph.ainvoke(Command(resume=""), config)
+
+    preview, result = asyncio.run(run())
+    assert preview == REVIEW
+    assert result["pending_approval"] is None
+    assert result["messages"][-1].content == REVIEW
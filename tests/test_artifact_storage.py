@@ -0,0 +1,90 @@
+from agents.state import get_artifact_content, make_artifact
+from agents.utils.artifact_history import ArtifactHistory, apply_delta, make_delta
+from agents.utils.blob_store import BlobStore, compute_digest, get_blob_store
+
+
+# === blob 저장소 ===
+
+def test_blob_put_is_content_addressed_and_deduplicated(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    digest = store.put("hello")
+    assert digest == compute_digest("hello".encode("utf-8"))
+    assert store.put("hello") == digest
+    assert store.get(digest) == "hello"
+    assert len(list((tmp_path / "blobs").rglob("*"))) == 2  # 디렉토리 + 파일 하나
+
+
+def test_blob_get_empty_and_missing(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    assert store.get(store.put("")) == ""
+    assert store.get("0" * 64) is None
+
+
+# === 델타 ===
+
+def test_delta_roundtrip():
+    old = "a\nb\nc\nd\n"
+    new = "a\nB\nc\nd\ne\n"
+    delta = make_delta(old, new)
+    assert apply_delta(old, delta) == new
+    assert [0, 1] in delta  # 공통 줄은 범위 복사
+
+
+# === 버전 이력 ===
+
+def _versions(n: int):
+    lines = [f"line {i}\n" for i in range(50)]
+    versions = []
+    for i in range(n):
+        lines[i] = f"changed {i}\n"
+        versions.append("".join(lines))
+    return versions
+
+
+def test_history_reconstructs_every_revision_across_keyframes(tmp_path):
+    history = ArtifactHistory(str(tmp_path / "history.sqlite"), keyframe_interval=3)
+    versions = _versions(7)
+    for content in versions:
+        history.append("s", "code.tsx", content, compute_digest(content.encode("utf-8")))
+    
+    revisions = history.revisions("s", "code.tsx")
+    assert [r["keyframe"] for r in revisions] == [True, False, False, True, False, False, True]
+    for revision, content in enumerate(versions, start=1):
+        assert history.get("s", "code.tsx", revision) == content
+
+
+def test_history_skips_unchanged_content(tmp_path):
+    history = ArtifactHistory(str(tmp_path / "history.sqlite"))
+    digest = compute_digest(b"same")
+    assert history.append("s", "a.md", "same", digest) is None
+    assert history.append("s", "a.md", "same", digest) is None
+    assert len(history.revisions("s", "a.md")) == 1
+
+
+def test_find_by_digest_restores_old_revision(tmp_path):
+    history = ArtifactHistory(str(tmp_path / "history.sqlite"))
+    old, new = _versions(2)
+    old_digest = compute_digest(old.encode("utf-8"))
+    history.append("s", "code.tsx", old, old_digest)
+    history.append("s", "code.tsx", new, compute_digest(new.encode("utf-8")))
+    assert history.find_by_digest(old_digest) == old
+    assert history.find_by_digest("missing") is None
+
+
+# === 산출물 (공유 blob 저장소) ===
+
+def test_superseded_version_stays_readable_for_other_sessions():
+    shared = make_artifact("code", "code.tsx", "export const shared = 1\n", "coder", session_id="session-a")
+    make_artifact("code", "code.tsx", "export const shared = 1\n", "coder", session_id="session-b")
+    # session-a만 새 버전으로 교체
+    make_artifact("code", "code.tsx", "export const shared = 2\n", "coder", session_id="session-a")
+    assert get_blob_store().exists(shared["digest"])  # 델타 재생 없이 blob에서 바로 조회
+    assert get_artifact_content(shared) == "export const shared = 1\n"
+
+
+def test_artifact_without_history_survives_identical_content_being_replaced():
+    detached = make_artifact("plan", "plan.md", "# 공유 기획\n", "planner")
+    make_artifact("plan", "plan.md", "# 공유 기획\n", "planner", session_id="session-c")
+    make_artifact("plan", "plan.md", "# 수정된 기획\n", "planner", session_id="session-c")
+    assert get_blob_store().exists(detached["digest"])
+    assert get_artifact_content(detached) == "# 공유 기획\n"
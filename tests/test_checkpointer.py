@@ -0,0 +1,132 @@
+import asyncio
+import operator
+from typing import Annotated, List
+
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, interrupt
+from typing_extensions import TypedDict
+
+from agents.utils.checkpointer import COMPRESSED_SUFFIX, CompactSerializer, SQLiteCheckpointSaver
+
+
+# === 직렬화 ===
+
+def test_small_values_are_not_compressed():
+    serde = CompactSerializer(compress_min_bytes=1024)
+    type_, data = serde.dumps_typed({"a": 1})
+    assert not type_.endswith(COMPRESSED_SUFFIX)
+    assert serde.loads_typed((type_, data)) == {"a": 1}
+
+
+def test_large_compressible_values_roundtrip_compressed():
+    serde = CompactSerializer(compress_min_bytes=64)
+    value = {"messages": ["같은 문장 반복 " * 50] * 10}
+    type_, data = serde.dumps_typed(value)
+    assert type_.endswith(COMPRESSED_SUFFIX)
+    assert serde.loads_typed((type_, data)) == value
+
+
+# === 체크포인터 ===
+
+class State(TypedDict):
+    log: Annotated[List[str], operator.add]
+    counter: int
+
+
+def _graph(saver):
+    def first(state):
+        return {"log": ["first"], "counter": state["counter"] + 1}
+
+    def approval(state):
+        answer = interrupt({"stage": "confirm"})
+        return {"log": [f"approved:{answer}"]}
+
+    def last(state):
+        return {"log": ["last"]}
+
+    builder = StateGraph(State)
+    builder.add_node("first", first)
+    builder.add_node("approval", approval)
+    builder.add_node("last", last)
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "approval")
+    builder.add_edge("approval", "last")
+    builder.add_edge("last", END)
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id="t1"):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_interrupt_and_resume_survive_reopening(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    _graph(SQLiteCheckpointSaver(path)).invoke({"log": [], "counter": 0}, _config())
+
+    # 새 인스턴스(재시작/다른 워커)에서 같은 파일로 재개
+    graph = _graph(SQLiteCheckpointSaver(path))
+    snapshot = graph.get_state(_config())
+    assert snapshot.next == ("approval",)
+    assert snapshot.tasks[0].interrupts[0].value == {"stage": "confirm"}
+
+    result = graph.invoke(Command(resume="yes"), _config())
+    assert result["log"] == ["first", "approved:yes", "last"]
+    assert result["counter"] == 1
+
+
+def test_unchanged_channels_are_stored_once(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    graph = _graph(saver)
+    graph.invoke({"log": [], "counter": 0}, _config())
+    graph.invoke(Command(resume="yes"), _config())
+    counter_versions = saver._conn.execute(
+        "SELECT COUNT(*) FROM blobs WHERE thread_id = 't1' AND channel = 'counter'"
+    ).fetchone()[0]
+    checkpoints = saver._conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = 't1'").fetchone()[0]
+    assert counter_versions == 2  # 입력 + first (이후 체크포인트는 같은 버전 참조)
+    assert checkpoints > counter_versions
+
+
+def test_history_list_filter_limit_and_before(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    graph = _graph(saver)
+    graph.invoke({"log": [], "counter": 0}, _config())
+    graph.invoke(Command(resume="yes"), _config())
+
+    history = list(saver.list(_config()))
+    ids = [item.config["configurable"]["checkpoint_id"] for item in history]
+    assert ids == sorted(ids, reverse=True)
+    assert history[0].parent_config["configurable"]["checkpoint_id"] == ids[1]
+    assert len(list(saver.list(_config(), limit=2))) == 2
+    assert [c.config for c in saver.list(_config(), before=history[0].config)] == [c.config for c in history[1:]]
+    inputs = list(saver.list(_config(), filter={"source": "input"}))
+    assert inputs and all(item.metadata["source"] == "input" for item in inputs)
+
+
+def test_pending_writes_and_delete_thread(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    graph = _graph(saver)
+    graph.invoke({"log": [], "counter": 0}, _config("t1"))
+    graph.invoke({"log": [], "counter": 0}, _config("t2"))
+
+    latest = saver.get_tuple(_config("t1"))
+    assert any(channel == "__interrupt__" for _, channel, _ in latest.pending_writes)
+
+    saver.delete_thread("t1")
+    assert saver.get_tuple(_config("t1")) is None
+    assert saver.get_tuple(_config("t2")) is not None
+
+
+def test_async_api_matches_sync(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    graph = _graph(saver)
+
+    async def run():
+        await graph.ainvoke({"log": [], "counter": 0}, _config())
+        result = await graph.ainvoke(Command(resume="ok"), _config())
+        items = [item async for item in saver.alist(_config(), limit=1)]
+        return result, items, await saver.aget_tuple(_config())
+
+    result, items, latest = asyncio.run(run())
+    assert result["log"][-1] == "last"
+    assert items[0].config == latest.config
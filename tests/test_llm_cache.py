@@ -0,0 +1,53 @@
+import time
+
+from agents.utils import llm_cache
+from agents.utils.llm_cache import ResponseCache
+
+
+def _cache(tmp_path, **kwargs) -> ResponseCache:
+    return ResponseCache(str(tmp_path / "cache.sqlite"), **kwargs)
+
+
+def test_put_get_roundtrip(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("a", "value")
+    assert cache.get("a") == "value"
+    assert cache.get("missing") is None
+
+
+def test_evicts_least_recently_used_over_entry_limit(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    time.sleep(0.01)
+    cache.get("a")  # b가 가장 오래 전에 접근됨
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_evicts_over_byte_limit(tmp_path):
+    cache = _cache(tmp_path, max_bytes=10)
+    cache.put("a", "x" * 6)
+    cache.put("b", "y" * 6)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+
+
+def test_replacing_key_keeps_counters_exact(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    for _ in range(5):
+        cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1" and cache.get("b") == "2"
+    assert (cache._count, cache._bytes) == cache._totals()
+
+
+def test_expired_entries_swept_periodically(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "SWEEP_EVERY", 2)
+    cache = _cache(tmp_path, ttl_seconds=0.01)
+    cache.put("old", "1")
+    time.sleep(0.05)
+    cache.put("new", "2")  # 두 번째 put에서 만료 항목 정리
+    assert cache._totals() == (1, 1)
+    assert cache._count == 1
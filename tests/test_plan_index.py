@@ -0,0 +1,67 @@
+from agents.plan_index import (
+    DRAFT_THRESHOLD,
+    REUSE_THRESHOLD,
+    PlanIndex,
+    minhash,
+    normalize_request,
+    plan_template,
+    similarity,
+)
+
+
+PLAN = {
+    "goal": "로그인 페이지",
+    "required_agents": ["planner", "coder", "reviewer"],
+    "steps": [{"step_number": 1, "agent": "planner", "instruction": "기획", "expected_output": "plan.md", "completed": True}],
+    "created_at": "2026-01-01T00:00:00",
+}
+
+
+def test_normalize_ignores_case_and_punctuation():
+    assert normalize_request("Login  Page!!") == normalize_request("login page")
+
+
+def test_similarity_of_identical_and_unrelated_requests():
+    a = minhash("이메일 로그인 페이지를 만들어주세요")
+    assert similarity(a, minhash("이메일 로그인 페이지를 만들어주세요")) == 1.0
+    assert similarity(a, minhash("주식 차트 대시보드 구현")) < DRAFT_THRESHOLD
+
+
+def test_spacing_differences_do_not_change_signature():
+    assert minhash("로그인 페이지 만들어줘") == minhash("로그인페이지 만들어 줘")
+
+
+def test_find_reuses_near_duplicate_request(tmp_path):
+    index = PlanIndex(str(tmp_path / "plans.json"))
+    index.add("이메일 로그인 페이지를 만들어주세요", plan_template(PLAN))
+    match = index.find("이메일 로그인 페이지를 만들어 주세요!")
+    assert match is not None and match.score >= REUSE_THRESHOLD
+    assert match.plan["steps"][0]["agent"] == "planner"
+    assert "completed" not in match.plan["steps"][0]
+
+
+def test_find_returns_none_without_candidates(tmp_path):
+    index = PlanIndex(str(tmp_path / "plans.json"))
+    index.add("이메일 로그인 페이지를 만들어주세요", plan_template(PLAN))
+    assert index.find("zzzz qqqq") is None
+
+
+def test_persisted_index_is_reloaded(tmp_path):
+    path = str(tmp_path / "plans.json")
+    PlanIndex(path).add("회원가입 폼 만들기", plan_template(PLAN))
+    reloaded = PlanIndex(path)
+    assert len(reloaded) == 1
+    assert reloaded.find("회원가입 폼 만들기").score == 1.0
+
+
+def test_same_request_updates_entry_and_least_recently_used_is_evicted(tmp_path):
+    index = PlanIndex(str(tmp_path / "plans.json"), max_entries=2)
+    index.add("첫 번째 요청 페이지", plan_template(PLAN))
+    index.add("첫 번째 요청 페이지", plan_template(PLAN))
+    assert len(index) == 1
+    index.add("두 번째 요청 대시보드", plan_template(PLAN))
+    index.find("첫 번째 요청 페이지")  # 첫 번째를 최근 사용으로
+    index.add("세 번째 요청 설정 화면", plan_template(PLAN))
+    assert len(index) == 2
+    assert index.find("두 번째 요청 대시보드") is None or index.find("두 번째 요청 대시보드").request != "두 번째 요청 대시보드"
+    assert index.find("첫 번째 요청 페이지").request == "첫 번째 요청 페이지"
@@ -0,0 +1,182 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from agents.utils import rate_limit
+from agents.utils.rate_limit import (
+    ProviderLimiter,
+    ProviderLimits,
+    TokenBucket,
+    classify_error,
+    limits_from_env,
+    rate_limited_class,
+    retry_after_seconds,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def _limiter(keys=(None,), concurrency=4, max_concurrency=8, rpm=600, tpm=100_000):
+    return ProviderLimiter("gpt", ProviderLimits(rpm, tpm, concurrency, max_concurrency), keys)
+
+
+# === 토큰 버킷 ===
+
+def test_bucket_refills_at_per_minute_rate():
+    bucket = TokenBucket(60)  # 초당 1
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == 0
+    assert bucket.wait_time(120, now + 1.0) == pytest.approx(59.0)  # 용량 초과 요청은 가득 찰 때까지
+
+
+def test_give_back_is_capped_at_capacity():
+    bucket = TokenBucket(10)
+    bucket.take(3)
+    bucket.give_back(100)
+    assert bucket.level == bucket.capacity
+
+
+# === 리미터 ===
+
+def test_round_robin_and_tpm_settlement():
+    limiter = _limiter(keys=("k1", "k2"), tpm=1000)
+    first = limiter.acquire(400)
+    second = limiter.acquire(400)
+    assert (first.key_index, second.key_index) == (0, 1)
+
+    limiter.release(first, "ok", used_tokens=100)
+    assert limiter.slots[0].tokens.level == pytest.approx(900, abs=1)
+
+
+def test_rate_limited_key_is_skipped_for_retry_after():
+    limiter = _limiter(keys=("k1", "k2"))
+    lease = limiter.acquire(10)
+    limiter.release(lease, "rate_limited", retry_after=60)
+    assert limiter.snapshot()["blocked_keys"] == 1
+    used = set()
+    for _ in range(3):
+        lease = limiter.acquire(10)
+        used.add(lease.key_index)
+        limiter.release(lease, "error")
+    assert used == {1}
+
+
+def test_concurrency_limit_blocks_until_release():
+    limiter = _limiter(concurrency=1)
+    lease = limiter.acquire(10)
+    assert limiter._try_acquire(10)[0] is None
+    limiter.release(lease, "error")
+    assert limiter._try_acquire(10)[0] is not None
+
+
+def test_burst_of_429s_halves_limit_once():
+    limiter = _limiter(concurrency=8)
+    leases = [limiter.acquire(1) for _ in range(8)]
+    for lease in leases:
+        limiter.release(lease, "rate_limited")
+    assert limiter.limit == 4.0  # 감소 이전에 시작된 호출의 429는 다시 반영하지 않음
+
+    limiter.release(limiter.acquire(1), "rate_limited")
+    assert limiter.limit == 2.0
+
+
+def test_success_grows_limit_only_when_saturated():
+    limiter = _limiter(concurrency=2, max_concurrency=3)
+    limiter.release(limiter.acquire(1), "ok")
+    assert limiter.limit == 2.0  # 여유가 있으면 그대로
+
+    held = limiter.acquire(1)
+    limiter.release(limiter.acquire(1), "ok")
+    assert limiter.limit == 2.5
+    limiter.release(held, "ok")
+
+
+def test_latency_spike_decreases_limit():
+    limiter = _limiter(concurrency=10, max_concurrency=10)
+    limiter.release(limiter.acquire(1), "ok", latency=1.0, output_tokens=100)
+    limiter.release(limiter.acquire(1), "ok", latency=5.0, output_tokens=100)
+    assert limiter.limit == pytest.approx(9.0)
+
+
+def test_limits_are_split_across_workers(monkeypatch):
+    monkeypatch.setenv("VIBRIC_WORKERS", "4")
+    monkeypatch.setenv("VIBRIC_GPT_RPM", "400")
+    limits = limits_from_env("gpt")
+    assert limits.rpm == 100
+    assert limits.tpm == rate_limit.DEFAULT_LIMITS["gpt"].tpm / 4
+
+
+# === 에러 분류 ===
+
+def test_classify_error():
+    assert classify_error(StatusError(429)) == "rate_limited"
+    assert classify_error(StatusError(503)) == "server_error"
+    assert classify_error(StatusError(400)) is None
+    wrapped = RuntimeError("wrapped")
+    wrapped.__cause__ = StatusError(429)
+    assert classify_error(wrapped) == "rate_limited"
+
+
+def test_retry_after_sources():
+    assert retry_after_seconds(StatusError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(StatusError(429, {"retry-after": "7"})) == 7.0
+    google = Exception("quota")
+    google.details = {"error": {"details": [{"retryDelay": "12s"}]}}
+    assert retry_after_seconds(google) == 12.0
+    assert retry_after_seconds(StatusError(429)) is None
+
+
+# === 믹스인 ===
+
+class FlakyChatModel(FakeListChatModel):
+    """처음 failures번은 실패하는 fake 모델"""
+    failures: list = []
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.failures:
+            raise self.failures.pop(0)
+        return super()._call(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+@pytest.fixture
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limit, "backoff_delay", lambda attempt, retry_after: 0.0)
+    rate_limit.reset_rate_limiters()
+    yield
+    rate_limit.reset_rate_limiters()
+
+
+def test_mixin_retries_429_and_moves_to_next_key(fresh_limiters):
+    model_class = rate_limited_class(FlakyChatModel, "gpt")
+    llm = model_class(responses=["ok"], failures=[StatusError(429, {"retry-after": "30"})])
+    backup = FlakyChatModel(responses=["from key 2"])
+    llm._key_pool = [backup]
+    rate_limit._limiters["gpt"] = _limiter(keys=("k1", "k2"))
+
+    assert llm.invoke([HumanMessage(content="hi")]).content == "from key 2"
+    assert rate_limit.get_rate_limit_stats()["gpt"]["blocked_keys"] == 1
+
+
+def test_mixin_does_not_retry_client_errors(fresh_limiters):
+    model_class = rate_limited_class(FlakyChatModel, "gpt")
+    llm = model_class(responses=["ok"], failures=[StatusError(400)])
+    with pytest.raises(StatusError):
+        llm.invoke([HumanMessage(content="hi")])
+    assert rate_limit.get_rate_limit_stats()["gpt"]["inflight"] == 0
+
+
+def test_fail_fast_skips_retries(fresh_limiters):
+    model_class = rate_limited_class(FlakyChatModel, "gpt")
+    llm = model_class(responses=["ok"], failures=[StatusError(503)])
+    with rate_limit.fail_fast(), pytest.raises(StatusError):
+        llm.invoke([HumanMessage(content="hi")])
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from agents.routing_rules import MAX_VERIFY_ATTEMPTS, decide_by_rules
+from agents.state import AgentError, create_initial_state, make_artifact
+
+
+def _state_with_code():
+    state = create_initial_state(session_id="routing-test")
+    code = make_artifact("code", "code.tsx", "export default function Page() {}", "coder")
+    state["artifacts"] = {"code.tsx": code}
+    return state, code
+
+
+def _verifier_error(agent: str, after: str) -> AgentError:
+    occurred = (datetime.fromisoformat(after) + timedelta(seconds=1)).isoformat()
+    return AgentError(agent=agent, error_type="RuntimeError", message="boom", recoverable=True, occurred_at=occurred)
+
+
+def test_unverified_code_requests_verification():
+    state, _ = _state_with_code()
+    path, update = decide_by_rules(state)
+    assert path == "rule:verify_new_code"
+    assert update["next_agent"] == "reviewer"
+
+
+def test_verification_retried_after_verifier_error():
+    state, code = _state_with_code()
+    state["execution_plan"] = {
+        "goal": "", "required_agents": [], "created_at": "",
+        "steps": [
+            {"step_number": 1, "agent": "reviewer", "instruction": "", "expected_output": "", "completed": False},
+            {"step_number": 2, "agent": "tester", "instruction": "", "expected_output": "", "completed": False},
+        ],
+    }
+    state["errors"] = [_verifier_error("reviewer", code["created_at"]), _verifier_error("tester", code["created_at"])]
+    path, update = decide_by_rules(state)
+    assert path == "rule:verify_new_code"
+    assert update["next_agent"] == "quality_gate"
+
+
+def test_verification_gives_up_after_repeated_verifier_errors():
+    state, code = _state_with_code()
+    state["errors"] = [_verifier_error("reviewer", code["created_at"]) for _ in range(MAX_VERIFY_ATTEMPTS)]
+    path, update = decide_by_rules(state)
+    assert path == "rule:verify_new_code"
+    assert update["next_agent"] == "finish"
+
+
+def test_errors_before_latest_code_are_ignored():
+    state, code = _state_with_code()
+    earlier = (datetime.fromisoformat(code["created_at"]) - timedelta(hours=1)).isoformat()
+    state["errors"] = [_verifier_error("reviewer", earlier) for _ in range(MAX_VERIFY_ATTEMPTS)]
+    _, update = decide_by_rules(state)
+    assert update["next_agent"] == "reviewer"
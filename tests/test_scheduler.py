@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from agents.utils import scheduler as scheduler_module
+from agents.utils.scheduler import RunScheduler, SchedulerBusy
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_admits_immediately_under_limits():
+    async def scenario():
+        scheduler = RunScheduler(max_concurrent=2, max_per_user=2)
+        await scheduler.acquire("a")
+        await scheduler.acquire("b")
+        return scheduler.snapshot()
+
+    assert run(scenario())["running"] == 2
+
+
+def test_queued_run_starts_when_slot_released():
+    async def scenario():
+        scheduler = RunScheduler(max_concurrent=1, max_per_user=1)
+        await scheduler.acquire("a")
+        positions = []
+
+        async def on_queued(position, wait):
+            positions.append(position)
+
+        waiter = asyncio.create_task(scheduler.acquire("b", on_queued=on_queued))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        scheduler.release("a", run_seconds=1.0)
+        await asyncio.wait_for(waiter, 1)
+        return positions, scheduler.snapshot()
+
+    positions, snapshot = run(scenario())
+    assert positions == [1]
+    assert snapshot["running"] == 1 and snapshot["queued"] == 0
+
+
+def test_interactive_jumps_ahead_of_batch():
+    async def scenario():
+        scheduler = RunScheduler(max_concurrent=1, max_per_user=5)
+        await scheduler.acquire("a")
+        order = []
+
+        async def enqueue(user, priority):
+            await scheduler.acquire(user, priority)
+            order.append(user)
+
+        batch = asyncio.create_task(enqueue("batch", "batch"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(enqueue("live", "interactive"))
+        await asyncio.sleep(0)
+        scheduler.release("a")
+        while not order:
+            await asyncio.sleep(0.01)
+        scheduler.release(order[0])
+        await asyncio.wait_for(asyncio.gather(batch, interactive), 1)
+        return order
+
+    assert run(scenario()) == ["live", "batch"]
+
+
+def test_per_user_cap_lets_other_users_pass():
+    async def scenario():
+        scheduler = RunScheduler(max_concurrent=3, max_per_user=1)
+        await scheduler.acquire("a")
+        blocked = asyncio.create_task(scheduler.acquire("a"))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(scheduler.acquire("b"), 1)
+        done = blocked.done()
+        blocked.cancel()
+        return done, scheduler.snapshot()
+
+    done, snapshot = run(scenario())
+    assert not done
+    assert snapshot["running"] == 2
+
+
+def test_sheds_when_queue_full():
+    async def scenario():
+        scheduler = RunScheduler(max_concurrent=1, max_per_user=1, max_queue=1)
+        await scheduler.acquire("a")
+        queued = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        try:
+            await scheduler.acquire("c")
+        finally:
+            queued.cancel()
+
+    with pytest.raises(SchedulerBusy) as exc:
+        run(scenario())
+    assert exc.value.reason == "queue_full"
+
+
+def test_sheds_when_estimated_wait_exceeds_limit():
+    async def scenario():
+        scheduler = RunScheduler(max_concurrent=1, max_per_user=1, max_queue_wait=5.0)
+        await scheduler.acquire("a")
+        scheduler.release("a", run_seconds=60.0)  # 평균 실행 시간 상승
+        await scheduler.acquire("a")
+        await scheduler.acquire("b")
+
+    with pytest.raises(SchedulerBusy) as exc:
+        run(scenario())
+    assert exc.value.reason == "queue_wait"
+    assert exc.value.retry_after > 5.0
+
+
+def test_sheds_on_timeout_and_leaves_queue_clean():
+    async def scenario():
+        scheduler = RunScheduler(max_concurrent=1, max_per_user=1, max_queue_wait=0.05)
+        scheduler._avg_run_s = 0.01
+        await scheduler.acquire("a")
+        with pytest.raises(SchedulerBusy) as exc:
+            await scheduler.acquire("b")
+        return exc.value.reason, scheduler.snapshot()
+
+    reason, snapshot = run(scenario())
+    assert reason == "timeout"
+    assert snapshot["queued"] == 0 and snapshot["running"] == 1
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def scenario():
+        scheduler = RunScheduler(max_concurrent=1, max_per_user=1)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release("a")
+        await asyncio.wait_for(scheduler.acquire("c"), 1)
+        return scheduler.snapshot()
+
+    snapshot = run(scenario())
+    assert snapshot["running"] == 1 and snapshot["queued"] == 0
+
+
+def test_global_caps_are_split_across_workers(monkeypatch):
+    monkeypatch.setenv("VIBRIC_WORKERS", "3")
+    monkeypatch.setenv("VIBRIC_MAX_RUNS", "8")
+    monkeypatch.setenv("VIBRIC_MAX_QUEUE", "100")
+    monkeypatch.setattr(scheduler_module, "_scheduler", None)
+    scheduler = scheduler_module.get_scheduler()
+    assert scheduler.max_concurrent == 3
+    assert scheduler.max_queue == 34
+    assert scheduler.max_per_user == 2
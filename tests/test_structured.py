@@ -0,0 +1,94 @@
+import json
+from typing import Literal
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+from agents.utils import structured
+from agents.utils.structured import (
+    StructuredOutputError,
+    avalidate_or_repair,
+    output_text,
+    parse_json_text,
+    validate_or_repair,
+)
+
+
+class Verdict(BaseModel):
+    verdict: Literal["pass", "fail"]
+    issues: list[str] = []
+
+
+@pytest.fixture
+def repair_llm(monkeypatch):
+    """복구 요청 본문을 기록하고 정해진 응답을 돌려주는 가짜 복구 모델"""
+    calls = []
+    reply = {"content": '{"verdict": "fail", "issues": ["누락"]}'}
+
+    def respond(messages):
+        calls.append(messages[-1].content)
+        return AIMessage(content=reply["content"])
+
+    monkeypatch.setattr(structured, "get_repair_llm", lambda: RunnableLambda(respond))
+    return calls, reply
+
+
+def test_parse_json_text_skips_prose_and_fences():
+    text = '설명 {not json} 입니다\n```json\n{"a": {"b": "}"}}\n```'
+    assert parse_json_text(text) == {"a": {"b": "}"}}
+
+
+def test_output_text_uses_tool_call_args_when_content_empty():
+    message = AIMessage(content="", tool_calls=[{"name": "Verdict", "args": {"verdict": "maybe"}, "id": "1"}])
+    assert json.loads(output_text(message)) == {"verdict": "maybe"}
+
+
+def test_output_text_uses_invalid_tool_call_args():
+    message = AIMessage(content="", invalid_tool_calls=[{"name": "Verdict", "args": '{"verdict": "pass"', "id": "1", "error": None}])
+    assert output_text(message) == '{"verdict": "pass"'
+
+
+def test_valid_text_needs_no_repair(repair_llm):
+    calls, _ = repair_llm
+    parsed, _ = validate_or_repair(Verdict, AIMessage(content='결과: {"verdict": "pass"}'), "test")
+    assert parsed.verdict == "pass"
+    assert calls == []
+
+
+def test_tool_call_args_validated_locally_get_json_content(repair_llm):
+    calls, _ = repair_llm
+    message = AIMessage(content="", tool_calls=[{"name": "Verdict", "args": {"verdict": "pass"}, "id": "1"}])
+    parsed, normalized = validate_or_repair(Verdict, message, "test")
+    assert parsed.verdict == "pass" and calls == []
+    assert json.loads(normalized.content)["verdict"] == "pass"
+
+
+def test_tool_call_output_is_repaired_from_args(repair_llm):
+    calls, _ = repair_llm
+    message = AIMessage(content="", tool_calls=[{"name": "Verdict", "args": {"verdict": "bad", "issues": ["누락"]}, "id": "1"}])
+    parsed, normalized = validate_or_repair(Verdict, message, "test")
+    assert parsed.verdict == "fail"
+    assert '"bad"' in calls[0]  # 복구 요청에 tool call 인자가 원본 출력으로 전달됨
+    assert json.loads(normalized.content)["verdict"] == "fail"
+
+
+async def _arepair(message):
+    return await avalidate_or_repair(Verdict, message, "test")
+
+
+def test_async_tool_call_output_is_repaired_from_args(repair_llm):
+    import asyncio
+    calls, _ = repair_llm
+    message = AIMessage(content="", tool_calls=[{"name": "Verdict", "args": {"verdict": "bad"}, "id": "1"}])
+    parsed, _ = asyncio.run(_arepair(message))
+    assert parsed.verdict == "fail"
+    assert '"bad"' in calls[0]
+
+
+def test_failed_repair_raises(repair_llm):
+    _, reply = repair_llm
+    reply["content"] = "모르겠습니다"
+    with pytest.raises(StructuredOutputError):
+        validate_or_repair(Verdict, AIMessage(content="no json"), "test")